@@ -1,6 +1,7 @@
 """AI plugin system for eye annotation detectors."""
 
+from .entry_point_source import EntryPointPluginSource
 from .plugin_interface import DetectorPlugin
 from .plugin_manager import PluginManager
 
-__all__ = ["DetectorPlugin", "PluginManager"]
+__all__ = ["DetectorPlugin", "EntryPointPluginSource", "PluginManager"]
@@ -0,0 +1,84 @@
+"""Detector plugins registered by installed packages through entry points.
+
+A package registers each detector under the entry point group of its type,
+named by the detector name shown in the application::
+
+    [project.entry-points."eye_annotation_tool.pupil_detectors"]
+    "My Detector" = "my_package.detectors:MyPupilDetector"
+
+Registrations are read from the package metadata, without importing the
+packages. A detector's module is only imported, and the detector created,
+the first time the detector is used.
+"""
+
+from importlib.metadata import EntryPoint, entry_points
+
+from .plugin_interface import DetectorPlugin
+
+PLUGIN_TYPES = ("pupil_detectors", "iris_detectors", "eyelid_detectors")
+ENTRY_POINT_GROUP_PREFIX = "eye_annotation_tool."
+
+
+def get_entry_point_group(plugin_type: str) -> str:
+    """Get the entry point group detectors of a type are registered under."""
+    return f"{ENTRY_POINT_GROUP_PREFIX}{plugin_type}"
+
+
+class EntryPointPluginSource:
+    """Detector plugins of installed packages by type and name, loaded on first use."""
+
+    def __init__(self) -> None:
+        """Initialize the EntryPointPluginSource."""
+        # Entry points are looked up when the detectors are first listed or used
+        self.registrations = None
+
+    def get_registrations(self, plugin_type: str) -> dict[str, EntryPoint]:
+        """Get the entry points of the detectors of a type by name, reading them on the first call."""
+        if self.registrations is None:
+            # Other threads may list detectors meanwhile, so the registrations are only published once complete
+            found = {registered_type: {} for registered_type in PLUGIN_TYPES}
+            installed = entry_points()
+            for registered_type, registrations in found.items():
+                for entry_point in installed.select(group=get_entry_point_group(registered_type)):
+                    if entry_point.name in registrations:
+                        print(f"Ignoring duplicate {registered_type} plugin {entry_point.name}: {entry_point.value}")
+                        continue
+                    registrations[entry_point.name] = entry_point
+            self.registrations = found
+        return self.registrations.get(plugin_type, {})
+
+    def get_names(self, plugin_type: str) -> list[str]:
+        """Get the names of the registered detectors of a type."""
+        return list(self.get_registrations(plugin_type))
+
+    def load(self, plugin_type: str, name: str) -> DetectorPlugin | None:
+        """Import and create a registered detector.
+
+        Detectors that fail to load are reported and unregistered, so they are
+        not imported again.
+
+        Args:
+            plugin_type: Type of the detector, e.g. ``"pupil_detectors"``.
+            name: Name the detector is registered under.
+
+        Returns:
+            The detector, or None if no detector of that name is registered or it failed to load.
+
+        """
+        registrations = self.get_registrations(plugin_type)
+        entry_point = registrations.get(name)
+        if entry_point is None:
+            return None
+        try:
+            plugin_class = entry_point.load()
+            plugin = plugin_class()
+        except Exception as e:
+            # Third-party plugins may fail in any way, which must not take the application down
+            print(f"Failed to load {plugin_type} plugin {name} from {entry_point.value}: {e}")
+            registrations.pop(name, None)
+            return None
+        if not isinstance(plugin, DetectorPlugin):
+            print(f"Plugin {name} from {entry_point.value} is not a DetectorPlugin")
+            registrations.pop(name, None)
+            return None
+        return plugin
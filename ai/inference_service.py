@@ -0,0 +1,390 @@
+"""Local HTTP service that runs the detectors of the annotation tool for other programs.
+
+Start it with ``eye_annotation_service`` or ``python -m ai.inference_service``.
+It only listens on localhost and has no authentication. Endpoints:
+
+``GET /detectors``
+    Names of the available detectors by type.
+``POST /detect?type=pupil&detector=Pupil%20Core``
+    Runs a detector on one frame. The body is an encoded image (PNG, JPEG,
+    ...), or a raw grayscale frame if ``width`` and ``height`` are given,
+    with ``dtype=uint8`` (default) or ``dtype=uint16`` little-endian values.
+``POST /detect_batch?type=pupil&detector=Pupil%20Core&width=192&height=192``
+    Runs a detector on each frame of a body of back-to-back raw grayscale
+    frames of the given size and ``dtype``, returning one result per frame.
+``GET /metrics``
+    Request counts and latency histograms in the Prometheus text format.
+
+Detections run on a pool of worker threads, each with its own detector
+instances, since detectors keep state between frames and are not safe to
+share between threads. At most ``workers + max_queue`` jobs are accepted at
+once; further requests are rejected with status 503 and a ``Retry-After``
+header instead of queueing without bound.
+"""
+
+import argparse
+import json
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from .entry_point_source import PLUGIN_TYPES
+from .plugin_interface import DetectorPlugin
+from .plugin_manager import PluginManager
+from .service_metrics import ServiceMetrics
+
+HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+RAW_DTYPES = {"uint8": np.dtype(np.uint8), "uint16": np.dtype("<u2")}
+# Types whose detectors return an ellipse and its points, rather than points only
+ELLIPSE_TYPES = ("pupil_detectors", "iris_detectors")
+
+
+class RequestError(Exception):
+    """A request that cannot be served, with the HTTP status to answer it with."""
+
+    def __init__(self, status: int, message: str) -> None:
+        """Initialize the RequestError.
+
+        Args:
+            status: HTTP status code.
+            message: Description of the problem sent to the client.
+
+        """
+        super().__init__(message)
+        self.status = status
+
+
+def to_json_value(value: object) -> object:
+    """Convert the NumPy values and tuples of a detector result to JSON types."""
+    if isinstance(value, dict):
+        return {key: to_json_value(item) for key, item in value.items()}
+    if isinstance(value, list | tuple | np.ndarray):
+        return [to_json_value(item) for item in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def format_result(plugin_type: str, result: tuple | list) -> dict:
+    """Convert a detector result to the JSON object of the response."""
+    if plugin_type in ELLIPSE_TYPES:
+        ellipse, points = result
+        return {"ellipse": to_json_value(ellipse), "points": to_json_value(points)}
+    return {"points": to_json_value(result)}
+
+
+def decode_encoded_frame(body: bytes) -> np.ndarray:
+    """Decode an encoded image into a grayscale array or BGR(A) array, keeping its bit depth.
+
+    Raises:
+        RequestError: If the body is not an image OpenCV can read.
+
+    """
+    import cv2  # noqa: PLC0415
+
+    frame = cv2.imdecode(np.frombuffer(body, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+    if frame is None:
+        raise RequestError(400, "Body is not a readable image")
+    return frame
+
+
+def decode_raw_frames(body: bytes, query: dict[str, list[str]]) -> np.ndarray:
+    """Get the frames of a body of back-to-back raw grayscale frames.
+
+    Args:
+        body: Raw frame values.
+        query: Query parameters with ``width``, ``height`` and optionally ``dtype``.
+
+    Returns:
+        Read-only array of shape (frames, height, width).
+
+    Raises:
+        RequestError: If the parameters are invalid or the body size does not fit them.
+
+    """
+    try:
+        width = int(query["width"][0])
+        height = int(query["height"][0])
+    except (KeyError, ValueError) as e:
+        raise RequestError(400, "Raw frames need integer width and height parameters") from e
+    dtype_name = query.get("dtype", ["uint8"])[0]
+    if dtype_name not in RAW_DTYPES:
+        raise RequestError(400, f"Unsupported dtype {dtype_name}, expected one of {', '.join(RAW_DTYPES)}")
+    dtype = RAW_DTYPES[dtype_name]
+    frame_bytes = width * height * dtype.itemsize
+    if width <= 0 or height <= 0 or not body or len(body) % frame_bytes:
+        raise RequestError(
+            400, f"Body of {len(body)} bytes is not a whole number of {width}x{height} {dtype_name} frames"
+        )
+    return np.frombuffer(body, dtype=dtype).reshape(-1, height, width)
+
+
+class InferenceService:
+    """Runs detectors on a bounded pool of worker threads and records metrics."""
+
+    def __init__(self, workers: int = 2, max_queue: int = 32, timeout: float = 30.0) -> None:
+        """Initialize the InferenceService.
+
+        Args:
+            workers: Number of worker threads running detectors.
+            max_queue: Number of jobs that may wait for a worker before new ones are rejected.
+            timeout: Seconds a request waits for its job to finish.
+
+        """
+        self.timeout = timeout
+        self.metrics = ServiceMetrics()
+        # Only lists the detectors; each worker loads and runs its own
+        self.plugin_manager = PluginManager()
+        self.local = threading.local()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="Inference")
+        self.slots = threading.BoundedSemaphore(workers + max_queue)
+        self.lock = threading.Lock()
+        self.jobs_in_flight = 0
+
+    def get_detector_names(self) -> dict[str, list[str]]:
+        """Get the names of the available detectors by type, e.g. ``{"pupil": ["Pupil Core", ...]}``."""
+        return {
+            plugin_type.removesuffix("_detectors"): self.plugin_manager.get_detector_names(plugin_type)
+            for plugin_type in PLUGIN_TYPES
+        }
+
+    def submit(self, plugin_type: str, name: str, frames: list[np.ndarray]) -> Future:
+        """Queue a detection job for frames.
+
+        Args:
+            plugin_type: Type of the detector, e.g. ``"pupil_detectors"``.
+            name: Name of the detector.
+            frames: Frames to run the detector on.
+
+        Returns:
+            The future result of the job, a result per frame.
+
+        Raises:
+            RequestError: If the queue is full.
+
+        """
+        if not self.slots.acquire(blocking=False):
+            raise RequestError(503, "Too many queued requests, retry later")
+        self.update_jobs_in_flight(1)
+        future = self.executor.submit(self.run, plugin_type, name, frames, time.perf_counter())
+        future.add_done_callback(lambda _: self.finish_job())
+        return future
+
+    def finish_job(self) -> None:
+        """Free the queue slot of a finished job."""
+        self.update_jobs_in_flight(-1)
+        self.slots.release()
+
+    def update_jobs_in_flight(self, change: int) -> None:
+        """Count a job in or out of the jobs in flight."""
+        with self.lock:
+            self.jobs_in_flight += change
+            self.metrics.jobs_in_flight.set(self.jobs_in_flight)
+
+    def get_worker_detector(self, plugin_type: str, name: str) -> DetectorPlugin | None:
+        """Get the detector of the current worker thread, creating the thread's plugin manager on first use."""
+        if not hasattr(self.local, "plugin_manager"):
+            self.local.plugin_manager = PluginManager()
+        return self.local.plugin_manager.get_detector(plugin_type, name)
+
+    def run(self, plugin_type: str, name: str, frames: list[np.ndarray], queued_at: float) -> list[dict]:
+        """Run a detector on frames (runs on a worker thread).
+
+        A frame the detector fails on gets an error result, without failing the others.
+
+        Raises:
+            RequestError: If the detector does not exist or cannot be loaded.
+
+        """
+        self.metrics.queue_seconds.observe(time.perf_counter() - queued_at)
+        detector = self.get_worker_detector(plugin_type, name)
+        if detector is None:
+            raise RequestError(404, f"Unknown or broken {plugin_type} detector {name}")
+        results = []
+        for frame in frames:
+            start = time.perf_counter()
+            try:
+                result = format_result(plugin_type, detector.detect(frame))
+                outcome = "ok"
+            except Exception as e:
+                # Detectors raise when they find nothing, which is a result for that frame
+                result = {"error": str(e)}
+                outcome = "error"
+            self.metrics.detection_seconds.observe(time.perf_counter() - start, type=plugin_type, detector=name)
+            self.metrics.frames.inc(type=plugin_type, detector=name, result=outcome)
+            results.append(result)
+        return results
+
+    def detect(self, plugin_type: str, name: str, frames: list[np.ndarray]) -> list[dict]:
+        """Run a detector on frames through the worker pool and wait for the results.
+
+        Raises:
+            RequestError: If the detector does not exist, the queue is full or the job timed out.
+
+        """
+        if name not in self.plugin_manager.get_detector_names(plugin_type):
+            raise RequestError(404, f"Unknown {plugin_type} detector {name}")
+        future = self.submit(plugin_type, name, frames)
+        try:
+            return future.result(self.timeout)
+        except FutureTimeoutError as e:
+            raise RequestError(504, f"Detection did not finish within {self.timeout:g} s") from e
+
+    def close(self) -> None:
+        """Stop the worker threads after the queued jobs."""
+        self.executor.shutdown(wait=True)
+
+
+class InferenceRequestHandler(BaseHTTPRequestHandler):
+    """Serves the endpoints of the inference service of the server."""
+
+    server: "InferenceServer"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        """Serve the detector list and the metrics."""
+        self.handle_request(self.route_get)
+
+    def do_POST(self) -> None:
+        """Serve detection requests."""
+        self.handle_request(self.route_post)
+
+    def handle_request(self, route: Callable[[str, dict[str, list[str]]], tuple[int, str, bytes]]) -> None:
+        """Answer a request, turning request errors into error responses, and record its metrics."""
+        start = time.perf_counter()
+        endpoint = urlsplit(self.path).path
+        try:
+            status, content_type, body = route(endpoint, parse_qs(urlsplit(self.path).query))
+        except RequestError as e:
+            status, content_type, body = e.status, "application/json", json.dumps({"error": str(e)}).encode()
+        except Exception as e:
+            status, content_type, body = 500, "application/json", json.dumps({"error": str(e)}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if status == 503:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(body)
+        known = endpoint in {"/detectors", "/metrics", "/detect", "/detect_batch"}
+        labels = {"endpoint": endpoint if known else "other"}
+        self.server.service.metrics.requests.inc(status=str(status), **labels)
+        self.server.service.metrics.request_seconds.observe(time.perf_counter() - start, **labels)
+
+    def route_get(self, endpoint: str, _query: dict[str, list[str]]) -> tuple[int, str, bytes]:
+        """Get the response to a GET request."""
+        service = self.server.service
+        if endpoint == "/detectors":
+            return 200, "application/json", json.dumps(service.get_detector_names()).encode()
+        if endpoint == "/metrics":
+            return 200, "text/plain; version=0.0.4", service.metrics.render().encode()
+        raise RequestError(404, f"No endpoint {endpoint}")
+
+    def route_post(self, endpoint: str, query: dict[str, list[str]]) -> tuple[int, str, bytes]:
+        """Get the response to a POST request."""
+        if endpoint not in {"/detect", "/detect_batch"}:
+            raise RequestError(404, f"No endpoint {endpoint}")
+        try:
+            kind = query["type"][0]
+            name = query["detector"][0]
+        except KeyError as e:
+            raise RequestError(400, "Detection needs type and detector parameters") from e
+        plugin_type = f"{kind}_detectors"
+        if plugin_type not in PLUGIN_TYPES:
+            raise RequestError(400, f"Unknown detector type {kind}")
+
+        body = self.read_body()
+        if endpoint == "/detect_batch":
+            frames = list(decode_raw_frames(body, query))
+        elif "width" in query or "height" in query:
+            frames = list(decode_raw_frames(body, query)[:1])
+        else:
+            frames = [decode_encoded_frame(body)]
+        results = self.server.service.detect(plugin_type, name, frames)
+        if endpoint == "/detect":
+            if "error" in results[0]:
+                raise RequestError(422, results[0]["error"])
+            return 200, "application/json", json.dumps(results[0]).encode()
+        return 200, "application/json", json.dumps({"results": results}).encode()
+
+    def read_body(self) -> bytes:
+        """Read the body of a request, refusing bodies above the size limit of the server.
+
+        Raises:
+            RequestError: If the body has no length or is too large.
+
+        """
+        try:
+            length = int(self.headers["Content-Length"])
+        except (TypeError, ValueError) as e:
+            raise RequestError(411, "Content-Length is required") from e
+        if length > self.server.max_body_bytes:
+            # The connection is closed, so the unread body is not taken for the next request
+            self.close_connection = True
+            raise RequestError(413, f"Body of {length} bytes exceeds the limit of {self.server.max_body_bytes}")
+        return self.rfile.read(length)
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        """Leave requests unlogged, they are counted in the metrics instead."""
+
+
+class InferenceServer(ThreadingHTTPServer):
+    """HTTP server of an inference service on localhost."""
+
+    daemon_threads = True
+
+    def __init__(self, service: InferenceService, port: int = DEFAULT_PORT, max_body_bytes: int = 256_000_000) -> None:
+        """Initialize the InferenceServer.
+
+        Args:
+            service: Service running the detections.
+            port: Port to listen on, 0 for any free port.
+            max_body_bytes: Largest accepted request body.
+
+        """
+        super().__init__((HOST, port), InferenceRequestHandler)
+        self.service = service
+        self.max_body_bytes = max_body_bytes
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the inference service until interrupted.
+
+    Args:
+        argv: Command line arguments, defaults to ``sys.argv[1:]``.
+
+    Returns:
+        Exit status.
+
+    """
+    parser = argparse.ArgumentParser(prog="eye_annotation_service", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port to listen on at localhost")
+    parser.add_argument("--workers", type=int, default=2, help="number of detection worker threads")
+    parser.add_argument(
+        "--max-queue", type=int, default=32, help="jobs that may wait for a worker before requests are rejected"
+    )
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds a request waits for its detection")
+    args = parser.parse_args(argv)
+
+    service = InferenceService(args.workers, args.max_queue, args.timeout)
+    server = InferenceServer(service, args.port)
+    print(f"Serving detectors on http://{HOST}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
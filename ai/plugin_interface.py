@@ -2,6 +2,39 @@
 
 from abc import ABC, abstractmethod
 
+import numpy as np
+
+
+def load_grayscale_image(image: str | np.ndarray) -> np.ndarray:
+    """Get an 8-bit grayscale image from an image path or a frame of any bit depth.
+
+    Color images are converted to grayscale, and frames with more than 8 bits
+    are stretched from their minimum to their maximum value, for detectors
+    that only work on 8-bit grayscale images.
+
+    Args:
+        image: Path to an image file, a decoded BGR or BGRA image, or a grayscale frame array.
+
+    Returns:
+        The 8-bit grayscale image.
+
+    Raises:
+        ValueError: If the image cannot be read.
+
+    """
+    import cv2  # noqa: PLC0415
+
+    if isinstance(image, np.ndarray):
+        if image.ndim == 3:
+            return cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY)
+        if image.dtype == np.uint8:
+            return image
+        return cv2.normalize(image, None, 0, 255, cv2.NORM_MINMAX, cv2.CV_8U)
+    loaded = cv2.imread(image, cv2.IMREAD_GRAYSCALE)
+    if loaded is None:
+        raise ValueError(f"Failed to load image from path: {image}")
+    return loaded
+
 
 class DetectorPlugin(ABC):
     """Base class for all detector plugins (pupil, iris, eyelid)."""
@@ -11,11 +44,13 @@ class DetectorPlugin(ABC):
         """Initialize the detector plugin."""
 
     @abstractmethod
-    def detect(self, image: str) -> tuple | list:
+    def detect(self, image: str | np.ndarray) -> tuple | list:
         """Detect features in the given image.
 
         Args:
-            image: Path to the image file.
+            image: Path to the image file, or the read-only decoded image: a
+                grayscale or BGRA array shared with the image viewer, or a
+                grayscale frame of full bit depth for frames of raw and ``.npy`` stacks.
 
         Returns:
             Detection results as tuple or list depending on detector type.
@@ -3,29 +3,31 @@
 import importlib.util
 from pathlib import Path
 
+from .entry_point_source import PLUGIN_TYPES, EntryPointPluginSource
 from .plugin_interface import DetectorPlugin
 
 
 class PluginManager:
-    """Manages loading and accessing detector plugins for pupil, iris, and eyelid detection."""
+    """Manages loading and accessing detector plugins for pupil, iris, and eyelid detection.
+
+    Detectors come from the plugin directories of this package, which are
+    loaded when the manager is created, and from the entry points of installed
+    packages, which are loaded when first used. Detectors of the plugin
+    directories take precedence over installed ones of the same name.
+    """
 
     def __init__(self) -> None:
         """Initialize the PluginManager."""
         self.pupil_detectors = {}
         self.iris_detectors = {}
         self.eyelid_detectors = {}
+        self.entry_point_source = EntryPointPluginSource()
         self.load_plugins()
 
     def load_plugins(self) -> None:
         """Load all detector plugins from the plugins directory."""
-        plugin_dirs = [
-            Path(__file__).parent / "plugins" / "pupil_detectors",
-            Path(__file__).parent / "plugins" / "iris_detectors",
-            Path(__file__).parent / "plugins" / "eyelid_detectors",
-        ]
-
-        for plugin_dir in plugin_dirs:
-            self.load_plugins_from_directory(plugin_dir)
+        for plugin_type in PLUGIN_TYPES:
+            self.load_plugins_from_directory(Path(__file__).parent / "plugins" / plugin_type)
 
     def load_plugins_from_directory(self, directory: Path) -> None:
         """Load plugins from a specific directory and register them by type.
@@ -46,15 +48,59 @@ class PluginManager:
                     item = getattr(module, item_name)
                     if isinstance(item, type) and issubclass(item, DetectorPlugin) and item is not DetectorPlugin:
                         plugin_instance = item()
-                        if plugin_type == "pupil_detectors":
-                            self.pupil_detectors[plugin_instance.name] = plugin_instance
-                        elif plugin_type == "iris_detectors":
-                            self.iris_detectors[plugin_instance.name] = plugin_instance
-                        elif plugin_type == "eyelid_detectors":
-                            self.eyelid_detectors[plugin_instance.name] = plugin_instance
+                        if plugin_type in PLUGIN_TYPES:
+                            self.get_detectors(plugin_type)[plugin_instance.name] = plugin_instance
                         else:
                             print(f"Unknown plugin type: {plugin_type}")
 
+    def get_detectors(self, plugin_type: str) -> dict[str, DetectorPlugin]:
+        """Get the loaded detectors of a type by name.
+
+        Args:
+            plugin_type: Type of the detectors, e.g. ``"pupil_detectors"``.
+
+        Returns:
+            The detectors loaded so far.
+
+        """
+        return {
+            "pupil_detectors": self.pupil_detectors,
+            "iris_detectors": self.iris_detectors,
+            "eyelid_detectors": self.eyelid_detectors,
+        }[plugin_type]
+
+    def get_detector(self, plugin_type: str, name: str) -> DetectorPlugin | None:
+        """Get a detector plugin by type and name, loading an installed one on first use.
+
+        Args:
+            plugin_type: Type of the detector, e.g. ``"pupil_detectors"``.
+            name: Name of the detector.
+
+        Returns:
+            The detector plugin instance or None if not found.
+
+        """
+        detectors = self.get_detectors(plugin_type)
+        detector = detectors.get(name)
+        if detector is None:
+            detector = self.entry_point_source.load(plugin_type, name)
+            if detector is not None:
+                detectors[name] = detector
+        return detector
+
+    def get_detector_names(self, plugin_type: str) -> list[str]:
+        """Get the names of the available detectors of a type, loaded or not.
+
+        Args:
+            plugin_type: Type of the detectors, e.g. ``"pupil_detectors"``.
+
+        Returns:
+            List of detector names.
+
+        """
+        names = list(self.get_detectors(plugin_type))
+        return names + [name for name in self.entry_point_source.get_names(plugin_type) if name not in names]
+
     def get_pupil_detector(self, name: str) -> DetectorPlugin | None:
         """Get a pupil detector plugin by name.
 
@@ -65,7 +111,7 @@ class PluginManager:
             The detector plugin instance or None if not found.
 
         """
-        return self.pupil_detectors.get(name)
+        return self.get_detector("pupil_detectors", name)
 
     def get_iris_detector(self, name: str) -> DetectorPlugin | None:
         """Get an iris detector plugin by name.
@@ -77,7 +123,7 @@ class PluginManager:
             The detector plugin instance or None if not found.
 
         """
-        return self.iris_detectors.get(name)
+        return self.get_detector("iris_detectors", name)
 
     def get_pupil_detector_names(self) -> list[str]:
         """Get list of available pupil detector names.
@@ -86,7 +132,7 @@ class PluginManager:
             List of pupil detector names.
 
         """
-        return list(self.pupil_detectors.keys())
+        return self.get_detector_names("pupil_detectors")
 
     def get_iris_detector_names(self) -> list[str]:
         """Get list of available iris detector names.
@@ -95,7 +141,7 @@ class PluginManager:
             List of iris detector names.
 
         """
-        return list(self.iris_detectors.keys())
+        return self.get_detector_names("iris_detectors")
 
     def get_eyelid_detector(self, name: str) -> DetectorPlugin | None:
         """Get an eyelid detector plugin by name.
@@ -107,7 +153,7 @@ class PluginManager:
             The detector plugin instance or None if not found.
 
         """
-        return self.eyelid_detectors.get(name)
+        return self.get_detector("eyelid_detectors", name)
 
     def get_eyelid_detector_names(self) -> list[str]:
         """Get list of available eyelid detector names.
@@ -116,4 +162,4 @@ class PluginManager:
             List of eyelid detector names.
 
         """
-        return list(self.eyelid_detectors.keys())
+        return self.get_detector_names("eyelid_detectors")
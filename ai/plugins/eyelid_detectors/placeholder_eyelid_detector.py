@@ -1,5 +1,7 @@
 """Placeholder eyelid detector for testing purposes."""
 
+import numpy as np
+
 from ai.plugin_interface import DetectorPlugin
 
 
@@ -9,11 +11,11 @@ class PlaceholderEyelidDetector(DetectorPlugin):
     def __init__(self) -> None:
         """Initialize the PlaceholderEyelidDetector."""
 
-    def detect(self, image_path: str) -> list[tuple[float, float]]:  # noqa: PLR6301 ARG002
+    def detect(self, image: str | np.ndarray) -> list[tuple[float, float]]:  # noqa: PLR6301 ARG002
         """Detect eyelid contour in the given image (returns placeholder data).
 
         Args:
-            image_path: Path to the image file.
+            image: Path to the image file, or a grayscale frame of any bit depth.
 
         Returns:
             List of points representing the eyelid contour.
@@ -1,8 +1,8 @@
 """Threshold-based glint detector for bright spot detection in ROI."""
 
-import cv2
+import numpy as np
 
-from ai.plugin_interface import DetectorPlugin
+from ai.plugin_interface import DetectorPlugin, load_grayscale_image
 
 
 class ThresholdGlintDetector(DetectorPlugin):
@@ -17,20 +17,19 @@ class ThresholdGlintDetector(DetectorPlugin):
         """
         self.roi = roi
 
-    def detect(self, image_path: str) -> list[tuple[float, float]]:
+    def detect(self, image: str | np.ndarray) -> list[tuple[float, float]]:
         """Detect glints in the given image using thresholding.
 
         Args:
-            image_path: Path to the image file.
+            image: Path to the image file, or a decoded image or frame of any bit depth.
 
         Returns:
             List of points representing glint centers (x, y).
 
         """
-        # Load the image
-        image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-        if image is None:
-            raise ValueError(f"Failed to load image from path: {image_path}")
+        import cv2  # noqa: PLC0415
+
+        image = load_grayscale_image(image)
 
         # Apply ROI if provided
         if self.roi:
@@ -11,11 +11,11 @@ class PlaceholderirisDetector(DetectorPlugin):
     def __init__(self) -> None:
         """Initialize the PlaceholderirisDetector."""
 
-    def detect(self, image_path: str) -> tuple[dict, list]:  # noqa: PLR6301 ARG002
+    def detect(self, image: str | np.ndarray) -> tuple[dict, list]:  # noqa: PLR6301 ARG002
         """Detect iris in the given image (returns placeholder data).
 
         Args:
-            image_path: Path to the image file.
+            image: Path to the image file, or a grayscale frame of any bit depth.
 
         Returns:
             Tuple containing ellipse parameters dict and list of points on the ellipse.
@@ -1,10 +1,8 @@
 """Pupil detector using the Pupil Core library."""
 
-import cv2
 import numpy as np
-from pupil_detectors import Detector2D
 
-from ai.plugin_interface import DetectorPlugin
+from ai.plugin_interface import DetectorPlugin, load_grayscale_image
 
 
 class PupilCoreDetector(DetectorPlugin):
@@ -12,22 +10,27 @@ class PupilCoreDetector(DetectorPlugin):
 
     def __init__(self) -> None:
         """Initialize the PupilCoreDetector."""
-        self.detector = Detector2D()
+        # The native detector is loaded on first use, so listing the plugins at startup does not load it
+        self.detector = None
 
-    def detect(self, image_path: str) -> tuple[dict, list]:
+    def detect(self, image: str | np.ndarray) -> tuple[dict, list]:
         """Detect pupil in the given image using Pupil Core detector.
 
         Args:
-            image_path: Path to the image file.
+            image: Path to the image file, or a decoded image or frame of any bit depth.
 
         Returns:
             Tuple containing ellipse parameters dict and list of points on the ellipse.
 
         """
-        # Load the image
-        image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-        if image is None:
-            raise ValueError(f"Failed to load image from path: {image_path}")
+        if self.detector is None:
+            from pupil_detectors import Detector2D  # noqa: PLC0415
+
+            self.detector = Detector2D()
+        image = load_grayscale_image(image)
+        if not image.flags.writeable:
+            # The detector only accepts writable buffers, shared images are read-only
+            image = image.copy()
 
         result = self.detector.detect(image)
         ellipse = result["ellipse"]
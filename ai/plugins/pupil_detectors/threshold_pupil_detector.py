@@ -1,9 +1,8 @@
 """Threshold-based pupil detector for dark pupil detection in ROI."""
 
-import cv2
 import numpy as np
 
-from ai.plugin_interface import DetectorPlugin
+from ai.plugin_interface import DetectorPlugin, load_grayscale_image
 
 
 class ThresholdPupilDetector(DetectorPlugin):
@@ -18,20 +17,19 @@ class ThresholdPupilDetector(DetectorPlugin):
         """
         self.roi = roi
 
-    def detect(self, image_path: str) -> tuple[dict, list]:
+    def detect(self, image: str | np.ndarray) -> tuple[dict, list]:
         """Detect pupil in the given image using thresholding.
 
         Args:
-            image_path: Path to the image file.
+            image: Path to the image file, or a decoded image or frame of any bit depth.
 
         Returns:
             Tuple containing ellipse parameters dict and list of points on the ellipse.
 
         """
-        # Load the image
-        image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-        if image is None:
-            raise ValueError(f"Failed to load image from path: {image_path}")
+        import cv2  # noqa: PLC0415
+
+        image = load_grayscale_image(image)
 
         # Apply ROI if provided
         if self.roi:
@@ -0,0 +1,140 @@
+"""Counters and latency histograms of the inference service, in the Prometheus text format."""
+
+import bisect
+import threading
+
+# Upper bounds in seconds, from fast detectors on small crops to slow ones on large frames
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def escape_label_value(value: str) -> str:
+    """Escape backslashes, quotes and line breaks of a label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: tuple[tuple[str, str], ...]) -> str:
+    """Format label names and values as a Prometheus label set, empty if there are none."""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label_value(str(value))}"' for name, value in labels) + "}"
+
+
+class Counter:
+    """A value per label set that only goes up."""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, description: str) -> None:
+        """Initialize the Counter.
+
+        Args:
+            name: Metric name.
+            description: Help text of the metric.
+
+        """
+        self.name = name
+        self.description = description
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Add to the value of a label set."""
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def render(self) -> list[str]:
+        """Get the lines of the metric in the Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.metric_type}"]
+        with self.lock:
+            lines.extend(f"{self.name}{format_labels(key)} {value:g}" for key, value in sorted(self.values.items()))
+        return lines
+
+
+class Gauge(Counter):
+    """A value per label set that goes up and down."""
+
+    metric_type = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        """Set the value of a label set."""
+        with self.lock:
+            self.values[tuple(sorted(labels.items()))] = value
+
+
+class Histogram:
+    """Counts of observed durations per label set in cumulative buckets."""
+
+    def __init__(self, name: str, description: str, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        """Initialize the Histogram.
+
+        Args:
+            name: Metric name.
+            description: Help text of the metric.
+            buckets: Sorted upper bounds of the buckets in seconds.
+
+        """
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        # Per label set: count of each bucket and of the overflow, and the sum of the observations
+        self.counts = {}
+        self.sums = {}
+
+    def observe(self, seconds: float, **labels: str) -> None:
+        """Record a duration for a label set."""
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self.lock:
+            counts = self.counts.setdefault(key, [0] * (len(self.buckets) + 1))
+            counts[index] += 1
+            self.sums[key] = self.sums.get(key, 0.0) + seconds
+
+    def render(self) -> list[str]:
+        """Get the lines of the metric in the Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            for key, counts in sorted(self.counts.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts, strict=False):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{format_labels((*key, ('le', f'{bound:g}')))} {cumulative}")
+                total = cumulative + counts[-1]
+                lines.extend((
+                    f"{self.name}_bucket{format_labels((*key, ('le', '+Inf')))} {total}",
+                    f"{self.name}_sum{format_labels(key)} {self.sums[key]:g}",
+                    f"{self.name}_count{format_labels(key)} {total}",
+                ))
+        return lines
+
+
+class ServiceMetrics:
+    """All metrics of the inference service."""
+
+    def __init__(self) -> None:
+        """Initialize the ServiceMetrics."""
+        self.requests = Counter("eye_annotation_requests_total", "HTTP requests by endpoint and status code.")
+        self.request_seconds = Histogram(
+            "eye_annotation_request_duration_seconds", "Time from reading a request to sending its response."
+        )
+        self.queue_seconds = Histogram(
+            "eye_annotation_queue_wait_seconds", "Time detection jobs waited for a free worker."
+        )
+        self.detection_seconds = Histogram(
+            "eye_annotation_detection_duration_seconds", "Time a detector took for one frame."
+        )
+        self.frames = Counter("eye_annotation_frames_total", "Frames run through a detector, by detector and result.")
+        self.jobs_in_flight = Gauge("eye_annotation_jobs_in_flight", "Detection jobs queued or running.")
+        self.metrics = (
+            self.requests,
+            self.request_seconds,
+            self.queue_seconds,
+            self.detection_seconds,
+            self.frames,
+            self.jobs_in_flight,
+        )
+
+    def render(self) -> str:
+        """Get all metrics in the Prometheus text format."""
+        return "\n".join(line for metric in self.metrics for line in metric.render()) + "\n"
@@ -1,6 +1,10 @@
 """Eye annotation application package."""
 
-from ._version import version as __version__
+try:
+    from ._version import version as __version__
+except ImportError:
+    # The version file is only generated when the package is built or installed
+    __version__ = "unknown"
 from .main import run_app
 
 __author__ = "Mohammadhossein Salari"
@@ -2,5 +2,6 @@
 
 from .annotation_controller import AnnotationController
 from .navigation_controller import NavigationController
+from .status_controller import StatusController
 
-__all__ = ["AnnotationController", "NavigationController"]
+__all__ = ["AnnotationController", "NavigationController", "StatusController"]
@@ -1,15 +1,18 @@
 """Controller for managing annotation save and load operations."""
 
+import sqlite3
 from pathlib import Path
 from typing import TYPE_CHECKING
 
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QMessageBox
 
-from ..utils.annotation_io import (
-    get_annotation_path,
-    load_annotations,
-    save_annotations,
-)
+from annotation_sdk.archive_source import get_storage_path, split_member_path
+from annotation_sdk.status_index import annotation_status
+
+from ..utils.annotation_io import AnnotationFileBackend, ProjectStore, get_project_store_path
+from ..utils.autosave import AutosaveWriter
+from ..utils.edit_journal import EditJournal, JournalWriter
 
 if TYPE_CHECKING:
     from ..gui.main_window import MainWindow
@@ -26,10 +29,180 @@ class AnnotationController:
 
         """
         self.main_window = main_window
+        # Annotations are stored in JSON files next to the images unless a project store is used
+        self.backend = AnnotationFileBackend()
+        self.journal_writer = JournalWriter()
+        self.journal = None
+
+        # Autosave coalesces edits with a timer and writes them on a background thread
+        self.autosave_writer = AutosaveWriter(main_window)
+        self.autosave_writer.save_failed.connect(self.on_autosave_failed)
+        # Images whose failed saves were already reported, so repeated failures do not show a dialog each time
+        self.reported_failures = set()
+        self.autosave_timer = QTimer(main_window)
+        self.autosave_timer.setSingleShot(True)
+        self.autosave_timer.timeout.connect(self.autosave)
+
+    def open_backend(self, image_paths: list[str]) -> None:
+        """Use the project store in the folder of the loaded images if there is one, else JSON files.
+
+        Images read from archives always use the project store next to the archive,
+        which is created if needed, since no files can be written inside an archive.
+
+        Args:
+            image_paths: Paths of the loaded images.
+
+        """
+        self.autosave_writer.wait()
+        self.backend.close()
+        store_path = get_project_store_path(get_storage_path(image_paths[0])) if image_paths else None
+        if store_path is not None and (
+            Path(store_path).exists() or any(split_member_path(path) is not None for path in image_paths)
+        ):
+            self.backend = ProjectStore(store_path)
+        else:
+            self.backend = AnnotationFileBackend()
+
+    def create_project_store(self) -> None:
+        """Import the JSON annotation files of the loaded images into a project store and switch to it."""
+        image_paths = self.main_window.image_paths
+        if not image_paths:
+            QMessageBox.information(self.main_window, "Project Store", "Load images first.")
+            return
+        if isinstance(self.backend, ProjectStore):
+            QMessageBox.information(
+                self.main_window, "Project Store", f"Annotations are already stored in {self.backend.store_path}."
+            )
+            return
+
+        try:
+            store = ProjectStore(get_project_store_path(get_storage_path(image_paths[0])))
+            count = store.import_json(image_paths)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            QMessageBox.critical(self.main_window, "Error", f"Failed to create the project store: {e}")
+            return
+        self.autosave_writer.wait()
+        self.backend.close()
+        self.backend = store
+        # Revisions of the store differ from those of the files
+        self.main_window.status_controller.refresh()
+        QMessageBox.information(
+            self.main_window, "Project Store", f"Imported {count} annotation files into {store.store_path}."
+        )
+
+    def export_project_store(self) -> None:
+        """Write the annotations of the project store to JSON files next to the images."""
+        if not isinstance(self.backend, ProjectStore):
+            QMessageBox.information(self.main_window, "Export", "Annotations are already stored as JSON files.")
+            return
+        try:
+            count = self.backend.export_json()
+        except (OSError, ValueError, sqlite3.Error) as e:
+            QMessageBox.critical(self.main_window, "Error", f"Failed to export annotations: {e}")
+            return
+        QMessageBox.information(self.main_window, "Export", f"Exported {count} annotation files.")
 
     def save_annotations(self) -> None:
         """Save annotations for the current image."""
-        self.save_current_annotations()
+        if self.autosave_enabled():
+            self.autosave()
+        else:
+            self.save_current_annotations()
+
+    def autosave_enabled(self) -> bool:
+        """Check if edits are saved automatically."""
+        return bool(self.main_window.settings_handler.get_setting("autosave"))
+
+    def set_autosave_enabled(self, enabled: bool) -> None:
+        """Turn automatic saving on or off, saving pending edits when it is turned on."""
+        self.main_window.settings_handler.set_setting("autosave", enabled)
+        if enabled:
+            self.autosave()
+
+    def schedule_autosave(self) -> None:
+        """Start or restart the timer that saves the current edits once editing pauses."""
+        if self.autosave_enabled() and self.main_window.annotation_modified:
+            self.autosave_timer.start(int(self.main_window.settings_handler.get_setting("autosave_delay_ms")))
+
+    def autosave(self) -> None:
+        """Queue the annotations of the current image to be saved in the background without prompting."""
+        self.autosave_timer.stop()
+        if not self.main_window.annotation_modified or not (
+            0 <= self.main_window.current_image_index < len(self.main_window.image_paths)
+        ):
+            return
+
+        image_path = self.main_window.image_paths[self.main_window.current_image_index]
+        # Snapshots share the point arrays, so later edits cannot change what is written
+        eye_data = self.main_window.image_viewer.get_annotation_data()
+        undo_commands = list(self.main_window.image_viewer.history.undo_stack)
+        backend = self.backend
+        journal = self.journal
+        # Edits journaled while the save is queued are kept in the compacted journal
+        journal_sequence = journal.get_sequence() if journal is not None else None
+        status = annotation_status(eye_data)
+        status_index = self.main_window.status_controller.index
+        self.main_window.status_controller.set_status(image_path, status)
+
+        def save() -> None:
+            backend.save_annotations(image_path, eye_data)
+            if journal is not None:
+                journal.compact(undo_commands, journal_sequence)
+            if status_index is not None:
+                status_index.update(image_path, backend.get_revision(image_path), status)
+
+        self.autosave_writer.submit(image_path, save)
+        self.main_window.set_annotation_modified(False)
+
+    def on_autosave_failed(self, image_path: str, error: str) -> None:
+        """Mark the annotations of an image as unsaved again after their save failed, and warn once."""
+        # A newer save of the image decides its state
+        if image_path not in self.autosave_writer.get_failures() or self.autosave_writer.is_queued(image_path):
+            return
+        if (
+            0 <= self.main_window.current_image_index < len(self.main_window.image_paths)
+            and self.main_window.image_paths[self.main_window.current_image_index] == image_path
+        ):
+            self.main_window.set_annotation_modified(True)
+        try:
+            self.main_window.status_controller.set_status(
+                image_path, annotation_status(self.backend.load_annotations(image_path))
+            )
+        except (OSError, ValueError, sqlite3.Error) as e:
+            print(f"Failed to read the saved annotations of {image_path}: {e}")
+
+        self.reported_failures &= set(self.autosave_writer.get_failures())
+        if image_path in self.reported_failures:
+            return
+        self.reported_failures.add(image_path)
+        QMessageBox.warning(
+            self.main_window,
+            "Autosave Failed",
+            f"Failed to save annotations of {Path(image_path).name}: {error}\n\n"
+            "The edits are kept in the edit journal and offered for recovery when the image is opened again.",
+        )
+
+    def confirm_autosaves_written(self) -> bool:
+        """Wait for queued saves and ask whether to proceed if any of them failed.
+
+        Returns:
+            True if all saves were written or the user chose to proceed anyway.
+
+        """
+        self.autosave_writer.wait()
+        failures = self.autosave_writer.get_failures()
+        if not failures:
+            return True
+        image_path, error = next(iter(failures.items()))
+        reply = QMessageBox.question(
+            self.main_window,
+            "Unsaved Changes",
+            f"Annotations of {len(failures)} images could not be saved, e.g. {Path(image_path).name}: {error}\n\n"
+            "Do you want to exit anyway? The edits are kept in the edit journals.",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No,
+        )
+        return reply == QMessageBox.Yes
 
     def save_current_annotations(self) -> None:
         """Save current image annotations to file, prompting if file exists."""
@@ -37,9 +210,8 @@ class AnnotationController:
             self.main_window.image_paths
         ):
             image_path = self.main_window.image_paths[self.main_window.current_image_index]
-            annotation_path = get_annotation_path(image_path)
 
-            if Path(annotation_path).exists():
+            if self.backend.has_annotations(image_path):
                 reply = QMessageBox.question(
                     self.main_window,
                     "Update Annotations",
@@ -51,18 +223,83 @@ class AnnotationController:
                     return
 
             eye_data = self.main_window.image_viewer.get_annotation_data()
-            save_annotations(annotation_path, eye_data)
+            self.backend.save_annotations(image_path, eye_data)
             self.main_window.set_annotation_modified(False)
+            self.record_status(image_path, eye_data)
+            if self.journal is not None:
+                self.journal.compact(list(self.main_window.image_viewer.history.undo_stack))
             # QMessageBox.information(self.main_window, "Success", "Annotations saved successfully.")
 
+    def record_status(self, image_path: str, eye_data: dict) -> None:
+        """Update the shown and indexed status of an image after its annotations were saved.
+
+        Args:
+            image_path: Path to the image.
+            eye_data: The saved annotations of both eyes.
+
+        """
+        status = annotation_status(eye_data)
+        self.main_window.status_controller.set_status(image_path, status)
+        if self.main_window.status_controller.index is not None:
+            self.main_window.status_controller.index.update(image_path, self.backend.get_revision(image_path), status)
+
     def load_annotations(self) -> None:
         """Load annotations for the current image from file."""
         if 0 <= self.main_window.current_image_index < len(self.main_window.image_paths):
             image_path = self.main_window.image_paths[self.main_window.current_image_index]
-            annotation_path = get_annotation_path(image_path)
-            annotation_data = load_annotations(annotation_path)
+            # A save of this image may still be queued from an earlier visit
+            self.autosave_writer.wait(image_path)
+            annotation_data = self.backend.load_annotations(image_path)
             self.main_window.image_viewer.set_annotation_data(annotation_data)
             self.main_window.set_annotation_modified(False)
+            self.open_journal(image_path)
+
+    def open_journal(self, image_path: str) -> None:
+        """Open the edit journal of an image, restoring its undo history and unsaved edits.
+
+        Args:
+            image_path: Path to the image.
+
+        """
+        image_viewer = self.main_window.image_viewer
+        image_viewer.set_journal(None)
+
+        self.journal = EditJournal(image_path, self.journal_writer, lambda: self.backend.get_revision(image_path))
+        # Only writes queued from an earlier visit of this image are waited for, usually there are none
+        self.journal_writer.flush(self.journal.path)
+        undo_commands, redo_commands, unsaved = self.journal.load()
+        if not (undo_commands or redo_commands or unsaved):
+            self.journal.start()
+        image_viewer.restore_history(undo_commands, redo_commands)
+
+        if unsaved:
+            reply = QMessageBox.question(
+                self.main_window,
+                "Recover Unsaved Edits",
+                f"{len(unsaved)} unsaved edits to this image were found in its edit journal. "
+                "Do you want to recover them?",
+                QMessageBox.Yes | QMessageBox.No,
+                QMessageBox.Yes,
+            )
+            if reply == QMessageBox.Yes:
+                image_viewer.replay_edits(unsaved)
+                self.main_window.set_annotation_modified(True)
+                self.schedule_autosave()
+            else:
+                self.journal.discard_unsaved()
+
+        image_viewer.set_journal(self.journal)
+
+    def discard_unsaved_changes(self) -> None:
+        """Drop the unsaved edits of the current image from its journal."""
+        if self.journal is not None:
+            self.journal.discard_unsaved()
+
+    def close(self) -> None:
+        """Finish all pending saves and journal writes and close the annotation backend."""
+        self.autosave_writer.close()
+        self.journal_writer.close()
+        self.backend.close()
 
     def check_unsaved_changes(self) -> bool:
         """Check for unsaved changes and prompt user to save.
@@ -71,6 +308,9 @@ class AnnotationController:
             True if it's safe to proceed, False if user cancelled.
 
         """
+        if self.autosave_enabled():
+            self.autosave()
+            return True
         if self.main_window.annotation_modified:
             reply = QMessageBox.question(
                 self.main_window,
@@ -83,6 +323,8 @@ class AnnotationController:
             if reply == QMessageBox.Save:
                 self.save_annotations()
                 return True
-            # Cancel or Discard
-            return reply == QMessageBox.Discard
+            if reply == QMessageBox.Discard:
+                self.discard_unsaved_changes()
+                return True
+            return False
         return True
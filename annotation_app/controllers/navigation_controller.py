@@ -2,7 +2,8 @@
 
 from typing import TYPE_CHECKING
 
-from PyQt5.QtWidgets import QListWidgetItem, QMessageBox
+from PyQt5.QtCore import QModelIndex, Qt
+from PyQt5.QtWidgets import QMessageBox
 
 if TYPE_CHECKING:
     from ..gui.main_window import MainWindow
@@ -22,51 +23,49 @@ class NavigationController:
 
     def next_image(self) -> None:
         """Navigate to the next image in the list."""
-        if self.main_window.current_image_index < len(self.main_window.image_paths) - 1:
-            if self.main_window.annotation_modified:
-                reply = self.show_save_dialog()
-                if reply == QMessageBox.Cancel:
-                    return
-                if reply == QMessageBox.Yes:
-                    self.main_window.save_current_annotations()
-
-            self.main_window.current_image_index += 1
-            self.main_window.load_current_image()
-            self.main_window.image_list_widget.setCurrentRow(self.main_window.current_image_index)
+        index = self.main_window.get_adjacent_image_index(1)
+        if index is not None:
+            self.go_to_image(index)
 
     def prev_image(self) -> None:
         """Navigate to the previous image in the list."""
-        if self.main_window.current_image_index > 0:
-            if self.main_window.annotation_modified:
-                reply = self.show_save_dialog()
-                if reply == QMessageBox.Cancel:
-                    return
-                if reply == QMessageBox.Yes:
-                    self.main_window.save_current_annotations()
+        index = self.main_window.get_adjacent_image_index(-1)
+        if index is not None:
+            self.go_to_image(index)
 
-            self.main_window.current_image_index -= 1
-            self.main_window.load_current_image()
-            self.main_window.image_list_widget.setCurrentRow(self.main_window.current_image_index)
+    def go_to_image(self, index: int) -> None:
+        """Navigate to an image by its index in the loaded images.
 
-    def on_image_selected(self, item: QListWidgetItem) -> None:
-        """Handle image selection from the list widget.
+        Args:
+            index: Index of the image to show.
+
+        """
+        if not 0 <= index < len(self.main_window.image_paths) or index == self.main_window.current_image_index:
+            return
+        if self.main_window.annotation_controller.autosave_enabled():
+            self.main_window.annotation_controller.autosave()
+        elif self.main_window.annotation_modified:
+            reply = self.show_save_dialog()
+            if reply == QMessageBox.Cancel:
+                self.main_window.select_current_image_row()
+                return
+            if reply == QMessageBox.Yes:
+                self.main_window.save_current_annotations()
+            else:
+                self.main_window.annotation_controller.discard_unsaved_changes()
+
+        self.main_window.current_image_index = index
+        self.main_window.load_current_image()
+        self.main_window.select_current_image_row()
+
+    def on_image_selected(self, model_index: QModelIndex) -> None:
+        """Handle image selection from the image list.
 
         Args:
-            item: The selected list widget item.
+            model_index: The selected row of the image list.
 
         """
-        selected_index = self.main_window.image_list_widget.row(item)
-        if selected_index != self.main_window.current_image_index:
-            if self.main_window.annotation_modified:
-                reply = self.show_save_dialog()
-                if reply == QMessageBox.Cancel:
-                    self.main_window.image_list_widget.setCurrentRow(self.main_window.current_image_index)
-                    return
-                if reply == QMessageBox.Yes:
-                    self.main_window.save_current_annotations()
-
-            self.main_window.current_image_index = selected_index
-            self.main_window.load_current_image()
+        self.go_to_image(model_index.data(Qt.UserRole))
 
     def show_save_dialog(self) -> int:
         """Show a dialog asking user whether to save changes.
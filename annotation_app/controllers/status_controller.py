@@ -0,0 +1,124 @@
+"""Controller for the annotation status of the loaded images."""
+
+import sqlite3
+import threading
+from typing import TYPE_CHECKING
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from annotation_sdk.archive_source import get_storage_path
+from annotation_sdk.status_index import StatusIndex, get_status_index_path
+
+if TYPE_CHECKING:
+    from ..gui.main_window import MainWindow
+
+STATUS_FILTERS = ("All images", "Unannotated", "Annotated")
+SORT_ORDERS = ("File order", "Unannotated first")
+
+
+class StatusController(QObject):
+    """Keeps the status index of the loaded images up to date and orders the image list by it.
+
+    Cached statuses are shown as soon as images are loaded. A background thread
+    then checks which annotations changed since the index was written, and saves
+    update single entries, so the dataset is never rescanned as a whole.
+    """
+
+    # Emitted from the refresh thread with the changed statuses by image path
+    statuses_refreshed = pyqtSignal(dict)
+
+    def __init__(self, main_window: "MainWindow") -> None:
+        """Initialize the StatusController.
+
+        Args:
+            main_window: Reference to the main application window.
+
+        """
+        super().__init__(main_window)
+        self.main_window = main_window
+        self.index = None
+        self.statuses = []
+        self.image_indices = {}
+        self.refresh_generation = 0
+        self.statuses_refreshed.connect(self.apply_statuses)
+
+    def open(self, image_paths: list[str]) -> None:
+        """Show the cached statuses of newly loaded images and start refreshing them.
+
+        Args:
+            image_paths: Paths of the loaded images.
+
+        """
+        self.close()
+        self.index = StatusIndex(get_status_index_path(get_storage_path(image_paths[0]))) if image_paths else None
+        self.image_indices = {path: i for i, path in enumerate(image_paths)}
+        self.statuses = [self.index.get_status(path) for path in image_paths] if self.index is not None else []
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Check the stored annotations of all loaded images on a background thread."""
+        if self.index is None:
+            return
+        self.refresh_generation += 1
+        generation = self.refresh_generation
+        index = self.index
+        backend = self.main_window.annotation_controller.backend
+        image_paths = list(self.main_window.image_paths)
+
+        def run() -> None:
+            try:
+                changed = index.refresh(
+                    image_paths, backend, is_cancelled=lambda: generation != self.refresh_generation
+                )
+            except (OSError, ValueError, sqlite3.Error) as e:
+                print(f"Failed to refresh the annotation status: {e}")
+                return
+            if generation == self.refresh_generation:
+                self.statuses_refreshed.emit(changed)
+            index.save()
+
+        threading.Thread(target=run, name="StatusRefresh", daemon=True).start()
+
+    def apply_statuses(self, changed: dict[str, int]) -> None:
+        """Show statuses found by the refresh thread."""
+        for image_path, status in changed.items():
+            self.set_status(image_path, status)
+        # Unknown statuses are resolved now, so a filtered or sorted list may change
+        if self.is_list_reordered():
+            self.main_window.update_image_list()
+
+    def set_status(self, image_path: str, status: int) -> None:
+        """Show the new status of an image."""
+        index = self.image_indices.get(image_path)
+        if index is not None:
+            self.statuses[index] = status
+            self.main_window.update_image_status(index)
+
+    def get_status(self, index: int) -> int | None:
+        """Get the status of a loaded image by its index, or None if it is not known yet."""
+        return self.statuses[index] if 0 <= index < len(self.statuses) else None
+
+    def is_list_reordered(self) -> bool:
+        """Check if the image list is filtered or sorted by status."""
+        return (
+            self.main_window.status_filter_combo.currentIndex() != 0
+            or self.main_window.status_sort_combo.currentIndex() != 0
+        )
+
+    def get_image_order(self) -> list[int]:
+        """Get the indices of the images shown in the image list, in list order."""
+        status_filter = self.main_window.status_filter_combo.currentText()
+        indices = range(len(self.main_window.image_paths))
+        if status_filter == "Unannotated":
+            indices = [i for i in indices if not self.get_status(i)]
+        elif status_filter == "Annotated":
+            indices = [i for i in indices if self.get_status(i)]
+        if self.main_window.status_sort_combo.currentText() == "Unannotated first":
+            return sorted(indices, key=lambda i: bool(self.get_status(i)))
+        return list(indices)
+
+    def close(self) -> None:
+        """Stop refreshing and save the index."""
+        self.refresh_generation += 1
+        if self.index is not None:
+            self.index.save()
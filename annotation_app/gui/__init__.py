@@ -3,6 +3,7 @@
 from .ai_assist_handler import AIAssistHandler
 from .annotation_controls import AnnotationControlPanel
 from .custom_widgets import MaterialButton
+from .image_canvas import ImageCanvas
 from .image_viewer import ImageViewer
 from .main_window import MainWindow
 from .menu_handler import MenuHandler
@@ -11,6 +12,7 @@ from .shortcut_handler import ShortcutHandler
 __all__ = [
     "AIAssistHandler",
     "AnnotationControlPanel",
+    "ImageCanvas",
     "ImageViewer",
     "MainWindow",
     "MaterialButton",
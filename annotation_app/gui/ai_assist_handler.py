@@ -1,13 +1,13 @@
 """Handler for AI-assisted annotation functionality."""
 
-from itertools import starmap
 from typing import TYPE_CHECKING
 
-from PyQt5.QtCore import QPointF, QSizeF
+import numpy as np
 from PyQt5.QtWidgets import QMessageBox
 
 from ai.plugins.glint_detectors.threshold_glint_detector import ThresholdGlintDetector
 from ai.plugins.pupil_detectors.threshold_pupil_detector import ThresholdPupilDetector
+from annotation_sdk.frame_source import load_frame, split_frame_path
 
 if TYPE_CHECKING:
     from .main_window import MainWindow
@@ -25,34 +25,42 @@ class AIAssistHandler:
         if self.main_window.current_image_index >= 0:
             image_path = self.main_window.image_paths[self.main_window.current_image_index]
 
-            # Save the current state before making changes
-            self.main_window.image_viewer.save_state()
-
             # Get current annotation type to determine which detector to run
             current_annotation = self.main_window.image_viewer.current_annotation
 
-            changes_made = False
+            # Each detector replaces the annotation as one undoable edit
             if current_annotation == "pupil":
-                changes_made = self.detect_and_update("pupil_detector", image_path)
+                self.detect_and_update("pupil_detector", image_path)
             elif current_annotation == "iris":
-                changes_made = self.detect_and_update("iris_detector", image_path)
+                self.detect_and_update("iris_detector", image_path)
             elif current_annotation == "eyelid_contour":
-                changes_made = self.detect_and_update("eyelid_detector", image_path)
+                self.detect_and_update("eyelid_detector", image_path)
             elif current_annotation == "glint":
-                changes_made = self.detect_and_update_glint(image_path)
-
-            if changes_made:
-                # Save the new state after making changes
-                self.main_window.image_viewer.save_state()
-                self.main_window.image_viewer.save_current_eye_data()
-                self.main_window.set_annotation_modified(True)
-                self.main_window.image_viewer.update_image()
-                self.main_window.image_viewer.annotation_changed.emit()
+                self.detect_and_update_glint(image_path)
+
+    def get_detector_input(self, image_path: str) -> str | np.ndarray:
+        """Get what detectors read: the full bit depth frame for frames of stacks, else the cached decoded image.
+
+        With the display enhancement set to apply to detectors, they read the image as displayed instead.
+        """
+        enhancement = self.main_window.image_viewer.display_enhancement
+        if split_frame_path(image_path) is not None and not enhancement.for_detectors:
+            return load_frame(image_path)
+        frame = self.main_window.frame_cache.get(image_path)
+        if frame is None:
+            return image_path
+        if enhancement.for_detectors:
+            return self.main_window.image_viewer.enhancement_cache.get(image_path, frame, enhancement)
+        return frame
 
     def detect_and_update(self, detector_type: str, image_path: str) -> bool:
         """Run a detector and update annotations."""
-        changes_made = False
         detector_name = self.main_window.settings_handler.get_setting(detector_type)
+        annotation_type = {
+            "pupil_detector": "pupil",
+            "iris_detector": "iris",
+            "eyelid_detector": "eyelid_contour",
+        }[detector_type]
 
         # Use threshold detector with ROI if available
         roi = self.main_window.image_viewer.get_roi()
@@ -69,79 +77,64 @@ class AIAssistHandler:
         else:
             detector = None
 
-        if detector:
-            try:
-                if detector_type == "eyelid_detector":
-                    points = detector.detect(image_path)
-                    self.main_window.image_viewer.eyelid_contour_points = list(starmap(QPointF, points))
-                    self.main_window.image_viewer.fitted_eyelid_curve = None  # Clear the fitted curve
-                else:
-                    ellipse, points = detector.detect(image_path)
-                    center = QPointF(ellipse["center"][0], ellipse["center"][1])
-                    size = QSizeF(ellipse["axes"][0], ellipse["axes"][1])
-                    angle = ellipse["angle"]
-                    if detector_type == "pupil_detector":
-                        self.main_window.image_viewer.pupil_ellipse = (
-                            center,
-                            size,
-                            angle,
-                        )
-                        self.main_window.image_viewer.pupil_points = list(starmap(QPointF, points))
-                    else:
-                        self.main_window.image_viewer.iris_ellipse = (
-                            center,
-                            size,
-                            angle,
-                        )
-                        self.main_window.image_viewer.iris_points = list(starmap(QPointF, points))
-                changes_made = True
-            except Exception as e:
-                QMessageBox.warning(
-                    self.main_window,
-                    f"{detector_type.split('_')[0].capitalize()} Detection Error",
-                    f"Error detecting {detector_type.split('_')[0]}: {e!s}",
-                )
+        if not detector:
+            self.main_window.image_viewer.replace_annotation(annotation_type, [], None)
+            return True
+
+        try:
+            result = detector.detect(self.get_detector_input(image_path))
+        except Exception as e:
+            QMessageBox.warning(
+                self.main_window,
+                f"{detector_type.split('_', maxsplit=1)[0].capitalize()} Detection Error",
+                f"Error detecting {detector_type.split('_', maxsplit=1)[0]}: {e!s}",
+            )
+            return False
+
+        if detector_type == "eyelid_detector":
+            points, ellipse = result, None
         else:
-            if detector_type == "pupil_detector":
-                self.main_window.image_viewer.pupil_ellipse = None
-                self.main_window.image_viewer.pupil_points = []
-            elif detector_type == "iris_detector":
-                self.main_window.image_viewer.iris_ellipse = None
-                self.main_window.image_viewer.iris_points = []
-            else:  # eyelid_detector
-                self.main_window.image_viewer.eyelid_contour_points = []
-                self.main_window.image_viewer.fitted_eyelid_curve = None
-            changes_made = True
-        return changes_made
+            detected_ellipse, points = result
+            ellipse = (
+                float(detected_ellipse["center"][0]),
+                float(detected_ellipse["center"][1]),
+                float(detected_ellipse["axes"][0]),
+                float(detected_ellipse["axes"][1]),
+                float(detected_ellipse["angle"]),
+            )
+        self.main_window.image_viewer.replace_annotation(
+            annotation_type,
+            [(float(x), float(y)) for x, y in points],
+            ellipse,
+        )
+        return True
 
     def detect_and_update_glint(self, image_path: str) -> bool:
         """Run glint detector and update glint annotations."""
-        changes_made = False
-
         # Use threshold detector with ROI if available
         roi = self.main_window.image_viewer.get_roi()
-        if roi:
-            # Use threshold glint detector
-            detector = ThresholdGlintDetector(roi=roi)
-
-            try:
-                points = detector.detect(image_path)
-                self.main_window.image_viewer.glint_points = list(starmap(QPointF, points))
-                changes_made = True
-            except Exception as e:
-                QMessageBox.warning(
-                    self.main_window,
-                    "Glint Detection Error",
-                    f"Error detecting glints: {e!s}",
-                )
-        else:
+        if not roi:
             QMessageBox.information(
                 self.main_window,
                 "ROI Required",
                 "Please draw an ROI first before using glint auto-detection.",
             )
+            return False
+
+        # Use threshold glint detector
+        detector = ThresholdGlintDetector(roi=roi)
+        try:
+            points = detector.detect(self.get_detector_input(image_path))
+        except Exception as e:
+            QMessageBox.warning(
+                self.main_window,
+                "Glint Detection Error",
+                f"Error detecting glints: {e!s}",
+            )
+            return False
 
-        return changes_made
+        self.main_window.image_viewer.replace_annotation("glint", [(float(x), float(y)) for x, y in points])
+        return True
 
     def update_annotation_controls(self) -> None:
         """Update annotation controls based on active detectors."""
@@ -3,7 +3,7 @@
 from PyQt5.QtCore import pyqtSignal
 from PyQt5.QtWidgets import QButtonGroup, QHBoxLayout, QLabel, QVBoxLayout, QWidget
 
-from .custom_widgets import AnnotationGroup, EyeSelector, MaterialButton
+from .custom_widgets import AnnotationGroup, DisplayEnhancementGroup, EyeSelector, MaterialButton
 
 
 class AnnotationControlPanel(QWidget):
@@ -21,6 +21,8 @@ class AnnotationControlPanel(QWidget):
     clear_selected_annotation_requested = pyqtSignal()
     roi_toggle_requested = pyqtSignal()
     roi_clear_requested = pyqtSignal()
+    # DisplayEnhancement with the new display settings
+    display_enhancement_changed = pyqtSignal(object)
 
     def __init__(self, parent: QWidget | None = None) -> None:
         """Initialize the AnnotationControlPanel."""
@@ -96,6 +98,10 @@ class AnnotationControlPanel(QWidget):
 
         layout.addStretch(1)
 
+        self.display_group = DisplayEnhancementGroup()
+        self.display_group.enhancement_changed.connect(self.display_enhancement_changed.emit)
+        layout.addWidget(self.display_group)
+
         self.clear_all_button = MaterialButton("Clear All")
         self.clear_all_button.clicked.connect(self.clear_all_requested.emit)
         layout.addWidget(self.clear_all_button)
@@ -1,7 +1,21 @@
 """Custom widget components for the application."""
 
-from PyQt5.QtCore import pyqtSignal
-from PyQt5.QtWidgets import QButtonGroup, QGroupBox, QHBoxLayout, QPushButton, QRadioButton, QVBoxLayout, QWidget
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtWidgets import (
+    QButtonGroup,
+    QCheckBox,
+    QGridLayout,
+    QGroupBox,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QRadioButton,
+    QSlider,
+    QVBoxLayout,
+    QWidget,
+)
+
+from ..utils.display_enhancement import DisplayEnhancement
 
 
 class MaterialButton(QPushButton):
@@ -277,3 +291,123 @@ class EyeSelector(QGroupBox):
             self.left_eye_radio.setChecked(True)
         else:
             self.right_eye_radio.setChecked(True)
+
+
+class DisplayEnhancementGroup(QGroupBox):
+    """Widget for adjusting the display enhancement of the images."""
+
+    # DisplayEnhancement with the new settings
+    enhancement_changed = pyqtSignal(object)
+
+    # Sliders hold hundredths of the gamma and tenths of the CLAHE clip limit
+    GAMMA_SCALE = 100
+    CLIP_LIMIT_SCALE = 10
+
+    def __init__(self, parent: QWidget | None = None) -> None:
+        """Initialize the DisplayEnhancementGroup."""
+        super().__init__("Display", parent)
+        self.setup_ui()
+
+    def setup_ui(self) -> None:
+        """Set up the user interface for the display enhancement group."""
+        self.setStyleSheet(
+            """
+            QGroupBox {
+                border: 1px solid #555;
+                border-radius: 6px;
+                margin-top: 12px;
+                padding-top: 10px;
+                background-color: #2b2b2b;
+            }
+            QGroupBox::title {
+                subcontrol-origin: margin;
+                left: 10px;
+                padding: 0 5px;
+                color: #00bcd4;
+                font-weight: bold;
+            }
+            QLabel, QCheckBox {
+                color: #e0e0e0;
+            }
+        """
+        )
+
+        layout = QGridLayout()
+
+        self.gamma_slider = QSlider(Qt.Horizontal)
+        self.gamma_slider.setRange(20, 400)
+        self.gamma_label = QLabel()
+        layout.addWidget(QLabel("Gamma"), 0, 0)
+        layout.addWidget(self.gamma_slider, 0, 1)
+        layout.addWidget(self.gamma_label, 0, 2)
+
+        self.stretch_check_box = QCheckBox("Contrast stretch")
+        layout.addWidget(self.stretch_check_box, 1, 0, 1, 3)
+
+        self.clahe_check_box = QCheckBox("CLAHE")
+        self.clip_limit_slider = QSlider(Qt.Horizontal)
+        self.clip_limit_slider.setRange(10, 100)
+        self.clip_limit_label = QLabel()
+        layout.addWidget(self.clahe_check_box, 2, 0)
+        layout.addWidget(self.clip_limit_slider, 2, 1)
+        layout.addWidget(self.clip_limit_label, 2, 2)
+
+        self.for_detectors_check_box = QCheckBox("Use for AI assist")
+        self.for_detectors_check_box.setToolTip("Run the detectors on the enhanced images instead of the originals")
+        layout.addWidget(self.for_detectors_check_box, 3, 0, 1, 3)
+
+        self.reset_button = MaterialButton("Reset")
+        self.reset_button.clicked.connect(lambda: self.set_enhancement(DisplayEnhancement(), notify=True))
+        layout.addWidget(self.reset_button, 4, 0, 1, 3)
+
+        self.setLayout(layout)
+        self.set_enhancement(DisplayEnhancement())
+
+        self.gamma_slider.valueChanged.connect(self.on_changed)
+        self.stretch_check_box.toggled.connect(self.on_changed)
+        self.clahe_check_box.toggled.connect(self.on_changed)
+        self.clip_limit_slider.valueChanged.connect(self.on_changed)
+        self.for_detectors_check_box.toggled.connect(self.on_changed)
+
+    def get_enhancement(self) -> DisplayEnhancement:
+        """Get the enhancement settings shown by the controls."""
+        return DisplayEnhancement(
+            gamma=self.gamma_slider.value() / self.GAMMA_SCALE,
+            stretch=self.stretch_check_box.isChecked(),
+            clahe=self.clahe_check_box.isChecked(),
+            clahe_clip_limit=self.clip_limit_slider.value() / self.CLIP_LIMIT_SCALE,
+            for_detectors=self.for_detectors_check_box.isChecked(),
+        )
+
+    def set_enhancement(self, enhancement: DisplayEnhancement, notify: bool = False) -> None:
+        """Show enhancement settings in the controls, emitting ``enhancement_changed`` only if notify is set."""
+        controls = (
+            self.gamma_slider,
+            self.stretch_check_box,
+            self.clahe_check_box,
+            self.clip_limit_slider,
+            self.for_detectors_check_box,
+        )
+        for control in controls:
+            control.blockSignals(True)
+        self.gamma_slider.setValue(round(enhancement.gamma * self.GAMMA_SCALE))
+        self.stretch_check_box.setChecked(enhancement.stretch)
+        self.clahe_check_box.setChecked(enhancement.clahe)
+        self.clip_limit_slider.setValue(round(enhancement.clahe_clip_limit * self.CLIP_LIMIT_SCALE))
+        self.for_detectors_check_box.setChecked(enhancement.for_detectors)
+        for control in controls:
+            control.blockSignals(False)
+        self.update_labels()
+        if notify:
+            self.enhancement_changed.emit(self.get_enhancement())
+
+    def update_labels(self) -> None:
+        """Show the slider values next to the sliders."""
+        self.gamma_label.setText(f"{self.gamma_slider.value() / self.GAMMA_SCALE:.2f}")
+        self.clip_limit_label.setText(f"{self.clip_limit_slider.value() / self.CLIP_LIMIT_SCALE:.1f}")
+        self.clip_limit_slider.setEnabled(self.clahe_check_box.isChecked())
+
+    def on_changed(self) -> None:
+        """Handle a change of any of the controls."""
+        self.update_labels()
+        self.enhancement_changed.emit(self.get_enhancement())
@@ -0,0 +1,92 @@
+"""Thumbnail model of the loaded images for the filmstrip view."""
+
+from collections import OrderedDict
+from collections.abc import Callable
+
+from PyQt5.QtCore import QIdentityProxyModel, QModelIndex, QObject, Qt
+from PyQt5.QtGui import QImage, QPixmap
+
+from ..utils.thumbnail_cache import ThumbnailCache
+
+
+class FilmstripModel(QIdentityProxyModel):
+    """Shows the rows of the image list as thumbnails.
+
+    Thumbnails are requested from the thumbnail cache only when the view draws
+    a row, and the most recently shown ones are kept in memory. A row's
+    thumbnail is rendered again when the status of its image changes, which
+    happens whenever its annotations are saved.
+    """
+
+    MAX_PIXMAPS = 1000
+
+    def __init__(
+        self,
+        thumbnail_cache: ThumbnailCache,
+        request_thumbnail: Callable[[str], None],
+        get_row: Callable[[str], int | None],
+        parent: QObject | None = None,
+    ) -> None:
+        """Initialize the FilmstripModel.
+
+        Args:
+            thumbnail_cache: Delivers the rendered thumbnails.
+            request_thumbnail: Queues the thumbnail of an image by its path.
+            get_row: Returns the row of an image by its path, or None if it is not shown.
+            parent: Parent object.
+
+        """
+        super().__init__(parent)
+        self.request_thumbnail = request_thumbnail
+        self.get_row = get_row
+        self.pixmaps = OrderedDict()
+        thumbnail_cache.thumbnail_ready.connect(self.on_thumbnail_ready)
+
+    def setSourceModel(self, source_model: QObject) -> None:  # noqa: N802
+        """Show the rows of an image list model."""
+        super().setSourceModel(source_model)
+        source_model.dataChanged.connect(self.on_source_data_changed)
+
+    def get_image_path(self, index: QModelIndex) -> str:
+        """Get the path of the image of a row."""
+        source = self.sourceModel()
+        return source.image_paths[source.image_order[index.row()]]
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> object:
+        """Get the thumbnail of a row, with the name and status as tooltip."""
+        if not index.isValid() or role == Qt.DisplayRole:
+            return None
+        if role == Qt.DecorationRole:
+            image_path = self.get_image_path(index)
+            pixmap = self.pixmaps.get(image_path)
+            if pixmap is not None:
+                self.pixmaps.move_to_end(image_path)
+                return pixmap
+            # Repeated requests of a queued thumbnail only move it to the front
+            self.request_thumbnail(image_path)
+            return None
+        if role == Qt.ToolTipRole:
+            return f"{super().data(index, Qt.DisplayRole)}\n{super().data(index, Qt.ToolTipRole)}"
+        return super().data(index, role)
+
+    def on_thumbnail_ready(self, image_path: str, image: QImage) -> None:
+        """Keep a rendered thumbnail and redraw the rows showing it."""
+        self.pixmaps[image_path] = QPixmap.fromImage(image)
+        while len(self.pixmaps) > self.MAX_PIXMAPS:
+            self.pixmaps.popitem(last=False)
+        row = self.get_row(image_path)
+        if row is not None:
+            index = self.index(row, 0)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    def on_source_data_changed(self, top_left: QModelIndex, bottom_right: QModelIndex, roles: list[int]) -> None:
+        """Render the thumbnails of rows again after the status of their images changed."""
+        if roles and Qt.DecorationRole not in roles:
+            return
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            image_path = self.get_image_path(self.index(row, 0))
+            self.pixmaps.pop(image_path, None)
+
+    def clear(self) -> None:
+        """Drop all thumbnails kept in memory."""
+        self.pixmaps.clear()
@@ -0,0 +1,41 @@
+"""Canvas widget that displays the rendered part of a zoomed image."""
+
+from PyQt5.QtCore import QPoint, QRect
+from PyQt5.QtGui import QPainter, QPaintEvent, QPixmap
+from PyQt5.QtWidgets import QWidget
+
+
+class ImageCanvas(QWidget):
+    """Widget sized like the full zoomed image that only holds the rendered viewport region.
+
+    The widget is placed inside a scroll area so scrolling works as if the whole
+    zoomed image existed, while the pixmap it paints only covers the region around
+    the visible viewport. This keeps memory use bounded by the screen size.
+    """
+
+    def __init__(self, parent: QWidget | None = None) -> None:
+        """Initialize the ImageCanvas."""
+        super().__init__(parent)
+        self.pixmap = None
+        self.pixmap_offset = QPoint(0, 0)
+
+    def set_rendered_region(self, pixmap: QPixmap | None, offset: QPoint) -> None:
+        """Set the rendered pixmap and its position in canvas coordinates."""
+        self.pixmap = pixmap
+        self.pixmap_offset = offset
+        self.update()
+
+    def rendered_rect(self) -> QRect:
+        """Get the canvas area covered by the rendered pixmap."""
+        if self.pixmap is None or self.pixmap.isNull():
+            return QRect()
+        return QRect(self.pixmap_offset, self.pixmap.size())
+
+    def paintEvent(self, event: QPaintEvent) -> None:  # noqa: N802
+        """Paint the rendered region at its offset."""
+        if self.pixmap is None or self.pixmap.isNull():
+            return
+        painter = QPainter(self)
+        target = event.rect().intersected(self.rendered_rect())
+        painter.drawPixmap(target, self.pixmap, target.translated(-self.pixmap_offset))
+        painter.end()
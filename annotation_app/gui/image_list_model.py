@@ -0,0 +1,60 @@
+"""List model of the loaded images for the image list view."""
+
+import os
+from collections.abc import Callable
+
+from PyQt5.QtCore import QModelIndex, QObject, QStringListModel, Qt
+
+from .status_icons import status_icon, status_tooltip
+
+
+class ImageListModel(QStringListModel):
+    """Shows the loaded images in the order of the image list.
+
+    The row count and indices stay in the C++ string list, so the view lays out
+    hundreds of thousands of rows without calling into Python per row; status
+    icons and tooltips are produced only when the view draws a visible row.
+    """
+
+    def __init__(self, get_status: Callable[[int], int | None], parent: QObject | None = None) -> None:
+        """Initialize the ImageListModel.
+
+        Args:
+            get_status: Returns the annotation status of an image by its index.
+            parent: Parent object.
+
+        """
+        super().__init__(parent)
+        self.get_status = get_status
+        self.image_paths = []
+        self.image_names = []
+        self.image_order = []
+
+    def set_images(self, image_paths: list[str], image_order: list[int]) -> None:
+        """Show the images at the given indices, in order."""
+        if image_paths is not self.image_paths:
+            self.image_paths = image_paths
+            self.image_names = [os.path.basename(path) for path in image_paths]  # noqa: PTH119
+        self.image_order = image_order
+        self.setStringList([self.image_names[index] for index in image_order])
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> object:
+        """Get the name, status icon, status tooltip or image index of a row."""
+        if not index.isValid():
+            return None
+        if role == Qt.DecorationRole:
+            return status_icon(self.get_status(self.image_order[index.row()]))
+        if role == Qt.ToolTipRole:
+            return status_tooltip(self.get_status(self.image_order[index.row()]))
+        if role == Qt.UserRole:
+            return self.image_order[index.row()]
+        return super().data(index, role)
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlags:  # noqa: PLR6301
+        """Make rows selectable but not editable."""
+        return Qt.ItemIsSelectable | Qt.ItemIsEnabled if index.isValid() else Qt.NoItemFlags
+
+    def refresh_row(self, row: int) -> None:
+        """Redraw a row after the status of its image changed."""
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DecorationRole, Qt.ToolTipRole])
@@ -1,13 +1,65 @@
 """Image viewer widget for displaying and annotating eye images."""
 
-from collections import deque
+import math
+import time
 
 import numpy as np
-from PyQt5.QtCore import QEvent, QPoint, QPointF, QSizeF, Qt, pyqtSignal
-from PyQt5.QtGui import QColor, QKeyEvent, QPainter, QPen, QPixmap
+from PyQt5.QtCore import QEvent, QPoint, QPointF, QRect, QRectF, QSize, Qt, QTimer, pyqtSignal
+from PyQt5.QtGui import (
+    QColor,
+    QFont,
+    QFontMetrics,
+    QKeyEvent,
+    QPainter,
+    QPen,
+    QPixmap,
+    QPolygonF,
+    QResizeEvent,
+)
 from PyQt5.QtWidgets import QLabel, QMessageBox, QScrollArea, QVBoxLayout, QWidget
 
+from annotation_sdk.model import ANNOTATION_TYPES, EYES, Ellipse, EyeAnnotation, Point
+
+from ..utils.annotation_io import points_to_polygon
+from ..utils.display_enhancement import DisplayEnhancement, EnhancementCache
+from ..utils.edit_history import (
+    AddPointCommand,
+    CompoundCommand,
+    DeletePointCommand,
+    EditCommand,
+    EditHistory,
+    MovePointCommand,
+    ReplaceAnnotationCommand,
+    SetEllipseCommand,
+    SetRoiCommand,
+    SwitchEyeCommand,
+    TranslatePointsCommand,
+)
+from ..utils.edit_journal import EditJournal
+from ..utils.frame_cache import array_to_qimage
 from ..utils.image_processing import find_closest_point, fit_ellipse
+from ..utils.performance_monitor import RenderStats
+from .image_canvas import ImageCanvas
+
+# Extra pixels rendered around the visible viewport so small scrolls don't need a re-render
+RENDER_MARGIN = 128
+
+# Idle time after the last input event before the view is re-rendered with smooth scaling
+SMOOTH_RENDER_DELAY_MS = 150
+
+# Point markers are round dots of this diameter, eye labels are offset from the point
+POINT_DIAMETER = 6
+LABEL_OFFSET = QPointF(6, -4)
+LABEL_POINT_SIZE = 8
+
+# Refresh interval of the performance HUD while it is visible
+HUD_REFRESH_MS = 500
+
+# Mouse moves during drags are applied at most once per display frame
+MOVE_COALESCE_MS = 16
+
+# Display enhancement changes from dragged sliders are applied at most once per display frame
+ENHANCEMENT_COALESCE_MS = 16
 
 
 class ImageViewer(QWidget):
@@ -15,6 +67,7 @@ class ImageViewer(QWidget):
 
     annotation_changed = pyqtSignal()
     annotation_type_changed = pyqtSignal(str)
+    current_eye_changed = pyqtSignal(str)
 
     def __init__(self, parent: QWidget | None = None) -> None:
         """Initialize the ImageViewer."""
@@ -31,55 +84,69 @@ class ImageViewer(QWidget):
     def setup_ui(self) -> None:
         """Set up the user interface components."""
         layout = QVBoxLayout()
-        self.image_label = QLabel()
-        self.image_label.setAlignment(Qt.AlignCenter)
+        self.image_canvas = ImageCanvas()
         self.scroll_area = QScrollArea()
-        self.scroll_area.setWidget(self.image_label)
+        self.scroll_area.setWidget(self.image_canvas)
         self.scroll_area.setAlignment(Qt.AlignCenter)
         layout.addWidget(self.scroll_area)
         self.setLayout(layout)
 
         self.scroll_area.viewport().installEventFilter(self)
+        self.scroll_area.horizontalScrollBar().valueChanged.connect(self.on_viewport_changed)
+        self.scroll_area.verticalScrollBar().valueChanged.connect(self.on_viewport_changed)
+
+        # Fast scaling is used while input events stream in, then one smooth render on idle
+        self.smooth_render_timer = QTimer(self)
+        self.smooth_render_timer.setSingleShot(True)
+        self.smooth_render_timer.setInterval(SMOOTH_RENDER_DELAY_MS)
+        self.smooth_render_timer.timeout.connect(self.finish_interaction)
+
+        # Pending drag moves are applied once per frame with the latest position
+        self.move_timer = QTimer(self)
+        self.move_timer.setSingleShot(True)
+        self.move_timer.setInterval(MOVE_COALESCE_MS)
+        self.move_timer.timeout.connect(self.apply_pending_move)
+
+        # Pending display enhancement changes are applied once per frame with the latest settings
+        self.enhancement_timer = QTimer(self)
+        self.enhancement_timer.setSingleShot(True)
+        self.enhancement_timer.setInterval(ENHANCEMENT_COALESCE_MS)
+        self.enhancement_timer.timeout.connect(self.apply_display_enhancement)
+
+        # Performance HUD drawn over the top-left corner of the viewport
+        self.render_stats = RenderStats()
+        # Frame cache whose statistics are shown in the HUD, set by the main window
+        self.frame_cache = None
+        self.performance_hud = QLabel(self.scroll_area.viewport())
+        self.performance_hud.setStyleSheet(
+            "background-color: rgba(0, 0, 0, 160); color: #e0e0e0; font-family: monospace; padding: 4px;"
+        )
+        self.performance_hud.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.performance_hud.move(8, 8)
+        self.performance_hud.hide()
+        self.hud_timer = QTimer(self)
+        self.hud_timer.setInterval(HUD_REFRESH_MS)
+        self.hud_timer.timeout.connect(self.update_performance_hud)
 
     def setup_variables(self) -> None:
         """Initialize instance variables."""
         self.factor = 1.0
         self.current_eye = "left"
 
-        # Store annotations for both eyes separately
-        self.eye_data = {
-            "left": {
-                "pupil_points": [],
-                "iris_points": [],
-                "eyelid_contour_points": [],
-                "glint_points": [],
-                "pupil_ellipse": None,
-                "iris_ellipse": None,
-                "roi": None,  # (x, y, width, height)
-            },
-            "right": {
-                "pupil_points": [],
-                "iris_points": [],
-                "eyelid_contour_points": [],
-                "glint_points": [],
-                "pupil_ellipse": None,
-                "iris_ellipse": None,
-                "roi": None,  # (x, y, width, height)
-            },
-        }
-
-        # Current working data (references to current eye data)
-        self.pupil_points = []
-        self.iris_points = []
-        self.eyelid_contour_points = []
-        self.glint_points = []
-        self.pupil_ellipse = None
-        self.iris_ellipse = None
-        self.roi = None  # Current eye's ROI
+        # Annotations of both eyes, edited in place
+        self.annotations = {eye: EyeAnnotation() for eye in EYES}
+        # Annotations of the active eye
+        self.eye_annotation = self.annotations[self.current_eye]
 
         self.current_annotation = "pupil"
         self.original_pixmap = None
-        self.selected_point = None
+        # Decoded image the pixmap is rendered from, enhanced for display only
+        self.frame = None
+        self.frame_path = None
+        self.display_enhancement = DisplayEnhancement()
+        self.enhancement_cache = EnhancementCache()
+        # Index of the selected point of the current annotation type
+        self.selected_index = None
         self.moving_point = False
         self.panning = False
         self.last_pan_pos = None
@@ -88,6 +155,10 @@ class ImageViewer(QWidget):
         self.shift_pressed = False
         self.last_mouse_pos = None
         self.moving_all_points = False
+        # Start of the current point drag, used to record it as one undoable edit
+        self.drag_press_pos = None
+        self.drag_start_index = None
+        self.drag_start_point = None
 
         # ROI drawing variables
         self.roi_drawing_mode = False
@@ -96,6 +167,12 @@ class ImageViewer(QWidget):
         self.moving_roi = False
         self.resizing_roi = False
         self.roi_resize_handle = None  # 'tl', 'tr', 'bl', 'br' for corners
+        self.roi_before_edit = None
+
+        # Set while zooming, panning or dragging so renders use fast scaling
+        self.interacting = False
+        # Latest cursor position of a drag that has not been applied yet
+        self.pending_move_pos = None
 
     def setup_colors(self) -> None:
         # Define colors with transparency
@@ -117,59 +194,34 @@ class ImageViewer(QWidget):
 
         self.roi_color = QColor(0, 188, 212, 255)  # Cyan
 
+        # Pre-rendered eye label glyphs keyed by (label, rgba)
+        self.label_glyphs = {}
+
     def setup_undo_system(self) -> None:
         """Initialize the undo/redo system."""
-        self.undo_stack = deque(maxlen=10)
-        self.undo_index = -1
-
-    def save_current_eye_data(self) -> None:
-        """Save the current working data back to the eye_data dictionary."""
-        self.eye_data[self.current_eye]["pupil_points"] = self.pupil_points.copy()
-        self.eye_data[self.current_eye]["iris_points"] = self.iris_points.copy()
-        self.eye_data[self.current_eye]["eyelid_contour_points"] = self.eyelid_contour_points.copy()
-        self.eye_data[self.current_eye]["glint_points"] = self.glint_points.copy()
-        self.eye_data[self.current_eye]["pupil_ellipse"] = self.pupil_ellipse
-        self.eye_data[self.current_eye]["iris_ellipse"] = self.iris_ellipse
-        self.eye_data[self.current_eye]["roi"] = self.roi
-
-    def load_current_eye_data(self) -> None:
-        """Load the data for the current eye into working variables."""
-        self.pupil_points = self.eye_data[self.current_eye]["pupil_points"].copy()
-        self.iris_points = self.eye_data[self.current_eye]["iris_points"].copy()
-        self.eyelid_contour_points = self.eye_data[self.current_eye]["eyelid_contour_points"].copy()
-        self.glint_points = self.eye_data[self.current_eye]["glint_points"].copy()
-        self.pupil_ellipse = self.eye_data[self.current_eye]["pupil_ellipse"]
-        self.iris_ellipse = self.eye_data[self.current_eye]["iris_ellipse"]
-        self.roi = self.eye_data[self.current_eye]["roi"]
+        self.history = EditHistory()
+        # Optional on-disk journal that every edit, undo and redo is appended to
+        self.journal = None
+
+    def set_undo_limits(self, max_depth: int, max_bytes: int) -> None:
+        """Set the maximum undo depth and memory budget of the edit history."""
+        self.history.set_limits(max_depth, max_bytes)
 
     def switch_eye(self, eye: str) -> None:
         """Switch between left and right eye annotations."""
-        if eye not in {"left", "right"}:
+        if eye not in {"left", "right"} or eye == self.current_eye:
             return
+        self.execute_command(SwitchEyeCommand(self.current_eye, eye))
 
-        # Save current eye data before switching
-        self.save_current_eye_data()
+    def get_all_eye_data(self) -> dict[str, EyeAnnotation]:
+        """Get copy-on-write snapshots of the annotations of both eyes."""
+        return {eye: annotation.snapshot() for eye, annotation in self.annotations.items()}
 
-        # Switch to new eye
-        self.current_eye = eye
-
-        # Load new eye data
-        self.load_current_eye_data()
-
-        # Update display
-        self.update_image()
-        self.annotation_changed.emit()
-
-    def get_all_eye_data(self) -> dict:
-        """Get annotation data for both eyes."""
-        # Save current working data first
-        self.save_current_eye_data()
-        return self.eye_data.copy()
-
-    def set_all_eye_data(self, eye_data: dict) -> None:
+    def set_all_eye_data(self, eye_data: dict[str, EyeAnnotation]) -> None:
         """Set annotation data for both eyes."""
-        self.eye_data = eye_data.copy()
-        self.load_current_eye_data()
+        self.annotations = {eye: eye_data[eye].snapshot() for eye in EYES}
+        self.eye_annotation = self.annotations[self.current_eye]
+        self.selected_index = None
         self.update_image()
 
     def toggle_roi_mode(self) -> None:
@@ -185,62 +237,126 @@ class ImageViewer(QWidget):
 
     def get_roi(self) -> tuple | None:
         """Get the current eye's ROI."""
-        return self.roi
+        return self.eye_annotation.roi
 
     def clear_roi(self) -> None:
         """Clear the current eye's ROI."""
-        self.roi = None
-        self.save_current_eye_data()
+        if self.eye_annotation.roi is not None:
+            self.execute_command(SetRoiCommand(self.current_eye, self.eye_annotation.roi, None))
+
+    def reset_undo_stack(self) -> None:
+        """Discard the undo and redo history."""
+        self.history.clear()
+
+    def set_journal(self, journal: EditJournal | None) -> None:
+        """Set the journal that edits are recorded to."""
+        self.journal = journal
+
+    def restore_history(self, undo_commands: list[EditCommand], redo_commands: list[EditCommand]) -> None:
+        """Restore an undo history whose commands are already reflected in the annotations."""
+        self.history.restore(undo_commands, redo_commands)
+
+    def replay_edits(self, operations: list[tuple[str, EditCommand | None]]) -> None:
+        """Re-apply edits read from a journal on top of the current annotations.
+
+        Args:
+            operations: ("do", command), ("undo", None) or ("redo", None) tuples in order.
+
+        """
+        for operation, command in operations:
+            if operation == "do":
+                command.apply(self)
+                self.history.push(command)
+            elif operation == "undo":
+                self.history.undo(self)
+            else:  # redo
+                self.history.redo(self)
+        self.selected_index = None
+        self.commit_edit()
+
+    def execute_command(self, command: EditCommand) -> None:
+        """Apply an edit command and add it to the undo history."""
+        command.apply(self)
+        self.record_command(command)
+
+    def record_command(self, command: EditCommand) -> None:
+        """Add an already applied edit command to the undo history."""
+        self.history.push(command)
+        if self.journal is not None:
+            self.journal.record_command(command)
+        self.commit_edit()
+
+    def commit_edit(self) -> None:
+        """Notify listeners about an edit and refresh the display."""
         self.annotation_changed.emit()
         self.update_image()
 
-    def reset_undo_stack(self, initial_state: dict | None = None) -> None:
-        """Reset the undo stack to initial state."""
-        self.undo_stack.clear()
-        self.undo_index = -1
-        if initial_state is None:
-            initial_state = self.get_current_state()
-        self.undo_stack.append(initial_state)
-        self.undo_index = 0
-
-    def get_current_state(self) -> dict:
-        """Get the current state of all annotations."""
-        return {
-            "pupil_points": self.pupil_points.copy(),
-            "iris_points": self.iris_points.copy(),
-            "eyelid_contour_points": self.eyelid_contour_points.copy(),
-            "glint_points": self.glint_points.copy(),
-            "pupil_ellipse": self.pupil_ellipse,
-            "iris_ellipse": self.iris_ellipse,
-        }
-
-    def save_state(self) -> None:
-        """Save the current state to the undo stack."""
-        state = self.get_current_state()
-        if self.undo_index < len(self.undo_stack) - 1:
-            # If we're not at the end of the stack, remove future states
-            self.undo_stack = deque(list(self.undo_stack)[: self.undo_index + 1], maxlen=5)
-        self.undo_stack.append(state)
-        self.undo_index = len(self.undo_stack) - 1
-
     def can_undo(self) -> bool:
         """Check if undo operation is available."""
-        return self.undo_index > 0
+        return self.history.can_undo()
+
+    def can_redo(self) -> bool:
+        """Check if redo operation is available."""
+        return self.history.can_redo()
 
     def undo(self) -> None:
         """Undo the last annotation change."""
-        if self.can_undo():
-            self.undo_index -= 1
-            state = self.undo_stack[self.undo_index]
-            self.pupil_points = state["pupil_points"].copy()
-            self.iris_points = state["iris_points"].copy()
-            self.eyelid_contour_points = state.get("eyelid_contour_points", []).copy()
-            self.glint_points = state.get("glint_points", []).copy()
-            self.pupil_ellipse = state["pupil_ellipse"]
-            self.iris_ellipse = state["iris_ellipse"]
-            self.save_current_eye_data()
-            self.update_image()
-            self.annotation_changed.emit()
+        if self.history.undo(self) is not None:
+            if self.journal is not None:
+                self.journal.record_undo()
+            self.selected_index = None
+            self.commit_edit()
+
+    def redo(self) -> None:
+        """Redo the last undone annotation change."""
+        if self.history.redo(self) is not None:
+            if self.journal is not None:
+                self.journal.record_redo()
+            self.selected_index = None
+            self.commit_edit()
+
+    def get_points(self, eye: str, kind: str) -> np.ndarray:
+        """Get the (N, 2) point array of an annotation type."""
+        return self.annotations[eye].get_points(kind)
+
+    def get_ellipse(self, kind: str) -> Ellipse | None:
+        """Get the current eye's ellipse of an annotation type."""
+        return self.eye_annotation.get_ellipse(kind)
+
+    def insert_point(self, eye: str, kind: str, index: int, point: Point) -> None:
+        """Insert a point into an annotation type."""
+        self.annotations[eye].insert_point(kind, index, point)
+
+    def remove_point(self, eye: str, kind: str, index: int) -> None:
+        """Remove a point from an annotation type."""
+        self.annotations[eye].remove_point(kind, index)
+
+    def set_point(self, eye: str, kind: str, index: int, point: Point) -> None:
+        """Replace a single point of an annotation type."""
+        self.annotations[eye].set_point(kind, index, point)
+
+    def translate_points(self, eye: str, kind: str, delta_x: float, delta_y: float) -> None:
+        """Move all points of an annotation type."""
+        self.annotations[eye].translate_points(kind, delta_x, delta_y)
+
+    def set_points(self, eye: str, kind: str, points: list[Point]) -> None:
+        """Replace all points of an annotation type."""
+        self.annotations[eye].set_points(kind, points)
+
+    def set_ellipse(self, eye: str, kind: str, ellipse: Ellipse | None) -> None:
+        """Set the fitted ellipse of an annotation type."""
+        self.annotations[eye].set_ellipse(kind, ellipse)
+
+    def set_roi(self, eye: str, roi: tuple | None) -> None:
+        """Set the ROI of an eye."""
+        self.annotations[eye].roi = roi
+
+    def set_current_eye(self, eye: str) -> None:
+        """Make an eye the active one, keeping the eye selector in sync."""
+        self.current_eye = eye
+        self.eye_annotation = self.annotations[eye]
+        self.selected_index = None
+        self.current_eye_changed.emit(eye)
 
     def keyPressEvent(self, event: QKeyEvent) -> None:  # noqa: N802
         """Handle key press events."""
@@ -263,23 +379,17 @@ class ImageViewer(QWidget):
 
     def delete_selected_point(self) -> None:
         """Delete the currently selected point."""
-        if self.selected_point:
-            if self.current_annotation == "pupil":
-                points = self.pupil_points
-            elif self.current_annotation == "iris":
-                points = self.iris_points
-            elif self.current_annotation == "eyelid_contour":
-                points = self.eyelid_contour_points
-            else:  # glint
-                points = self.glint_points
-
-            if self.selected_point in points:
-                points.remove(self.selected_point)
-                self.selected_point = None
-                self.save_state()
-                self.save_current_eye_data()
-                self.annotation_changed.emit()
-                self.update_image()
+        if self.selected_index is not None:
+            index = self.selected_index
+            self.selected_index = None
+            self.execute_command(
+                DeletePointCommand(
+                    self.current_eye,
+                    self.current_annotation,
+                    index,
+                    self.eye_annotation.get_point(self.current_annotation, index),
+                )
+            )
 
     def mousePressEvent(self, event: QEvent) -> None:  # noqa: N802
         """Handle mouse press events."""
@@ -292,8 +402,9 @@ class ImageViewer(QWidget):
             if image_pos:
                 # Handle ROI mode first
                 if self.roi_drawing_mode:
+                    self.roi_before_edit = self.eye_annotation.roi
                     # Check if clicking on ROI for moving/resizing
-                    if self.roi:
+                    if self.eye_annotation.roi:
                         handle = self.get_roi_handle_at_pos(image_pos)
                         if handle:
                             self.resizing_roi = True
@@ -307,12 +418,12 @@ class ImageViewer(QWidget):
                     # Start drawing new ROI
                     self.drawing_roi = True
                     self.roi_start_pos = image_pos
-                    self.roi = None  # Clear existing ROI
+                    self.eye_annotation.roi = None  # Clear existing ROI
                     return
 
-                self.selected_point, selected_annotation = self.find_closest_point_and_type(image_pos)
+                self.selected_index, selected_annotation = self.find_closest_point_and_type(image_pos)
 
-                if self.selected_point:
+                if self.selected_index is not None:
                     self.moving_point = True
                     self.last_mouse_pos = image_pos
                     self.moving_all_points = self.shift_pressed
@@ -320,29 +431,50 @@ class ImageViewer(QWidget):
                     if selected_annotation != self.current_annotation:
                         self.current_annotation = selected_annotation
                         self.annotation_type_changed.emit(self.current_annotation)
-                elif self.current_annotation == "pupil":
-                    self.pupil_points.append(image_pos)
-                elif self.current_annotation == "iris":
-                    self.iris_points.append(image_pos)
-                elif self.current_annotation == "eyelid_contour":
-                    self.eyelid_contour_points.append(image_pos)
-                else:  # glint
-                    self.glint_points.append(image_pos)
-
-                self.save_state()
-                self.save_current_eye_data()
-                self.annotation_changed.emit()
-                self.update_image()
+
+                    # Remember where the drag started so it is undone as a single edit
+                    self.drag_press_pos = image_pos
+                    self.drag_start_index = self.selected_index
+                    self.drag_start_point = self.eye_annotation.get_point(self.current_annotation, self.selected_index)
+                    self.update_image()
+                else:
+                    points = self.get_points(self.current_eye, self.current_annotation)
+                    self.execute_command(
+                        AddPointCommand(
+                            self.current_eye,
+                            self.current_annotation,
+                            len(points),
+                            (image_pos.x(), image_pos.y()),
+                        )
+                    )
 
     def mouseMoveEvent(self, event: QEvent) -> None:  # noqa: N802
-        """Handle mouse move events."""
+        """Handle mouse move events.
+
+        Moves during a pan or drag are coalesced, so the annotation state is mutated and
+        re-rendered at most once per frame with the latest cursor position.
+        """
+        if self.panning or self.drawing_roi or self.moving_roi or self.resizing_roi or self.moving_point:
+            self.begin_interaction()
+            self.pending_move_pos = event.pos()
+            if not self.move_timer.isActive():
+                self.move_timer.start()
+
+    def apply_pending_move(self) -> None:
+        """Apply the latest coalesced mouse move of a pan or drag."""
+        self.move_timer.stop()
+        pos = self.pending_move_pos
+        self.pending_move_pos = None
+        if pos is None:
+            return
+
         if self.panning:
-            delta = event.pos() - self.last_pan_pos
+            delta = pos - self.last_pan_pos
             self.scroll_area.horizontalScrollBar().setValue(self.scroll_area.horizontalScrollBar().value() - delta.x())
             self.scroll_area.verticalScrollBar().setValue(self.scroll_area.verticalScrollBar().value() - delta.y())
-            self.last_pan_pos = event.pos()
+            self.last_pan_pos = pos
         elif self.drawing_roi or self.moving_roi or self.resizing_roi:
-            new_pos = self.get_image_position(event.pos())
+            new_pos = self.get_image_position(pos)
             if new_pos and self.roi_start_pos:
                 if self.drawing_roi:
                     # Update ROI as user drags
@@ -350,17 +482,17 @@ class ImageViewer(QWidget):
                     y = min(self.roi_start_pos.y(), new_pos.y())
                     w = abs(new_pos.x() - self.roi_start_pos.x())
                     h = abs(new_pos.y() - self.roi_start_pos.y())
-                    self.roi = (x, y, w, h)
-                elif self.moving_roi and self.roi:
+                    self.eye_annotation.roi = (x, y, w, h)
+                elif self.moving_roi and self.eye_annotation.roi:
                     # Move entire ROI
                     delta_x = new_pos.x() - self.roi_start_pos.x()
                     delta_y = new_pos.y() - self.roi_start_pos.y()
-                    x, y, w, h = self.roi
-                    self.roi = (x + delta_x, y + delta_y, w, h)
+                    x, y, w, h = self.eye_annotation.roi
+                    self.eye_annotation.roi = (x + delta_x, y + delta_y, w, h)
                     self.roi_start_pos = new_pos
-                elif self.resizing_roi and self.roi:
+                elif self.resizing_roi and self.eye_annotation.roi:
                     # Resize ROI based on handle
-                    x, y, w, h = self.roi
+                    x, y, w, h = self.eye_annotation.roi
                     if "t" in self.roi_resize_handle:  # top
                         delta_y = new_pos.y() - y
                         y = new_pos.y()
@@ -373,10 +505,10 @@ class ImageViewer(QWidget):
                         w -= delta_x
                     if "r" in self.roi_resize_handle:  # right
                         w = new_pos.x() - x
-                    self.roi = (x, y, max(10, w), max(10, h))  # Minimum size 10x10
+                    self.eye_annotation.roi = (x, y, max(10, w), max(10, h))  # Minimum size 10x10
                 self.update_image()
-        elif self.moving_point and self.selected_point:
-            new_pos = self.get_image_position(event.pos())
+        elif self.moving_point and self.selected_index is not None:
+            new_pos = self.get_image_position(pos)
             if new_pos and self.last_mouse_pos:
                 # Calculate the movement delta
                 delta_x = new_pos.x() - self.last_mouse_pos.x()
@@ -384,35 +516,19 @@ class ImageViewer(QWidget):
 
                 if self.moving_all_points:
                     # Move all points in the current annotation type
-                    if self.current_annotation == "pupil":
-                        self.move_points_by_delta(self.pupil_points, delta_x, delta_y)
-                    elif self.current_annotation == "iris":
-                        self.move_points_by_delta(self.iris_points, delta_x, delta_y)
-                    elif self.current_annotation == "eyelid_contour":
-                        self.move_points_by_delta(self.eyelid_contour_points, delta_x, delta_y)
-                    else:  # glint
-                        self.move_points_by_delta(self.glint_points, delta_x, delta_y)
-                # Move only the selected point
-                elif self.current_annotation == "pupil":
-                    index = self.pupil_points.index(self.selected_point)
-                    self.pupil_points[index] = new_pos
-                elif self.current_annotation == "iris":
-                    index = self.iris_points.index(self.selected_point)
-                    self.iris_points[index] = new_pos
-                elif self.current_annotation == "eyelid_contour":
-                    index = self.eyelid_contour_points.index(self.selected_point)
-                    self.eyelid_contour_points[index] = new_pos
-                else:  # glint
-                    index = self.glint_points.index(self.selected_point)
-                    self.glint_points[index] = new_pos
-
-                self.selected_point = new_pos
+                    self.eye_annotation.translate_points(self.current_annotation, delta_x, delta_y)
+                else:
+                    # Move only the selected point
+                    self.eye_annotation.set_point(
+                        self.current_annotation, self.selected_index, (new_pos.x(), new_pos.y())
+                    )
+
                 self.last_mouse_pos = new_pos
-                self.save_current_eye_data()
                 self.update_image()
 
     def mouseReleaseEvent(self, event: QEvent) -> None:  # noqa: N802
         """Handle mouse release events."""
+        self.apply_pending_move()
         if event.button() == Qt.MiddleButton:
             self.panning = False
             self.setCursor(Qt.ArrowCursor)
@@ -423,16 +539,35 @@ class ImageViewer(QWidget):
                 self.moving_roi = False
                 self.resizing_roi = False
                 self.roi_resize_handle = None
-                if self.roi:
-                    self.save_current_eye_data()
-                    self.annotation_changed.emit()
+                if self.eye_annotation.roi != self.roi_before_edit:
+                    self.record_command(SetRoiCommand(self.current_eye, self.roi_before_edit, self.eye_annotation.roi))
                 return
 
             self.moving_point = False
-            if self.selected_point:
-                self.save_state()
-                self.save_current_eye_data()
-                self.annotation_changed.emit()
+            if self.selected_index is not None and self.drag_start_point is not None:
+                self.record_drag()
+
+    def record_drag(self) -> None:
+        """Add the finished point drag to the undo history."""
+        if self.moving_all_points:
+            delta = self.last_mouse_pos - self.drag_press_pos
+            command = TranslatePointsCommand(self.current_eye, self.current_annotation, delta.x(), delta.y())
+            moved = delta != QPointF(0, 0)
+        else:
+            new_point = self.eye_annotation.get_point(self.current_annotation, self.drag_start_index)
+            command = MovePointCommand(
+                self.current_eye,
+                self.current_annotation,
+                self.drag_start_index,
+                self.drag_start_point,
+                new_point,
+            )
+            moved = new_point != self.drag_start_point
+        self.drag_press_pos = None
+        self.drag_start_index = None
+        self.drag_start_point = None
+        if moved:
+            self.record_command(command)
 
     def wheelEvent(self, event: QEvent) -> None:  # noqa: N802
         """Handle mouse wheel events for zooming."""
@@ -444,21 +579,52 @@ class ImageViewer(QWidget):
             # Only allow scrolling when not zooming
             super().wheelEvent(event)
 
-    def load_image(self, image_path: str) -> bool:
-        """Load an image from the given path."""
-        self.original_pixmap = QPixmap(image_path)
-        if self.original_pixmap.isNull():
+    def load_image(self, image_path: str, frame: np.ndarray | None) -> bool:
+        """Show a decoded image, or return False if it could not be decoded."""
+        if frame is None:
             return False
-        self.pupil_points = []
-        self.iris_points = []
-        self.pupil_ellipse = None
-        self.iris_ellipse = None
-        self.reset_undo_stack()  # This will now save the empty state
-        self.update_image()
+        self.frame_path = image_path
+        self.frame = frame
+        self.original_pixmap = self.render_frame()
+        self.set_all_eye_data({eye: EyeAnnotation() for eye in EYES})
+        self.reset_undo_stack()  # History of the previous image does not apply here
         return True
 
+    def replace_frame(self, frame: np.ndarray) -> None:
+        """Show a new decoding of the current image, keeping its annotations and undo history."""
+        self.frame = frame
+        self.original_pixmap = self.render_frame()
+        self.update_image()
+
+    def render_frame(self) -> QPixmap:
+        """Get the pixmap of the current decoded image with the display enhancement applied."""
+        frame = self.enhancement_cache.get(self.frame_path, self.frame, self.display_enhancement)
+        # The pixmap is a copy, so the wrapped array only has to live through this call
+        return QPixmap.fromImage(array_to_qimage(frame))
+
+    def set_display_enhancement(self, enhancement: DisplayEnhancement) -> None:
+        """Change the display enhancement, applied once per frame while sliders are dragged."""
+        self.display_enhancement = enhancement
+        # Restarting a running timer would hold back the update for as long as the slider moves
+        if not self.enhancement_timer.isActive():
+            self.enhancement_timer.start()
+
+    def apply_display_enhancement(self) -> None:
+        """Render the current image again with the latest display enhancement."""
+        if self.frame is not None:
+            self.original_pixmap = self.render_frame()
+            self.update_image()
+
     def eventFilter(self, source: QWidget, event: QEvent) -> bool:  # noqa: N802
         """Filter events for window state changes."""
+        if source == self.scroll_area.viewport() and event.type() in {
+            QEvent.MouseButtonPress,
+            QEvent.MouseButtonRelease,
+            QEvent.MouseMove,
+            QEvent.Wheel,
+        }:
+            self.render_stats.record_event()
+
         if (
             source == self.scroll_area.viewport()
             and event.type() == QEvent.Wheel
@@ -479,6 +645,11 @@ class ImageViewer(QWidget):
             self.factor /= 1.1
 
         self.factor = max(0.1, min(25, self.factor))  # Limit zoom level
+        self.begin_interaction()
+
+        # Resize the canvas first so the scroll bars have the new range
+        if self.original_pixmap is not None and not self.original_pixmap.isNull():
+            self.image_canvas.resize(self.scaled_image_size())
 
         # Calculate the new scroll position to keep the point under the cursor fixed
         viewport_center = self.scroll_area.viewport().rect().center()
@@ -493,31 +664,120 @@ class ImageViewer(QWidget):
 
         self.update_image()
 
+    def toggle_performance_hud(self) -> None:
+        """Show or hide the render performance HUD."""
+        if self.performance_hud.isVisible():
+            self.hud_timer.stop()
+            self.performance_hud.hide()
+        else:
+            self.update_performance_hud()
+            self.performance_hud.show()
+            self.performance_hud.raise_()
+            self.hud_timer.start()
+
+    def update_performance_hud(self) -> None:
+        """Refresh the text of the performance HUD."""
+        summary = self.render_stats.summary()
+        if self.frame_cache is not None:
+            summary = f"{summary}\n{self.frame_cache.summary()}"
+        self.performance_hud.setText(summary)
+        self.performance_hud.adjustSize()
+
+    def begin_interaction(self) -> None:
+        """Switch to fast rendering until input has been idle for a short time."""
+        self.interacting = True
+        self.smooth_render_timer.start()
+
+    def finish_interaction(self) -> None:
+        """Re-render the view once with smooth scaling after interaction stops."""
+        if self.interacting:
+            self.interacting = False
+            self.update_image()
+
+    def scaled_image_size(self) -> QSize:
+        """Get the size of the whole image at the current zoom factor."""
+        return QSize(
+            max(1, round(self.original_pixmap.width() * self.factor)),
+            max(1, round(self.original_pixmap.height() * self.factor)),
+        )
+
+    def visible_canvas_rect(self, margin: int = 0) -> QRect:
+        """Get the part of the canvas visible in the viewport, grown by a margin."""
+        viewport = self.scroll_area.viewport()
+        top_left = self.image_canvas.mapFrom(viewport, QPoint(0, 0))
+        visible = QRect(top_left, viewport.size()).adjusted(-margin, -margin, margin, margin)
+        return visible.intersected(self.image_canvas.rect())
+
+    def on_viewport_changed(self) -> None:
+        """Re-render when scrolling exposes canvas area outside the rendered region."""
+        if self.original_pixmap is None or self.original_pixmap.isNull():
+            return
+        if not self.image_canvas.rendered_rect().contains(self.visible_canvas_rect()):
+            self.begin_interaction()
+            self.update_image()
+
+    def resizeEvent(self, event: QResizeEvent) -> None:  # noqa: N802
+        """Handle resize events by re-rendering the newly visible region."""
+        super().resizeEvent(event)
+        self.on_viewport_changed()
+
     def update_image(self) -> None:
-        """Update the displayed image with annotations."""
+        """Update the displayed image with annotations.
+
+        Only the region around the visible viewport is scaled and drawn, so memory use
+        at high zoom is bounded by the screen size instead of the image size. While the
+        user is interacting, fast scaling is used and a smooth render follows on idle.
+        """
         if self.original_pixmap is None or self.original_pixmap.isNull():
             return
-        scaled_pixmap = self.original_pixmap.scaled(
-            self.original_pixmap.size() * self.factor,
-            Qt.KeepAspectRatio,
-            Qt.SmoothTransformation,
+        self.image_canvas.resize(self.scaled_image_size())
+        region = self.visible_canvas_rect(RENDER_MARGIN)
+        if region.isEmpty():
+            return
+        start_time = time.perf_counter()
+
+        # Source rectangle in image pixels covering the region
+        x0 = math.floor(region.left() / self.factor)
+        y0 = math.floor(region.top() / self.factor)
+        x1 = math.ceil((region.right() + 1) / self.factor)
+        y1 = math.ceil((region.bottom() + 1) / self.factor)
+        source_rect = QRect(x0, y0, x1 - x0, y1 - y0).intersected(self.original_pixmap.rect())
+        offset = QPoint(round(source_rect.x() * self.factor), round(source_rect.y() * self.factor))
+
+        scaled_pixmap = self.original_pixmap.copy(source_rect).scaled(
+            max(1, round(source_rect.width() * self.factor)),
+            max(1, round(source_rect.height() * self.factor)),
+            Qt.IgnoreAspectRatio,
+            Qt.FastTransformation if self.interacting else Qt.SmoothTransformation,
         )
         self.pixmap = QPixmap(scaled_pixmap.size())
         self.pixmap.fill(Qt.transparent)
         painter = QPainter(self.pixmap)
         painter.drawPixmap(0, 0, scaled_pixmap)
+        scaled_time = time.perf_counter()
+
+        # Annotations are drawn in canvas coordinates
+        painter.translate(-offset)
 
         # Draw both eyes' annotations
         self.draw_eye_annotations(painter, "left")
         self.draw_eye_annotations(painter, "right")
 
         # Draw ROI if it exists and we're in ROI mode or it's defined
-        if self.roi:
+        if self.eye_annotation.roi:
             self.draw_roi(painter)
 
         painter.end()
-        self.image_label.setPixmap(self.pixmap)
-        self.image_label.resize(self.pixmap.size())
+        self.image_canvas.set_rendered_region(self.pixmap, offset)
+
+        end_time = time.perf_counter()
+        self.render_stats.record_render(
+            repaint_ms=(end_time - start_time) * 1000,
+            scale_ms=(scaled_time - start_time) * 1000,
+            overlay_ms=(end_time - scaled_time) * 1000,
+        )
+        if self.performance_hud.isVisible():
+            self.update_performance_hud()
 
     def draw_eye_annotations(self, painter: QPainter, eye: str) -> None:
         """Draw all annotations for a specific eye with eye label.
@@ -527,64 +787,98 @@ class ImageViewer(QWidget):
             eye: "left" or "right"
 
         """
-        eye_data = self.eye_data[eye]
+        annotation = self.annotations[eye]
 
         # Draw points for this eye
-        self.draw_points_for_eye(painter, eye_data, eye)
+        self.draw_points_for_eye(painter, annotation, eye)
 
         # Draw ellipses for this eye
-        self.draw_ellipses_for_eye(painter, eye_data)
+        self.draw_ellipses_for_eye(painter, annotation)
 
-    def draw_points_for_eye(self, painter: QPainter, eye_data: dict, eye: str) -> None:
-        """Draw annotation points for a specific eye."""
-        is_active = eye == self.current_eye
+    def draw_points_for_eye(self, painter: QPainter, annotation: EyeAnnotation, eye: str) -> None:
+        """Draw annotation points for a specific eye.
+
+        Points are drawn in one batch per annotation type with a single pen, eye labels
+        are stamped from a cached glyph, and the selection highlight is a separate pass.
+        """
         eye_label = "L" if eye == "left" else "R"
 
-        for points, color, annotation_type in [
-            (eye_data["pupil_points"], self.pupil_color, "pupil"),
-            (eye_data["iris_points"], self.iris_color, "iris"),
-            (eye_data["eyelid_contour_points"], self.eyelid_color, "eyelid_contour"),
-            (eye_data["glint_points"], self.glint_color, "glint"),
+        for kind, color in [
+            ("pupil", self.pupil_color),
+            ("iris", self.iris_color),
+            ("eyelid_contour", self.eyelid_color),
+            ("glint", self.glint_color),
         ]:
-            for point in points:
-                scaled_point = QPointF(point.x() * self.factor, point.y() * self.factor)
-                # Only show selection highlight for active eye
-                if is_active and point == self.selected_point and self.current_annotation == annotation_type:
-                    if annotation_type == "pupil":
-                        painter.setPen(QPen(self.pupil_select_color, 3, Qt.SolidLine))
-                    elif annotation_type == "iris":
-                        painter.setPen(QPen(self.iris_select_color, 3, Qt.SolidLine))
-                    elif annotation_type == "eyelid_contour":
-                        painter.setPen(QPen(self.eyelid_select_color, 3, Qt.SolidLine))
-                    else:  # glint
-                        painter.setPen(QPen(self.glint_select_color, 3, Qt.SolidLine))
-                else:
-                    painter.setPen(QPen(color, 3, Qt.SolidLine))
-                painter.drawEllipse(scaled_point, 1.5, 1.5)
-
-                # Draw small eye label next to the point
-                font = painter.font()
-                font.setPointSize(8)
-                painter.setFont(font)
-                painter.setPen(QPen(color, 1, Qt.SolidLine))
-                text_pos = QPointF(scaled_point.x() + 6, scaled_point.y() - 4)
-                painter.drawText(text_pos, eye_label)
-
-    def draw_ellipses_for_eye(self, painter: QPainter, eye_data: dict) -> None:
+            points = annotation.get_points(kind)
+            if len(points) == 0:
+                continue
+            scaled_points = points_to_polygon(points, self.factor)
+            painter.setPen(QPen(color, POINT_DIAMETER, Qt.SolidLine, Qt.RoundCap))
+            painter.drawPoints(scaled_points)
+            self.draw_label_glyphs(painter, scaled_points, eye_label, color)
+
+        # Only show selection highlight for active eye
+        if eye == self.current_eye:
+            self.draw_selection_highlight(painter, annotation)
+
+    def draw_selection_highlight(self, painter: QPainter, annotation: EyeAnnotation) -> None:
+        """Draw the selected point of the current annotation type in its select color."""
+        points = annotation.get_points(self.current_annotation)
+        if self.selected_index is None or self.selected_index >= len(points):
+            return
+        if self.current_annotation == "pupil":
+            color = self.pupil_select_color
+        elif self.current_annotation == "iris":
+            color = self.iris_select_color
+        elif self.current_annotation == "eyelid_contour":
+            color = self.eyelid_select_color
+        else:  # glint
+            color = self.glint_select_color
+        x, y = points[self.selected_index]
+        painter.setPen(QPen(color, POINT_DIAMETER, Qt.SolidLine, Qt.RoundCap))
+        painter.drawPoint(QPointF(x * self.factor, y * self.factor))
+
+    def get_label_glyph(self, label: str, color: QColor) -> tuple[QPixmap, float]:
+        """Get a cached pixmap of an eye label and the baseline position inside it."""
+        key = (label, color.rgba())
+        if key not in self.label_glyphs:
+            font = QFont(self.font())
+            font.setPointSize(LABEL_POINT_SIZE)
+            metrics = QFontMetrics(font)
+            glyph = QPixmap(max(1, metrics.horizontalAdvance(label)), max(1, metrics.height()))
+            glyph.fill(Qt.transparent)
+            glyph_painter = QPainter(glyph)
+            glyph_painter.setFont(font)
+            glyph_painter.setPen(QPen(color, 1, Qt.SolidLine))
+            glyph_painter.drawText(QPointF(0, metrics.ascent()), label)
+            glyph_painter.end()
+            self.label_glyphs[key] = (glyph, metrics.ascent())
+        return self.label_glyphs[key]
+
+    def draw_label_glyphs(self, painter: QPainter, scaled_points: QPolygonF, label: str, color: QColor) -> None:
+        """Stamp the eye label next to every point with one pixmap fragment call."""
+        glyph, ascent = self.get_label_glyph(label, color)
+        source = QRectF(glyph.rect())
+        # Fragments are positioned by their center, the label baseline sits at LABEL_OFFSET
+        center_offset = LABEL_OFFSET + QPointF(source.width() / 2, source.height() / 2 - ascent)
+        fragments = [QPainter.PixmapFragment.create(point + center_offset, source) for point in scaled_points]
+        painter.drawPixmapFragments(fragments, glyph)
+
+    def draw_ellipses_for_eye(self, painter: QPainter, annotation: EyeAnnotation) -> None:
         """Draw fitted ellipses for a specific eye."""
-        if eye_data["pupil_ellipse"]:
+        if annotation.pupil_ellipse:
             painter.setPen(QPen(self.pupil_ellipse_color, 1, Qt.SolidLine))
-            self.draw_single_ellipse(painter, eye_data["pupil_ellipse"])
-        if eye_data["iris_ellipse"]:
+            self.draw_single_ellipse(painter, annotation.pupil_ellipse)
+        if annotation.iris_ellipse:
             painter.setPen(QPen(self.iris_ellipse_color, 1, Qt.SolidLine))
-            self.draw_single_ellipse(painter, eye_data["iris_ellipse"])
+            self.draw_single_ellipse(painter, annotation.iris_ellipse)
 
     def draw_roi(self, painter: QPainter) -> None:
         """Draw the ROI rectangle with dashed lines and corner handles."""
-        if not self.roi:
+        if not self.eye_annotation.roi:
             return
 
-        x, y, w, h = self.roi
+        x, y, w, h = self.eye_annotation.roi
         scaled_x = x * self.factor
         scaled_y = y * self.factor
         scaled_w = w * self.factor
@@ -624,80 +918,47 @@ class ImageViewer(QWidget):
 
     def draw_points(self, painter: QPainter) -> None:
         """Draw annotation points on the image."""
-        for points, color, annotation_type in [
-            (self.pupil_points, self.pupil_color, "pupil"),
-            (self.iris_points, self.iris_color, "iris"),
-            (self.eyelid_contour_points, self.eyelid_color, "eyelid_contour"),
-            (self.glint_points, self.glint_color, "glint"),
-        ]:
-            for point in points:
-                scaled_point = QPointF(point.x() * self.factor, point.y() * self.factor)
-                if point == self.selected_point and self.current_annotation == annotation_type:
-                    if annotation_type == "pupil":
-                        painter.setPen(QPen(self.pupil_select_color, 3, Qt.SolidLine))
-                    elif annotation_type == "iris":
-                        painter.setPen(QPen(self.iris_select_color, 3, Qt.SolidLine))
-                    elif annotation_type == "eyelid_contour":
-                        painter.setPen(QPen(self.eyelid_select_color, 3, Qt.SolidLine))
-                    else:  # glint
-                        painter.setPen(QPen(self.glint_select_color, 3, Qt.SolidLine))
-                else:
-                    painter.setPen(QPen(color, 3, Qt.SolidLine))
-                painter.drawEllipse(scaled_point, 1.5, 1.5)
+        self.draw_points_for_eye(painter, self.eye_annotation, self.current_eye)
 
     def draw_ellipses(self, painter: QPainter) -> None:
         """Draw fitted ellipses on the image."""
-        if self.pupil_ellipse:
-            painter.setPen(QPen(self.pupil_ellipse_color, 1, Qt.SolidLine))
-            self.draw_single_ellipse(painter, self.pupil_ellipse)
-        if self.iris_ellipse:
-            painter.setPen(QPen(self.iris_ellipse_color, 1, Qt.SolidLine))
-            self.draw_single_ellipse(painter, self.iris_ellipse)
+        self.draw_ellipses_for_eye(painter, self.eye_annotation)
 
-    def draw_single_ellipse(self, painter: QPainter, ellipse: tuple | None) -> None:
+    def draw_single_ellipse(self, painter: QPainter, ellipse: Ellipse | None) -> None:
         """Draw a single ellipse on the image."""
         if ellipse is None:
             return
-        center, size, angle = ellipse
-        scaled_center = QPointF(center.x() * self.factor, center.y() * self.factor)
-        scaled_size = QSizeF(size.width() * self.factor, size.height() * self.factor)
+        cx, cy, width, height, angle = ellipse
         painter.save()
-        painter.translate(scaled_center)
+        painter.translate(QPointF(cx * self.factor, cy * self.factor))
         painter.rotate(angle)
-        painter.drawEllipse(QPointF(0, 0), scaled_size.width() / 2, scaled_size.height() / 2)
+        painter.drawEllipse(QPointF(0, 0), width * self.factor / 2, height * self.factor / 2)
         painter.restore()
 
-    def find_closest_point_and_type(self, pos: QPointF) -> tuple[QPointF | None, str | None]:
-        """Find the closest point and its annotation type."""
-        pupil_point = find_closest_point(self.pupil_points, pos, self.factor)
-        iris_point = find_closest_point(self.iris_points, pos, self.factor)
-        eyelid_point = find_closest_point(self.eyelid_contour_points, pos, self.factor)
-        glint_point = find_closest_point(self.glint_points, pos, self.factor)
-
-        closest_point = None
+    def find_closest_point_and_type(self, pos: QPointF) -> tuple[int | None, str | None]:
+        """Find the index of the closest point of the current eye and its annotation type."""
+        closest_index = None
         closest_type = None
         min_dist = float("inf")
 
-        for point, point_type in [
-            (pupil_point, "pupil"),
-            (iris_point, "iris"),
-            (eyelid_point, "eyelid_contour"),
-            (glint_point, "glint"),
-        ]:
-            if point:
-                dist = (point.x() - pos.x()) ** 2 + (point.y() - pos.y()) ** 2
+        for point_type in ANNOTATION_TYPES:
+            points = self.eye_annotation.get_points(point_type)
+            index = find_closest_point(points, (pos.x(), pos.y()), self.factor)
+            if index is not None:
+                x, y = points[index]
+                dist = (x - pos.x()) ** 2 + (y - pos.y()) ** 2
                 if dist < min_dist:
                     min_dist = dist
-                    closest_point = point
+                    closest_index = index
                     closest_type = point_type
 
-        return closest_point, closest_type
+        return closest_index, closest_type
 
     def get_image_position(self, pos: QPoint) -> QPointF | None:
         """Convert widget position to image coordinates."""
         if self.pixmap:
             widget_pos = self.scroll_area.mapFrom(self, pos)
-            image_pos = self.image_label.mapFrom(self.scroll_area, widget_pos)
+            image_pos = self.image_canvas.mapFrom(self.scroll_area, widget_pos)
             scaled_pos = QPointF(image_pos.x() / self.factor, image_pos.y() / self.factor)
             if (
                 0 <= scaled_pos.x() < self.original_pixmap.width()
@@ -713,62 +974,66 @@ class ImageViewer(QWidget):
             self.annotation_type_changed.emit(self.current_annotation)  # Emit the new signal
         self.annotation_changed.emit()
 
+    def make_replace_command(
+        self,
+        kind: str,
+        points: list[tuple],
+        ellipse: tuple | None,
+    ) -> ReplaceAnnotationCommand:
+        """Create a command replacing the current eye's points and ellipse of an annotation type."""
+        return ReplaceAnnotationCommand(
+            self.current_eye,
+            kind,
+            self.eye_annotation.point_list(kind),
+            self.get_ellipse(kind),
+            points,
+            ellipse,
+        )
+
+    def replace_annotation(self, kind: str, points: list[tuple], ellipse: tuple | None = None) -> None:
+        """Replace the points and ellipse of an annotation type as one undoable edit.
+
+        Args:
+            kind: Annotation type ("pupil", "iris", "eyelid_contour" or "glint").
+            points: New points as (x, y) tuples.
+            ellipse: New ellipse as (cx, cy, width, height, angle) or None.
+
+        """
+        self.selected_index = None
+        self.execute_command(self.make_replace_command(kind, points, ellipse))
+
     def clear_pupil_points(self) -> None:
         """Clear all pupil annotation points."""
-        self.pupil_points = []
-        self.pupil_ellipse = None
-        self.save_state()
-        self.save_current_eye_data()
-        self.annotation_changed.emit()
-        self.update_image()
+        self.replace_annotation("pupil", [])
 
     def clear_iris_points(self) -> None:
         """Clear all iris annotation points."""
-        self.iris_points = []
-        self.iris_ellipse = None
-        self.save_state()
-        self.save_current_eye_data()
-        self.annotation_changed.emit()
-        self.update_image()
+        self.replace_annotation("iris", [])
 
     def clear_iris_ellipse(self) -> None:
         """Clear the fitted iris ellipse."""
-        self.iris_ellipse = None
-        self.save_state()
-        self.save_current_eye_data()
-        self.annotation_changed.emit()
-        self.update_image()
+        self.execute_command(SetEllipseCommand(self.current_eye, "iris", self.get_ellipse("iris"), None))
 
     def clear_pupil_ellipse(self) -> None:
         """Clear the fitted pupil ellipse."""
-        self.pupil_ellipse = None
-        self.save_state()
-        self.save_current_eye_data()
-        self.annotation_changed.emit()
-        self.update_image()
+        self.execute_command(SetEllipseCommand(self.current_eye, "pupil", self.get_ellipse("pupil"), None))
 
     def clear_eyelid_points(self) -> None:
         """Clear all eyelid contour points."""
-        self.eyelid_contour_points = []
-        self.save_state()
-        self.save_current_eye_data()
-        self.annotation_changed.emit()
-        self.update_image()
+        self.replace_annotation("eyelid_contour", [])
 
     def clear_glint_points(self) -> None:
         """Clear all glint points."""
-        self.glint_points = []
-        self.save_state()
-        self.save_current_eye_data()
-        self.annotation_changed.emit()
-        self.update_image()
+        self.replace_annotation("glint", [])
 
     def clear_all(self) -> None:
         """Clear all annotations."""
-        self.clear_pupil_points()
-        self.clear_iris_points()
-        self.clear_eyelid_points()
-        self.clear_glint_points()
+        self.selected_index = None
+        self.execute_command(
+            CompoundCommand([
+                self.make_replace_command(kind, [], None) for kind in ["pupil", "iris", "eyelid_contour", "glint"]
+            ])
+        )
 
     def get_annotation_data(self) -> dict:
         """Get all annotation data for both eyes."""
@@ -777,26 +1042,28 @@ class ImageViewer(QWidget):
     def set_annotation_data(self, data: dict) -> None:
         """Set annotation data for both eyes."""
         self.set_all_eye_data(data)
-        self.reset_undo_stack(initial_state=self.get_current_state())
+        self.reset_undo_stack()
 
     def fit_ellipse(self) -> bool:
         """Fit an ellipse to annotation points."""
-        points = self.pupil_points if self.current_annotation == "pupil" else self.iris_points
+        points = self.eye_annotation.get_points("pupil" if self.current_annotation == "pupil" else "iris")
         if len(points) >= 5:
-            x = np.array([p.x() for p in points])
-            y = np.array([p.y() for p in points])
-            params = fit_ellipse(x, y)
-            center = QPointF(params[0], params[1])
-            size = QSizeF(2 * params[2], 2 * params[3])
-            angle = np.degrees(params[4])
-            if self.current_annotation == "pupil":
-                self.pupil_ellipse = (center, size, angle)
-            else:
-                self.iris_ellipse = (center, size, angle)
-            self.save_state()
-            self.save_current_eye_data()
-            self.annotation_changed.emit()
-            self.update_image()
+            params = fit_ellipse(points[:, 0], points[:, 1])
+            ellipse = (
+                float(params[0]),
+                float(params[1]),
+                float(2 * params[2]),
+                float(2 * params[3]),
+                float(np.degrees(params[4])),
+            )
+            self.execute_command(
+                SetEllipseCommand(
+                    self.current_eye,
+                    self.current_annotation,
+                    self.get_ellipse(self.current_annotation),
+                    ellipse,
+                )
+            )
             return True
         if len(points) != 0:
             QMessageBox.warning(
@@ -813,25 +1080,19 @@ class ImageViewer(QWidget):
         elif self.current_annotation == "iris":
             self.clear_iris_ellipse()
 
-    @staticmethod
-    def move_points_by_delta(points: list[QPointF], delta_x: float, delta_y: float) -> None:
-        """Helper method to move all points in a list by a given delta."""
-        for i in range(len(points)):
-            points[i] = QPointF(points[i].x() + delta_x, points[i].y() + delta_y)
-
     def is_point_in_roi(self, point: QPointF) -> bool:
         """Check if a point is inside the ROI."""
-        if not self.roi:
+        if not self.eye_annotation.roi:
             return False
-        x, y, w, h = self.roi
+        x, y, w, h = self.eye_annotation.roi
         return x <= point.x() <= x + w and y <= point.y() <= y + h
 
     def get_roi_handle_at_pos(self, point: QPointF) -> str | None:
         """Get the ROI resize handle at the given position."""
-        if not self.roi:
+        if not self.eye_annotation.roi:
             return None
 
-        x, y, w, h = self.roi
+        x, y, w, h = self.eye_annotation.roi
         handle_size = 8 / self.factor  # Handle size in image coordinates
 
         # Check corners (priority order: tl, tr, bl, br)
@@ -1,34 +1,51 @@
 """Main application window for the eye annotation tool."""
 
-import ast
 from pathlib import Path
 
-from PyQt5.QtCore import QEvent, QRect, Qt
+from PyQt5.QtCore import QEvent, QRect, QSize, Qt, QTimer
 from PyQt5.QtGui import QCloseEvent, QIcon, QPixmap, QScreen
 from PyQt5.QtWidgets import (
     QApplication,
+    QComboBox,
     QFileDialog,
     QHBoxLayout,
     QLabel,
-    QListWidget,
+    QListView,
     QMainWindow,
     QMessageBox,
+    QSpinBox,
+    QTabWidget,
     QVBoxLayout,
     QWidget,
 )
 
 from ai import PluginManager
+from annotation_sdk.archive_source import expand_archives, get_storage_path
+from annotation_sdk.frame_source import expand_frame_sources, get_auto_window_level, load_frame, split_frame_path
 
+from .. import __version__
 from ..controllers.annotation_controller import AnnotationController
 from ..controllers.navigation_controller import NavigationController
+from ..controllers.status_controller import SORT_ORDERS, STATUS_FILTERS, StatusController
+from ..utils.display_enhancement import DisplayEnhancement
+from ..utils.folder_scanner import FolderScanner
+from ..utils.frame_cache import FrameCache
+from ..utils.image_prefetcher import ImagePrefetcher
+from ..utils.performance_monitor import StallWatchdog, setup_performance_logging
 from ..utils.settings_handler import SettingsHandler
+from ..utils.thumbnail_cache import ThumbnailCache, get_default_cache_dir
 from .ai_assist_handler import AIAssistHandler
 from .annotation_controls import AnnotationControlPanel
 from .custom_widgets import MaterialButton
+from .filmstrip_model import FilmstripModel
+from .image_list_model import ImageListModel
 from .image_viewer import ImageViewer
 from .menu_handler import MenuHandler
 from .shortcut_handler import ShortcutHandler
 
+# Idle time after the last display enhancement change before it is written to the settings file
+ENHANCEMENT_SAVE_DELAY_MS = 500
+
 
 class MainWindow(QMainWindow):
     """Main application window containing all UI components and controllers."""
@@ -45,10 +62,37 @@ class MainWindow(QMainWindow):
 
         self.annotation_controller = AnnotationController(self)
         self.navigation_controller = NavigationController(self)
+        self.status_controller = StatusController(self)
+        self.frame_cache = FrameCache(max_bytes=int(self.settings_handler.get_setting("frame_cache_max_bytes")))
+        window_level = self.settings_handler.get_setting("frame_window_level")
+        self.frame_cache.window_level = tuple(window_level) if window_level else None
+        self.image_viewer.frame_cache = self.frame_cache
+        self.image_prefetcher = ImagePrefetcher(
+            self.frame_cache, depth=int(self.settings_handler.get_setting("prefetch_depth"))
+        )
+        self.folder_scanner = FolderScanner(self)
+        self.image_list_model = ImageListModel(self.status_controller.get_status, self)
+        self.image_list_view.setModel(self.image_list_model)
+        self.thumbnail_cache = ThumbnailCache(
+            self.settings_handler.get_setting("thumbnail_cache_dir") or get_default_cache_dir(),
+            size=int(self.settings_handler.get_setting("thumbnail_size")),
+            parent=self,
+        )
+        self.thumbnail_cache.window_level = self.frame_cache.window_level
+        self.filmstrip_model = FilmstripModel(self.thumbnail_cache, self.request_thumbnail, self.get_image_row, self)
+        self.filmstrip_model.setSourceModel(self.image_list_model)
+        self.filmstrip_view.setModel(self.filmstrip_model)
         self.menu_handler = MenuHandler(self)
         self.shortcut_handler = ShortcutHandler(self)
         self.ai_assist_handler = AIAssistHandler(self)
 
+        # Display enhancement changes are saved once the controls are left alone, not on every slider step
+        self.pending_display_enhancement = None
+        self.enhancement_save_timer = QTimer(self)
+        self.enhancement_save_timer.setSingleShot(True)
+        self.enhancement_save_timer.setInterval(ENHANCEMENT_SAVE_DELAY_MS)
+        self.enhancement_save_timer.timeout.connect(self.save_display_enhancement)
+
         self.menu_handler.setup_menu()
         self.shortcut_handler.setup_shortcuts()
         self.connect_signals()
@@ -66,6 +110,14 @@ class MainWindow(QMainWindow):
         # Install event filter to catch window state changes
         self.installEventFilter(self)
 
+        # Log event-loop stalls with the stack of the blocking call
+        setup_performance_logging()
+        self.stall_watchdog = StallWatchdog(
+            threshold_ms=float(self.settings_handler.get_setting("stall_threshold_ms")),
+            parent=self,
+        )
+        self.stall_watchdog.start()
+
     def setup_ui(self) -> None:
         """Set up the user interface components."""
         central_widget = QWidget()
@@ -75,24 +127,66 @@ class MainWindow(QMainWindow):
         left_panel = QWidget()
         left_layout = QVBoxLayout()
         self.load_images_button = MaterialButton("Load Images")
+        self.open_folder_button = MaterialButton("Open Folder")
         self.prev_image_button = MaterialButton("Previous Image")
         self.next_image_button = MaterialButton("Next Image")
         self.save_annotations_button = MaterialButton("Save Annotations")
 
         left_layout.addWidget(self.load_images_button)
+        left_layout.addWidget(self.open_folder_button)
         left_layout.addWidget(self.prev_image_button)
         left_layout.addWidget(self.next_image_button)
         left_layout.addWidget(self.save_annotations_button)
 
-        self.image_list_widget = QListWidget()
-        left_layout.addWidget(QLabel("Loaded Images:"))
-        left_layout.addWidget(self.image_list_widget)
+        # Only the visible rows of the list are drawn, so it stays fast for any number of images
+        self.image_list_view = QListView()
+        self.image_list_view.setUniformItemSizes(True)
+        self.image_list_label = QLabel("Loaded Images:")
+        left_layout.addWidget(self.image_list_label)
+
+        # Filter and sort the image list by annotation status
+        self.status_filter_combo = QComboBox()
+        self.status_filter_combo.addItems(STATUS_FILTERS)
+        self.status_sort_combo = QComboBox()
+        self.status_sort_combo.addItems(SORT_ORDERS)
+        list_options_layout = QHBoxLayout()
+        list_options_layout.addWidget(self.status_filter_combo)
+        list_options_layout.addWidget(self.status_sort_combo)
+        left_layout.addLayout(list_options_layout)
+
+        # Jump to an image by its number in the loaded images
+        self.go_to_spin_box = QSpinBox()
+        self.go_to_spin_box.setKeyboardTracking(False)
+        self.go_to_spin_box.setRange(0, 0)
+        go_to_layout = QHBoxLayout()
+        go_to_layout.addWidget(QLabel("Go to image:"))
+        go_to_layout.addWidget(self.go_to_spin_box, 1)
+        left_layout.addLayout(go_to_layout)
+
+        # Thumbnails of the same rows, wrapped into a grid
+        thumbnail_size = int(self.settings_handler.get_setting("thumbnail_size"))
+        self.filmstrip_view = QListView()
+        self.filmstrip_view.setFlow(QListView.LeftToRight)
+        self.filmstrip_view.setWrapping(True)
+        self.filmstrip_view.setResizeMode(QListView.Adjust)
+        self.filmstrip_view.setUniformItemSizes(True)
+        self.filmstrip_view.setIconSize(QSize(thumbnail_size, thumbnail_size))
+        self.filmstrip_view.setGridSize(QSize(thumbnail_size + 8, thumbnail_size + 8))
+
+        self.image_list_tabs = QTabWidget()
+        self.image_list_tabs.addTab(self.image_list_view, "List")
+        self.image_list_tabs.addTab(self.filmstrip_view, "Thumbnails")
+        left_layout.addWidget(self.image_list_tabs)
 
         left_layout.addStretch(1)
         left_panel.setLayout(left_layout)
 
         # Central area for image viewer
         self.image_viewer = ImageViewer()
+        self.image_viewer.set_undo_limits(
+            int(self.settings_handler.get_setting("undo_depth")),
+            int(self.settings_handler.get_setting("undo_budget_bytes")),
+        )
 
         # Right panel for annotation controls
         self.annotation_controls = AnnotationControlPanel()
@@ -112,6 +206,9 @@ class MainWindow(QMainWindow):
         self.image_paths = []
         self.current_image_index = -1
         self.annotation_modified = False
+        # Image indices in the order shown by the image list, and the list row of each shown image
+        self.image_order = []
+        self.image_rows = {}
 
     def set_annotation_modified(self, modified: bool) -> None:
         """Set the annotation modified flag."""
@@ -120,10 +217,18 @@ class MainWindow(QMainWindow):
     def connect_signals(self) -> None:
         """Connect signals and slots for UI components."""
         self.load_images_button.clicked.connect(self.load_images)
+        self.open_folder_button.clicked.connect(self.open_folder)
         self.prev_image_button.clicked.connect(self.navigation_controller.prev_image)
         self.next_image_button.clicked.connect(self.navigation_controller.next_image)
         self.save_annotations_button.clicked.connect(self.annotation_controller.save_annotations)
-        self.image_list_widget.itemClicked.connect(self.navigation_controller.on_image_selected)
+        self.image_list_view.clicked.connect(self.navigation_controller.on_image_selected)
+        self.filmstrip_view.clicked.connect(self.navigation_controller.on_image_selected)
+        self.go_to_spin_box.valueChanged.connect(lambda number: self.navigation_controller.go_to_image(number - 1))
+        self.status_filter_combo.currentIndexChanged.connect(self.update_image_list)
+        self.status_sort_combo.currentIndexChanged.connect(self.update_image_list)
+        self.folder_scanner.progress.connect(self.on_folder_scan_progress)
+        self.folder_scanner.finished.connect(self.on_folder_scanned)
+        self.folder_scanner.failed.connect(self.on_folder_scan_failed)
 
         self.annotation_controls.annotation_changed.connect(self.image_viewer.set_current_annotation)
         self.annotation_controls.eye_changed.connect(self.image_viewer.switch_eye)
@@ -137,40 +242,204 @@ class MainWindow(QMainWindow):
         self.annotation_controls.ai_assist_requested.connect(self.ai_assist_handler.on_ai_assist_requested)
         self.annotation_controls.roi_toggle_requested.connect(self.image_viewer.toggle_roi_mode)
         self.annotation_controls.roi_clear_requested.connect(self.image_viewer.clear_roi)
+        self.annotation_controls.display_enhancement_changed.connect(self.set_display_enhancement)
 
         self.image_viewer.annotation_changed.connect(self.on_annotation_changed)
         self.image_viewer.annotation_type_changed.connect(self.annotation_controls.set_current_annotation)
+        self.image_viewer.current_eye_changed.connect(self.annotation_controls.set_current_eye)
 
     def load_images(self) -> None:
         """Open file dialog to load image files."""
         file_dialog = QFileDialog()
         image_files, _ = file_dialog.getOpenFileNames(
-            self, "Select Image Files", "", "Image Files (*.png *.jpg *.bmp)"
+            self,
+            "Select Image Files",
+            "",
+            "Image Files (*.png *.jpg *.bmp);;Frame Stacks (*.npy *.raw);;Image Archives (*.zip *.tar)",
         )
+        image_files = expand_archives(expand_frame_sources(image_files))
         if image_files:
-            self.image_paths = image_files
-            self.current_image_index = 0
+            self.set_images(image_files)
+
+    def open_folder(self) -> None:
+        """Open folder dialog and load all images of the folder, scanned in the background."""
+        folder = QFileDialog.getExistingDirectory(self, "Select Image Folder")
+        if folder:
+            self.image_list_label.setText("Scanning folder...")
+            self.folder_scanner.scan(folder)
+
+    def on_folder_scan_progress(self, count: int) -> None:
+        """Show the number of images found so far by the folder scan."""
+        self.image_list_label.setText(f"Scanning folder... {count} images")
+
+    def on_folder_scanned(self, folder: str, image_paths: list[str]) -> None:
+        """Load the images found by the folder scan."""
+        if image_paths:
+            self.set_images(image_paths)
+        else:
+            self.update_image_list()
+            QMessageBox.information(self, "No Images", f"No images found in {folder}")
+
+    def on_folder_scan_failed(self, folder: str, error: str) -> None:
+        """Report a folder that could not be scanned."""
+        self.update_image_list()
+        QMessageBox.critical(self, "Error", f"Failed to open folder {folder}: {error}")
+
+    def set_images(self, image_paths: list[str]) -> None:
+        """Load a new list of images and show the first one."""
+        if not self.annotation_controller.check_unsaved_changes():
             self.update_image_list()
-            self.load_current_image()
+            return
+        self.annotation_controller.open_backend(image_paths)
+        self.image_paths = image_paths
+        self.current_image_index = 0
+        self.image_prefetcher.clear()
+        self.frame_cache.clear()
+        self.thumbnail_cache.clear()
+        self.filmstrip_model.clear()
+        self.load_display_enhancement()
+        self.status_controller.open(image_paths)
+        self.update_image_list()
+        self.load_current_image()
 
     def update_image_list(self) -> None:
-        """Update the image list widget with current image paths."""
-        self.image_list_widget.clear()
-        for image_path in self.image_paths:
-            self.image_list_widget.addItem(Path(image_path).name)
-        if self.current_image_index >= 0:
-            self.image_list_widget.setCurrentRow(self.current_image_index)
+        """Update the image list with the filtered and sorted image paths."""
+        self.image_order = self.status_controller.get_image_order()
+        self.image_rows = {index: row for row, index in enumerate(self.image_order)}
+        self.image_list_model.set_images(self.image_paths, self.image_order)
+        self.image_list_label.setText(f"Loaded Images: {len(self.image_order)} of {len(self.image_paths)}")
+        self.go_to_spin_box.setRange(min(1, len(self.image_paths)), len(self.image_paths))
+        self.select_current_image_row()
+
+    def update_image_status(self, index: int) -> None:
+        """Update the status icon of an image in the image list."""
+        row = self.image_rows.get(index)
+        if row is not None:
+            self.image_list_model.refresh_row(row)
+
+    def select_current_image_row(self) -> None:
+        """Select the current image in the image list, or nothing if it is filtered out."""
+        row = self.image_rows.get(self.current_image_index)
+        for view in (self.image_list_view, self.filmstrip_view):
+            if row is None:
+                view.clearSelection()
+            else:
+                model_index = view.model().index(row, 0)
+                view.setCurrentIndex(model_index)
+                view.scrollTo(model_index)
+        self.go_to_spin_box.blockSignals(True)
+        self.go_to_spin_box.setValue(self.current_image_index + 1)
+        self.go_to_spin_box.blockSignals(False)
+
+    def get_image_row(self, image_path: str) -> int | None:
+        """Get the image list row of an image by its path, or None if it is not shown."""
+        index = self.status_controller.image_indices.get(image_path)
+        return None if index is None else self.image_rows.get(index)
+
+    def request_thumbnail(self, image_path: str) -> None:
+        """Queue the thumbnail of an image for the filmstrip."""
+        self.thumbnail_cache.request(
+            image_path,
+            self.annotation_controller.backend,
+            bool(self.settings_handler.get_setting("thumbnail_overlay")),
+            self.annotation_controller.autosave_writer.wait,
+        )
+
+    def set_thumbnail_overlay(self, enabled: bool) -> None:
+        """Turn drawing the annotations on the thumbnails on or off."""
+        self.settings_handler.set_setting("thumbnail_overlay", enabled)
+        self.thumbnail_cache.clear()
+        self.filmstrip_model.clear()
+        self.filmstrip_view.viewport().update()
+
+    def set_window_level(self, window_level: tuple[float, float] | None) -> None:
+        """Change how the values of frames from stacks are displayed, None showing their full bit depth."""
+        self.settings_handler.set_setting("frame_window_level", list(window_level) if window_level else None)
+        self.frame_cache.set_window_level(window_level)
+        self.image_prefetcher.clear()
+        self.thumbnail_cache.window_level = window_level
+        self.thumbnail_cache.clear()
+        self.filmstrip_model.clear()
+        self.filmstrip_view.viewport().update()
+        if 0 <= self.current_image_index < len(self.image_paths):
+            image_path = self.image_paths[self.current_image_index]
+            if split_frame_path(image_path) is not None:
+                frame = self.image_prefetcher.get(image_path)
+                if frame is not None:
+                    self.image_viewer.replace_frame(frame)
+                self.prefetch_adjacent_images()
+
+    def get_dataset_key(self) -> str | None:
+        """Get the folder of the loaded images, or of their archive, which identifies the dataset."""
+        if not self.image_paths:
+            return None
+        return str(Path(get_storage_path(self.image_paths[0])).resolve().parent)
+
+    def load_display_enhancement(self) -> None:
+        """Show the loaded images with the display enhancement last used for their dataset."""
+        self.save_display_enhancement()
+        enhancements = self.settings_handler.get_setting("display_enhancements")
+        enhancement = DisplayEnhancement.from_dict(enhancements.get(self.get_dataset_key(), {}))
+        self.annotation_controls.display_group.set_enhancement(enhancement)
+        self.image_viewer.enhancement_cache.clear()
+        self.image_viewer.display_enhancement = enhancement
+
+    def set_display_enhancement(self, enhancement: DisplayEnhancement) -> None:
+        """Change the display enhancement and remember it for the dataset of the loaded images."""
+        self.image_viewer.set_display_enhancement(enhancement)
+        dataset_key = self.get_dataset_key()
+        if dataset_key is not None:
+            self.pending_display_enhancement = (dataset_key, enhancement)
+            self.enhancement_save_timer.start()
+
+    def save_display_enhancement(self) -> None:
+        """Write a changed display enhancement to the settings file."""
+        self.enhancement_save_timer.stop()
+        if self.pending_display_enhancement is None:
+            return
+        dataset_key, enhancement = self.pending_display_enhancement
+        self.pending_display_enhancement = None
+        enhancements = dict(self.settings_handler.get_setting("display_enhancements"))
+        enhancements[dataset_key] = enhancement.to_dict()
+        self.settings_handler.set_setting("display_enhancements", enhancements)
+
+    def auto_window_level(self) -> None:
+        """Stretch the value range of the current frame over the display range."""
+        if 0 <= self.current_image_index < len(self.image_paths):
+            image_path = self.image_paths[self.current_image_index]
+            if split_frame_path(image_path) is not None:
+                self.set_window_level(get_auto_window_level(load_frame(image_path)))
+
+    def get_adjacent_image_index(self, step: int) -> int | None:
+        """Get the image before (step -1) or after (step 1) the current one in the image list order."""
+        row = self.image_rows.get(self.current_image_index)
+        if row is None:
+            # The current image is filtered out, continue from its position in file order
+            if step > 0:
+                return next((i for i in self.image_order if i > self.current_image_index), None)
+            return next((i for i in reversed(self.image_order) if i < self.current_image_index), None)
+        row += step
+        return self.image_order[row] if 0 <= row < len(self.image_order) else None
 
     def load_current_image(self) -> None:
         """Load and display the current image with its annotations."""
         if 0 <= self.current_image_index < len(self.image_paths):
             image_path = self.image_paths[self.current_image_index]
-            if self.image_viewer.load_image(image_path):
+            if self.image_viewer.load_image(image_path, self.image_prefetcher.get(image_path)):
                 self.setWindowTitle(f"EyE Annotation Tool - {Path(image_path).name}")
                 self.annotation_controller.load_annotations()
+                self.prefetch_adjacent_images()
             else:
                 QMessageBox.critical(self, "Error", f"Failed to load image: {image_path}")
 
+    def prefetch_adjacent_images(self) -> None:
+        """Decode the images next to the current one in the image list order in the background."""
+        row = self.image_rows.get(self.current_image_index)
+        if row is not None:
+            self.image_prefetcher.prefetch(
+                row, lambda row: self.image_paths[self.image_order[row]] if 0 <= row < len(self.image_order) else None
+            )
+
     def save_current_annotations(self) -> None:
         """Save annotations for the current image."""
         self.annotation_controller.save_current_annotations()
@@ -178,6 +447,7 @@ class MainWindow(QMainWindow):
     def on_annotation_changed(self) -> None:
         """Handle annotation change event."""
         self.set_annotation_modified(True)
+        self.annotation_controller.schedule_autosave()
 
     def change_detector(self, detector_type: str, detector_name: str) -> None:
         """Change the active detector for a given type."""
@@ -245,7 +515,13 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, event: QCloseEvent) -> None:  # noqa: N802
         """Handle window close event."""
-        if self.annotation_modified:
+        if self.annotation_controller.autosave_enabled():
+            self.annotation_controller.autosave()
+            if self.annotation_controller.confirm_autosaves_written():
+                event.accept()
+            else:
+                event.ignore()
+        elif self.annotation_modified:
             reply = QMessageBox.question(
                 self,
                 "Unsaved Changes",
@@ -258,24 +534,22 @@ class MainWindow(QMainWindow):
                 self.annotation_controller.save_annotations()
                 event.accept()
             elif reply == QMessageBox.Discard:
+                self.annotation_controller.discard_unsaved_changes()
                 event.accept()
             else:
                 event.ignore()
         else:
             event.accept()
 
-    @staticmethod
-    def get_version_from_setup() -> str:
-        """Get the application version from setup.py."""
-        setup_path = str(Path(__file__).parent / ".." / ".." / "setup.py")
-        with Path(setup_path).open(encoding="utf-8") as file:
-            tree = ast.parse(file.read())
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Call) and node.func.id == "setup":
-                    for keyword in node.keywords:
-                        if keyword.arg == "version":
-                            return ast.literal_eval(keyword.value)
-        return "Unknown"
+        if event.isAccepted():
+            self.save_display_enhancement()
+            self.stall_watchdog.stop()
+            self.folder_scanner.cancel()
+            # The status refresh reads from the annotation backend, so it stops first
+            self.status_controller.close()
+            self.annotation_controller.close()
+            self.image_prefetcher.close()
+            self.thumbnail_cache.close()
 
     def show_about_dialog(self) -> None:
         """Show the about dialog with application information."""
@@ -285,7 +559,7 @@ class MainWindow(QMainWindow):
             "<p>Developed by "
             "<a href='https://mh-salari.ir/'"
             "style='color: #8b7aa2;'>Mohammadhossein Salari</a></p>"
-            f"<p>Current version: {self.get_version_from_setup()}</p>"
+            f"<p>Current version: {__version__}</p>"
             "<p>To get the latest version of Eye Annotation Tool, visit<br>"
             "<a href='https://github.com/mh-salari/eye_annotation_tool' "
             "style='color: #8b7aa2;' target='_blank' rel='noopener noreferrer'>"
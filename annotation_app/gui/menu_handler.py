@@ -2,6 +2,8 @@
 
 from typing import TYPE_CHECKING
 
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QKeySequence
 from PyQt5.QtWidgets import QAction, QMenu
 
 if TYPE_CHECKING:
@@ -27,6 +29,10 @@ class MenuHandler:
         ai_menu = menubar.addMenu("AI Configuration")
         self.add_ai_menu_actions(ai_menu)
 
+        # View menu
+        view_menu = menubar.addMenu("View")
+        self.add_view_menu_actions(view_menu)
+
         # Help menu
         help_menu = menubar.addMenu("Help")
         self.add_help_menu_actions(help_menu)
@@ -37,10 +43,32 @@ class MenuHandler:
         load_action.triggered.connect(self.main_window.load_images)
         file_menu.addAction(load_action)
 
+        open_folder_action = QAction("Open Folder", self.main_window)
+        open_folder_action.triggered.connect(self.main_window.open_folder)
+        file_menu.addAction(open_folder_action)
+
         save_action = QAction("Save Annotations", self.main_window)
         save_action.triggered.connect(self.main_window.annotation_controller.save_annotations)
         file_menu.addAction(save_action)
 
+        autosave_action = QAction("Autosave", self.main_window)
+        autosave_action.setCheckable(True)
+        autosave_action.setChecked(self.main_window.annotation_controller.autosave_enabled())
+        autosave_action.toggled.connect(self.main_window.annotation_controller.set_autosave_enabled)
+        file_menu.addAction(autosave_action)
+
+        file_menu.addSeparator()
+
+        store_action = QAction("Create Project Store", self.main_window)
+        store_action.triggered.connect(self.main_window.annotation_controller.create_project_store)
+        file_menu.addAction(store_action)
+
+        export_action = QAction("Export Annotations to JSON", self.main_window)
+        export_action.triggered.connect(self.main_window.annotation_controller.export_project_store)
+        file_menu.addAction(export_action)
+
+        file_menu.addSeparator()
+
         exit_action = QAction("Exit", self.main_window)
         exit_action.triggered.connect(self.main_window.close)
         file_menu.addAction(exit_action)
@@ -49,15 +77,19 @@ class MenuHandler:
         """Add actions to the AI Configuration menu."""
         pupil_menu = QMenu("Pupil Detector", self.main_window)
         ai_menu.addMenu(pupil_menu)
-        self.add_detector_actions(pupil_menu, "pupil_detector")
+        self.add_detector_actions_on_show(pupil_menu, "pupil_detector")
 
         iris_menu = QMenu("iris Detector", self.main_window)
         ai_menu.addMenu(iris_menu)
-        self.add_detector_actions(iris_menu, "iris_detector")
+        self.add_detector_actions_on_show(iris_menu, "iris_detector")
 
         eyelid_menu = QMenu("Eyelid Detector", self.main_window)
         ai_menu.addMenu(eyelid_menu)
-        self.add_detector_actions(eyelid_menu, "eyelid_detector")
+        self.add_detector_actions_on_show(eyelid_menu, "eyelid_detector")
+
+    def add_detector_actions_on_show(self, menu: QMenu, detector_type: str) -> None:
+        """Add the detector selection actions when a menu is first opened, so installed plugins are looked up then."""
+        menu.aboutToShow.connect(lambda: self.add_detector_actions(menu, detector_type) if menu.isEmpty() else None)
 
     def add_detector_actions(self, menu: QMenu, detector_type: str) -> None:
         """Add detector selection actions to a menu."""
@@ -103,6 +135,31 @@ class MenuHandler:
             else:
                 action.setChecked(action.text() == current_detector)
 
+    def add_view_menu_actions(self, view_menu: QMenu) -> None:
+        """Add actions to the View menu."""
+        hud_action = QAction("Performance HUD", self.main_window)
+        hud_action.setCheckable(True)
+        hud_action.setShortcut(QKeySequence(Qt.Key_F12))
+        hud_action.triggered.connect(self.main_window.image_viewer.toggle_performance_hud)
+        view_menu.addAction(hud_action)
+
+        overlay_action = QAction("Annotations on Thumbnails", self.main_window)
+        overlay_action.setCheckable(True)
+        overlay_action.setChecked(bool(self.main_window.settings_handler.get_setting("thumbnail_overlay")))
+        overlay_action.toggled.connect(self.main_window.set_thumbnail_overlay)
+        view_menu.addAction(overlay_action)
+
+        view_menu.addSeparator()
+
+        auto_window_action = QAction("Auto Window/Level", self.main_window)
+        auto_window_action.setShortcut(QKeySequence("Ctrl+L"))
+        auto_window_action.triggered.connect(self.main_window.auto_window_level)
+        view_menu.addAction(auto_window_action)
+
+        full_window_action = QAction("Full Range Window/Level", self.main_window)
+        full_window_action.triggered.connect(lambda: self.main_window.set_window_level(None))
+        view_menu.addAction(full_window_action)
+
     def add_help_menu_actions(self, help_menu: QMenu) -> None:
         """Add actions to the Help menu."""
         about_action = QAction("About", self.main_window)
@@ -23,6 +23,10 @@ class ShortcutHandler:
         undo_shortcut = QShortcut(QKeySequence.Undo, self.main_window)
         undo_shortcut.activated.connect(self.main_window.image_viewer.undo)
 
+        # Redo shortcut
+        redo_shortcut = QShortcut(QKeySequence.Redo, self.main_window)
+        redo_shortcut.activated.connect(self.main_window.image_viewer.redo)
+
         # Save shortcut
         save_shortcut = QShortcut(QKeySequence.Save, self.main_window)
         save_shortcut.activated.connect(self.main_window.annotation_controller.save_annotations)
@@ -35,10 +39,19 @@ class ShortcutHandler:
         prev_image_shortcut = QShortcut(QKeySequence(Qt.Key_Left), self.main_window)
         prev_image_shortcut.activated.connect(self.main_window.navigation_controller.prev_image)
 
+        # Go to image shortcut
+        go_to_image_shortcut = QShortcut(QKeySequence("Ctrl+G"), self.main_window)
+        go_to_image_shortcut.activated.connect(self.focus_go_to_image)
+
         # Toggle between pupil and iris
         toggle_shortcut = QShortcut(QKeySequence(Qt.Key_Tab), self.main_window)
         toggle_shortcut.activated.connect(self.toggle_annotation_type)
 
+    def focus_go_to_image(self) -> None:
+        """Move the keyboard focus to the image number box of the image list."""
+        self.main_window.go_to_spin_box.setFocus()
+        self.main_window.go_to_spin_box.selectAll()
+
     def toggle_annotation_type(self) -> None:
         """Toggle between different annotation types."""
         current_type = self.main_window.annotation_controls.get_current_annotation_type()
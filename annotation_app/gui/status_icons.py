@@ -0,0 +1,49 @@
+"""Icons and tooltips showing the annotation status of an image in the image list."""
+
+from functools import lru_cache
+
+from PyQt5.QtGui import QColor, QIcon, QPainter, QPixmap
+
+from annotation_sdk.model import EYES
+from annotation_sdk.status_index import STATUS_FLAGS, get_eye_status
+
+# Same colors as the annotations in the image viewer
+STATUS_COLORS = {
+    "pupil": QColor(0, 127, 118),
+    "iris": QColor(139, 122, 162),
+    "eyelid": QColor(0, 155, 201),
+    "glints": QColor(255, 165, 0),
+    "roi": QColor(0, 188, 212),
+}
+MISSING_COLOR = QColor(220, 220, 220)
+CELL_WIDTH = 4
+ROW_HEIGHT = 8
+
+
+@lru_cache(maxsize=None)
+def status_icon(status: int | None) -> QIcon:
+    """Get an icon with one row per eye and one cell per annotated part, or a blank icon if unknown."""
+    if status is None:
+        return QIcon()
+    pixmap = QPixmap(CELL_WIDTH * len(STATUS_FLAGS), ROW_HEIGHT * len(EYES))
+    pixmap.fill(QColor(0, 0, 0, 0))
+    painter = QPainter(pixmap)
+    for row, eye in enumerate(EYES):
+        flags = get_eye_status(status, eye)
+        for column, (name, flag) in enumerate(STATUS_FLAGS.items()):
+            color = STATUS_COLORS[name] if flags & flag else MISSING_COLOR
+            painter.fillRect(column * CELL_WIDTH, row * ROW_HEIGHT + 1, CELL_WIDTH - 1, ROW_HEIGHT - 2, color)
+    painter.end()
+    return QIcon(pixmap)
+
+
+def status_tooltip(status: int | None) -> str:
+    """Describe which parts of each eye are annotated."""
+    if status is None:
+        return "Checking annotations..."
+    lines = []
+    for eye in EYES:
+        flags = get_eye_status(status, eye)
+        parts = [name for name, flag in STATUS_FLAGS.items() if flags & flag]
+        lines.append(f"{eye.capitalize()}: {', '.join(parts) if parts else 'not annotated'}")
+    return "\n".join(lines)
@@ -9,14 +9,19 @@ from PyQt5.QtWidgets import QApplication
 from .gui import MainWindow
 
 
-def run_app() -> None:
-    """Run the eye annotation application."""
+def create_app() -> QApplication:
+    """Create the application object with the application icon."""
     app = QApplication(sys.argv)
 
     # Set the application icon
     icon_path = str(Path(__file__).parent / "resources" / "app_icon.ico")
     app.setWindowIcon(QIcon(icon_path))
+    return app
+
 
+def run_app() -> None:
+    """Run the eye annotation application."""
+    app = create_app()
     main_window = MainWindow()
     main_window.show()
     sys.exit(app.exec_())
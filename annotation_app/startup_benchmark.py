@@ -0,0 +1,237 @@
+"""Startup time benchmark: import time breakdown and time to first paint.
+
+Run ``python -m annotation_app.startup_benchmark`` to start the application
+several times in fresh interpreters. It reports the median time spent
+importing ``annotation_app.main``, broken down by package as measured by
+``python -X importtime``, and the median time from starting the interpreter
+to the first paint of the main window. It exits with status 1 if startup
+regressed: if either time exceeds its budget, or if a heavy module that is
+only needed on first use was loaded before the window was painted.
+"""
+
+import argparse
+import json
+import re
+import statistics
+import subprocess  # noqa: S404
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+from PyQt5.QtCore import QEvent, QObject, QTimer
+from PyQt5.QtWidgets import QApplication
+
+from .gui import MainWindow
+from .main import create_app
+
+APP_MODULE = "annotation_app.main"
+# Only image decoding, ellipse fitting and the detectors need these, so they are imported on first use
+DEFERRED_MODULES = ("cv2", "pupil_detectors", "scipy")
+DEFAULT_MAX_IMPORT_MS = 1000.0
+DEFAULT_MAX_FIRST_PAINT_MS = 3000.0
+IMPORT_TIME_PATTERN = re.compile(r"^import time:\s+(?P<self>\d+) \|\s+\d+ \| (?P<module>.+)$")
+FIRST_PAINT_MARKER = "first paint:"
+
+
+def parse_import_times(output: str) -> dict[str, float]:
+    """Get the time in milliseconds spent importing each module itself from ``-X importtime`` output."""
+    times = {}
+    for line in output.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        if match is not None:
+            times[match["module"].strip()] = int(match["self"]) / 1000
+    return times
+
+
+def group_by_package(import_times: dict[str, float]) -> Counter:
+    """Sum the import times of the modules of each top-level package."""
+    packages = Counter()
+    for module, milliseconds in import_times.items():
+        packages[module.split(".")[0]] += milliseconds
+    return packages
+
+
+def measure_imports(module: str = APP_MODULE) -> dict[str, float]:
+    """Import a module in a fresh interpreter and get the import time of every module it loaded.
+
+    Args:
+        module: Module to import.
+
+    Returns:
+        The time in milliseconds spent importing each module itself.
+
+    Raises:
+        subprocess.CalledProcessError: If the import fails.
+
+    """
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_import_times(result.stderr)
+
+
+def measure_first_paint(timeout: float = 60.0) -> tuple[float, list[str]]:
+    """Start the application in a fresh interpreter and time its first paint.
+
+    Args:
+        timeout: Seconds to wait for the application to exit after painting.
+
+    Returns:
+        The milliseconds from starting the interpreter to the first paint, and
+        the deferred modules that were loaded by then.
+
+    Raises:
+        RuntimeError: If the application exited without painting.
+
+    """
+    start = time.perf_counter()
+    command = [sys.executable, "-m", "annotation_app.startup_benchmark", "--report-first-paint"]
+    with subprocess.Popen(command, stdout=subprocess.PIPE, text=True) as process:  # noqa: S603
+        for line in process.stdout:
+            if line.startswith(FIRST_PAINT_MARKER):
+                elapsed = (time.perf_counter() - start) * 1000
+                loaded = json.loads(line[len(FIRST_PAINT_MARKER) :])
+                break
+        else:
+            raise RuntimeError(f"The application exited with status {process.wait()} before painting its window")
+        process.wait(timeout)
+    return elapsed, loaded
+
+
+class FirstPaintReporter(QObject):
+    """Prints the deferred modules that are loaded when the first widget is painted, then quits."""
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        """Initialize the FirstPaintReporter."""
+        super().__init__(parent)
+        self.reported = False
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:  # noqa: N802 ARG002
+        """Report the first paint event of any widget."""
+        if event.type() == QEvent.Paint and not self.reported:
+            self.reported = True
+            loaded = [name for name in DEFERRED_MODULES if name in sys.modules]
+            print(f"{FIRST_PAINT_MARKER} {json.dumps(loaded)}", flush=True)
+            QTimer.singleShot(0, QApplication.instance().quit)
+        return False
+
+
+def report_first_paint() -> None:
+    """Start the application like ``run_app`` and report its first paint (runs in the benchmarked interpreter)."""
+    app = create_app()
+    reporter = FirstPaintReporter(app)
+    app.installEventFilter(reporter)
+    main_window = MainWindow()
+    main_window.show()
+    app.exec_()
+    main_window.close()
+
+
+def check_startup(
+    import_ms: float,
+    import_times: dict[str, float],
+    first_paint_ms: float,
+    loaded_at_paint: list[str],
+    max_import_ms: float,
+    max_first_paint_ms: float,
+) -> list[str]:
+    """Compare startup measurements with their budgets.
+
+    Args:
+        import_ms: Median import time of the application.
+        import_times: Import time of each module of a run.
+        first_paint_ms: Median time to the first paint.
+        loaded_at_paint: Deferred modules loaded by the first paint.
+        max_import_ms: Budget of the import time.
+        max_first_paint_ms: Budget of the time to the first paint.
+
+    Returns:
+        A description of each regression, empty if there is none.
+
+    """
+    failures = []
+    if import_ms > max_import_ms:
+        failures.append(f"import time {import_ms:.0f} ms exceeds the budget of {max_import_ms:.0f} ms")
+    if first_paint_ms > max_first_paint_ms:
+        failures.append(
+            f"time to first paint {first_paint_ms:.0f} ms exceeds the budget of {max_first_paint_ms:.0f} ms"
+        )
+    imported = sorted(set(group_by_package(import_times)) & set(DEFERRED_MODULES))
+    if imported:
+        failures.append(f"{APP_MODULE} imports {', '.join(imported)}, which should be imported on first use")
+    if loaded_at_paint:
+        failures.append(f"{', '.join(loaded_at_paint)} loaded before the first paint")
+    return failures
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser of the benchmark."""
+    parser = argparse.ArgumentParser(prog="python -m annotation_app.startup_benchmark", description=__doc__)
+    parser.add_argument("--runs", type=int, default=5, help="number of application starts to take the median of")
+    parser.add_argument("--max-import-ms", type=float, default=DEFAULT_MAX_IMPORT_MS, help="budget of the import time")
+    parser.add_argument(
+        "--max-first-paint-ms",
+        type=float,
+        default=DEFAULT_MAX_FIRST_PAINT_MS,
+        help="budget of the time to the first paint",
+    )
+    parser.add_argument("--top", type=int, default=10, help="number of packages listed in the import breakdown")
+    parser.add_argument("--output", help="JSON file the measurements are written to")
+    parser.add_argument("--report-first-paint", action="store_true", help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the startup benchmark.
+
+    Args:
+        argv: Command line arguments, defaults to ``sys.argv[1:]``.
+
+    Returns:
+        Exit status, 1 if startup regressed.
+
+    """
+    args = build_parser().parse_args(argv)
+    if args.report_first_paint:
+        report_first_paint()
+        return 0
+
+    import_runs = sorted((measure_imports() for _ in range(args.runs)), key=lambda times: sum(times.values()))
+    # The breakdown is that of the median run, so it adds up to the reported time
+    import_times = import_runs[len(import_runs) // 2]
+    import_ms = sum(import_times.values())
+    paint_runs = [measure_first_paint() for _ in range(args.runs)]
+    first_paint_ms = statistics.median(milliseconds for milliseconds, _ in paint_runs)
+    loaded_at_paint = sorted({name for _, loaded in paint_runs for name in loaded})
+
+    print(f"Import time of {APP_MODULE}: {import_ms:.0f} ms (median of {args.runs})")
+    for package, milliseconds in group_by_package(import_times).most_common(args.top):
+        print(f"  {package:<24} {milliseconds:7.1f} ms")
+    print(f"Time to first paint: {first_paint_ms:.0f} ms (median of {args.runs})")
+
+    failures = check_startup(
+        import_ms, import_times, first_paint_ms, loaded_at_paint, args.max_import_ms, args.max_first_paint_ms
+    )
+    if args.output:
+        results = {
+            "import_ms": import_ms,
+            "import_breakdown": dict(group_by_package(import_times).most_common()),
+            "first_paint_ms": first_paint_ms,
+            "first_paint_runs_ms": [milliseconds for milliseconds, _ in paint_runs],
+            "deferred_modules_loaded": loaded_at_paint,
+            "failures": failures,
+        }
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+    for failure in failures:
+        print(f"Startup regression: {failure}")
+    if not failures:
+        print("Startup is within its budgets")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
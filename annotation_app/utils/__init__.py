@@ -1,14 +1,19 @@
 """Utility functions for annotation I/O, image processing, and settings management."""
 
-from .annotation_io import get_annotation_path, load_annotations, save_annotations
+from .annotation_io import get_annotation_path, load_annotations, points_to_polygon, save_annotations
 from .image_processing import find_closest_point, fit_ellipse
+from .performance_monitor import RenderStats, StallWatchdog, setup_performance_logging
 from .settings_handler import SettingsHandler
 
 __all__ = [
+    "RenderStats",
     "SettingsHandler",
+    "StallWatchdog",
     "find_closest_point",
     "fit_ellipse",
     "get_annotation_path",
     "load_annotations",
+    "points_to_polygon",
     "save_annotations",
+    "setup_performance_logging",
 ]
@@ -0,0 +1,98 @@
+"""Write-behind saving of annotations on a background thread."""
+
+import sqlite3
+import threading
+from collections.abc import Callable
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class AutosaveWriter(QObject):
+    """Background thread that performs queued saves, keeping only the latest save per image.
+
+    Saves are submitted from the GUI thread and never wait on the disk. A save
+    that is still queued when a newer one for the same image arrives is replaced,
+    so rapid edits cost a single write. Saves that fail are reported through
+    ``save_failed`` and kept in ``failures`` until a later save of the same key succeeds.
+    """
+
+    # Key of the failed save and the error
+    save_failed = pyqtSignal(str, str)
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        """Initialize the AutosaveWriter and start its thread."""
+        super().__init__(parent)
+        self.pending = {}
+        # Error of the last save of each key whose last save failed
+        self.failures = {}
+        self.active_key = None
+        self.closed = False
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self.run, name="AutosaveWriter", daemon=True)
+        self.thread.start()
+
+    def submit(self, key: str, save: Callable[[], None]) -> None:
+        """Queue a save, replacing any queued save with the same key.
+
+        Args:
+            key: Identifies what is saved, usually the image path.
+            save: Performs the save on the writer thread.
+
+        """
+        with self.condition:
+            self.pending.pop(key, None)
+            self.pending[key] = save
+            self.condition.notify_all()
+
+    def wait(self, key: str | None = None) -> None:
+        """Block until the queued save of a key, or all queued saves, are written."""
+        with self.condition:
+            if key is None:
+                self.condition.wait_for(lambda: not self.pending and self.active_key is None)
+            else:
+                self.condition.wait_for(lambda: key not in self.pending and self.active_key != key)
+
+    def close(self) -> None:
+        """Write all queued saves and stop the thread."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.thread.join()
+
+    def run(self) -> None:
+        """Perform queued saves in submission order until closed (runs on the writer thread)."""
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending or self.closed)
+                if not self.pending:
+                    return
+                key = next(iter(self.pending))
+                save = self.pending.pop(key)
+                self.active_key = key
+
+            error = None
+            try:
+                save()
+            except (OSError, ValueError, sqlite3.Error) as e:
+                print(f"Failed to save annotations of {key}: {e}")
+                error = str(e)
+            finally:
+                with self.condition:
+                    if error is None:
+                        self.failures.pop(key, None)
+                    else:
+                        self.failures[key] = error
+                        # Posted before waiting threads are woken, so a wait is followed by the report
+                        self.save_failed.emit(key, error)
+                    self.active_key = None
+                    self.condition.notify_all()
+
+    def is_queued(self, key: str) -> bool:
+        """Check if a save of a key is queued or being written."""
+        with self.condition:
+            return key in self.pending or self.active_key == key
+
+    def get_failures(self) -> dict[str, str]:
+        """Get the error of each key whose last save failed."""
+        with self.condition:
+            return dict(self.failures)
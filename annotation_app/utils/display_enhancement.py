@@ -0,0 +1,201 @@
+"""Display enhancement of decoded images: gamma, contrast stretch and CLAHE."""
+
+import math
+import weakref
+from collections import OrderedDict
+from collections.abc import Callable
+from functools import lru_cache
+
+import numpy as np
+
+STRETCH_PERCENTILES = (1, 99)
+CLAHE_TILE_GRID = (8, 8)
+
+
+class DisplayEnhancement:
+    """Enhancement settings of a dataset, applied to images for display only."""
+
+    def __init__(
+        self,
+        gamma: float = 1.0,
+        stretch: bool = False,
+        clahe: bool = False,
+        clahe_clip_limit: float = 2.0,
+        for_detectors: bool = False,
+    ) -> None:
+        """Initialize the DisplayEnhancement.
+
+        Args:
+            gamma: Gamma of the displayed gray levels, above 1 brightens dark images.
+            stretch: Whether to stretch the 1st to 99th percentile of each image over the full range.
+            clahe: Whether to apply contrast limited adaptive histogram equalization.
+            clahe_clip_limit: Contrast limit of CLAHE.
+            for_detectors: Whether detectors get the enhanced images instead of the decoded ones.
+
+        """
+        self.gamma = gamma
+        self.stretch = stretch
+        self.clahe = clahe
+        self.clahe_clip_limit = clahe_clip_limit
+        self.for_detectors = for_detectors
+
+    def is_identity(self) -> bool:
+        """Check if the settings leave images unchanged."""
+        return math.isclose(self.gamma, 1.0) and not self.stretch and not self.clahe
+
+    def key(self) -> tuple:
+        """Get the settings that change the enhanced pixels."""
+        return self.gamma, self.stretch, self.clahe and self.clahe_clip_limit
+
+    def to_dict(self) -> dict:
+        """Convert the settings to a dictionary for the settings file."""
+        return {
+            "gamma": self.gamma,
+            "stretch": self.stretch,
+            "clahe": self.clahe,
+            "clahe_clip_limit": self.clahe_clip_limit,
+            "for_detectors": self.for_detectors,
+        }
+
+    @classmethod
+    def from_dict(cls, values: dict) -> "DisplayEnhancement":
+        """Create settings from a dictionary of the settings file, using defaults for missing values."""
+        return cls(**{key: value for key, value in values.items() if key in cls().to_dict()})
+
+
+@lru_cache(maxsize=64)
+def get_enhancement_lut(gamma: float, low: int, high: int) -> np.ndarray:
+    """Get the enhanced value of every 8-bit value, stretching low to high over the full range before gamma."""
+    values = np.clip((np.arange(256, dtype=np.float32) - low) / max(high - low, 1), 0, 1)
+    return np.round(255 * values ** (1 / gamma)).astype(np.uint8)
+
+
+def get_stretch_range(frame: np.ndarray) -> tuple[int, int]:
+    """Get the values at the stretch percentiles of an image."""
+    # A sparse sample is enough for the percentiles, and the alpha of BGRA images is left out
+    sample = frame[::4, ::4] if frame.ndim == 2 else frame[::4, ::4, :3]
+    low, high = np.percentile(sample, STRETCH_PERCENTILES)
+    return int(low), int(high)
+
+
+def equalize_frame(frame: np.ndarray, clip_limit: float) -> np.ndarray:
+    """Apply CLAHE to a grayscale image, or to the luma of a BGRA image."""
+    import cv2  # noqa: PLC0415
+
+    clahe = cv2.createCLAHE(clipLimit=float(clip_limit), tileGridSize=CLAHE_TILE_GRID)
+    if frame.ndim == 2:
+        return clahe.apply(frame)
+    # Luma is much cheaper to separate from the colors than the lightness of Lab
+    ycrcb = cv2.cvtColor(cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR), cv2.COLOR_BGR2YCrCb)
+    ycrcb[:, :, 0] = clahe.apply(ycrcb[:, :, 0])
+    return cv2.cvtColor(cv2.cvtColor(ycrcb, cv2.COLOR_YCrCb2BGR), cv2.COLOR_BGR2BGRA)
+
+
+def apply_tone_curve(frame: np.ndarray, gamma: float, stretch: bool) -> np.ndarray:
+    """Apply gamma and contrast stretch to a grayscale or BGRA image through one lookup table."""
+    import cv2  # noqa: PLC0415
+
+    low, high = get_stretch_range(frame) if stretch else (0, 255)
+    return cv2.LUT(frame, get_enhancement_lut(float(gamma), low, high))
+
+
+def has_tone_curve(enhancement: DisplayEnhancement) -> bool:
+    """Check if settings change the gray levels through the lookup table."""
+    return not math.isclose(enhancement.gamma, 1.0) or enhancement.stretch
+
+
+def enhance_frame(frame: np.ndarray, enhancement: DisplayEnhancement) -> np.ndarray:
+    """Apply enhancement settings to a decoded grayscale or BGRA image.
+
+    CLAHE is applied first, then gamma and contrast stretch together through
+    one lookup table, so changing the gamma does not repeat the equalization.
+
+    Args:
+        frame: Decoded 8-bit image.
+        enhancement: Settings to apply.
+
+    Returns:
+        The read-only enhanced image, or the image itself if the settings leave it unchanged.
+
+    """
+    if enhancement.is_identity():
+        return frame
+    enhanced = equalize_frame(frame, enhancement.clahe_clip_limit) if enhancement.clahe else frame
+    if has_tone_curve(enhancement):
+        enhanced = apply_tone_curve(enhanced, enhancement.gamma, enhancement.stretch)
+    enhanced.flags.writeable = False
+    return enhanced
+
+
+class EnhancementCache:
+    """Enhanced images by image and settings, keeping the most recently used ones.
+
+    The equalized image is cached on its own as well, so dragging the gamma
+    slider with CLAHE enabled only repeats the lookup table. Entries only refer
+    weakly to the decoded image they were made from, so the cache never keeps
+    decoded images alive, and an entry is made again when its image was
+    decoded anew, e.g. with another window and level.
+    """
+
+    def __init__(self, max_bytes: int = 64_000_000) -> None:
+        """Initialize the EnhancementCache.
+
+        Args:
+            max_bytes: Maximum total size of the cached images.
+
+        """
+        self.max_bytes = max_bytes
+        self.frames = OrderedDict()
+        self.cached_bytes = 0
+
+    def get(self, image_path: str, frame: np.ndarray, enhancement: DisplayEnhancement) -> np.ndarray:
+        """Get a decoded image with enhancement settings applied.
+
+        Args:
+            image_path: Path to the image.
+            frame: Decoded image.
+            enhancement: Settings to apply.
+
+        Returns:
+            The read-only enhanced image.
+
+        """
+        if enhancement.is_identity():
+            return frame
+        enhanced = frame
+        if enhancement.clahe:
+            clip_limit = enhancement.clahe_clip_limit
+            enhanced = self.lookup(image_path, ("clahe", clip_limit), frame, lambda: equalize_frame(frame, clip_limit))
+        if has_tone_curve(enhancement):
+            equalized = enhanced
+            enhanced = self.lookup(
+                image_path,
+                enhancement.key(),
+                frame,
+                lambda: apply_tone_curve(equalized, enhancement.gamma, enhancement.stretch),
+            )
+        return enhanced
+
+    def lookup(self, image_path: str, key: tuple, frame: np.ndarray, enhance: Callable[[], np.ndarray]) -> np.ndarray:
+        """Get a cached stage of the enhancement of an image, making it if it is missing or stale."""
+        entry = self.frames.get((image_path, key))
+        if entry is not None and entry[0]() is frame:
+            self.frames.move_to_end((image_path, key))
+            return entry[1]
+        enhanced = enhance()
+        enhanced.flags.writeable = False
+        if entry is not None:
+            self.cached_bytes -= entry[1].nbytes
+        self.frames[image_path, key] = (weakref.ref(frame), enhanced)
+        self.frames.move_to_end((image_path, key))
+        self.cached_bytes += enhanced.nbytes
+        # The newest image is kept even if it is larger than the whole cache
+        while self.cached_bytes > self.max_bytes and len(self.frames) > 1:
+            _, (_, evicted) = self.frames.popitem(last=False)
+            self.cached_bytes -= evicted.nbytes
+        return enhanced
+
+    def clear(self) -> None:
+        """Drop all cached images."""
+        self.frames.clear()
+        self.cached_bytes = 0
@@ -0,0 +1,418 @@
+"""Command-based undo/redo history for annotation edits.
+
+Each edit is stored as a small command holding only the data it changed, together
+with enough information to revert it. Commands work on plain ``(x, y)`` point
+tuples and ``(cx, cy, width, height, angle)`` ellipse tuples, so the history does
+not depend on Qt and does not grow with the number of annotated points.
+"""
+
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Protocol
+
+from annotation_sdk.model import Ellipse, Point, Roi
+
+# Rough memory cost used for the history byte budget
+COMMAND_OVERHEAD_BYTES = 64
+POINT_BYTES = 16
+
+
+class AnnotationDocument(Protocol):
+    """Interface of the annotation state that commands are applied to."""
+
+    def insert_point(self, eye: str, kind: str, index: int, point: Point) -> None:
+        """Insert a point into an annotation type."""
+
+    def remove_point(self, eye: str, kind: str, index: int) -> None:
+        """Remove a point from an annotation type."""
+
+    def set_point(self, eye: str, kind: str, index: int, point: Point) -> None:
+        """Replace a single point of an annotation type."""
+
+    def translate_points(self, eye: str, kind: str, delta_x: float, delta_y: float) -> None:
+        """Move all points of an annotation type."""
+
+    def set_points(self, eye: str, kind: str, points: list[Point]) -> None:
+        """Replace all points of an annotation type."""
+
+    def set_ellipse(self, eye: str, kind: str, ellipse: Ellipse | None) -> None:
+        """Set the fitted ellipse of an annotation type."""
+
+    def set_roi(self, eye: str, roi: Roi | None) -> None:
+        """Set the ROI of an eye."""
+
+    def set_current_eye(self, eye: str) -> None:
+        """Make an eye the active one."""
+
+
+class EditCommand(ABC):
+    """Base class for reversible annotation edits."""
+
+    # Name used when the command is serialized
+    command_type = ""
+
+    @abstractmethod
+    def apply(self, document: AnnotationDocument) -> None:
+        """Apply the edit to the document."""
+
+    @abstractmethod
+    def revert(self, document: AnnotationDocument) -> None:
+        """Revert the edit on the document."""
+
+    def size_bytes(self) -> int:  # noqa: PLR6301
+        """Estimate the memory used by the command."""
+        return COMMAND_OVERHEAD_BYTES
+
+    def to_dict(self) -> dict:
+        """Convert the command to a JSON-serializable dictionary."""
+        return {"type": self.command_type, **vars(self)}
+
+
+class AddPointCommand(EditCommand):
+    """Add a point to an annotation type."""
+
+    command_type = "add_point"
+
+    def __init__(self, eye: str, kind: str, index: int, point: Point) -> None:
+        """Initialize the AddPointCommand."""
+        self.eye = eye
+        self.kind = kind
+        self.index = index
+        self.point = point
+
+    def apply(self, document: AnnotationDocument) -> None:
+        """Insert the point."""
+        document.insert_point(self.eye, self.kind, self.index, self.point)
+
+    def revert(self, document: AnnotationDocument) -> None:
+        """Remove the point again."""
+        document.remove_point(self.eye, self.kind, self.index)
+
+
+class DeletePointCommand(EditCommand):
+    """Delete a point from an annotation type."""
+
+    command_type = "delete_point"
+
+    def __init__(self, eye: str, kind: str, index: int, point: Point) -> None:
+        """Initialize the DeletePointCommand."""
+        self.eye = eye
+        self.kind = kind
+        self.index = index
+        self.point = point
+
+    def apply(self, document: AnnotationDocument) -> None:
+        """Remove the point."""
+        document.remove_point(self.eye, self.kind, self.index)
+
+    def revert(self, document: AnnotationDocument) -> None:
+        """Insert the point back at its old position in the list."""
+        document.insert_point(self.eye, self.kind, self.index, self.point)
+
+
+class MovePointCommand(EditCommand):
+    """Move a single point of an annotation type."""
+
+    command_type = "move_point"
+
+    def __init__(self, eye: str, kind: str, index: int, old_point: Point, new_point: Point) -> None:
+        """Initialize the MovePointCommand."""
+        self.eye = eye
+        self.kind = kind
+        self.index = index
+        self.old_point = old_point
+        self.new_point = new_point
+
+    def apply(self, document: AnnotationDocument) -> None:
+        """Move the point to its new position."""
+        document.set_point(self.eye, self.kind, self.index, self.new_point)
+
+    def revert(self, document: AnnotationDocument) -> None:
+        """Move the point back to its old position."""
+        document.set_point(self.eye, self.kind, self.index, self.old_point)
+
+
+class TranslatePointsCommand(EditCommand):
+    """Move all points of an annotation type by the same offset."""
+
+    command_type = "translate_points"
+
+    def __init__(self, eye: str, kind: str, delta_x: float, delta_y: float) -> None:
+        """Initialize the TranslatePointsCommand."""
+        self.eye = eye
+        self.kind = kind
+        self.delta_x = delta_x
+        self.delta_y = delta_y
+
+    def apply(self, document: AnnotationDocument) -> None:
+        """Move the points by the offset."""
+        document.translate_points(self.eye, self.kind, self.delta_x, self.delta_y)
+
+    def revert(self, document: AnnotationDocument) -> None:
+        """Move the points back by the inverse offset."""
+        document.translate_points(self.eye, self.kind, -self.delta_x, -self.delta_y)
+
+
+class SetEllipseCommand(EditCommand):
+    """Set or clear the fitted ellipse of an annotation type."""
+
+    command_type = "set_ellipse"
+
+    def __init__(self, eye: str, kind: str, old_ellipse: Ellipse | None, new_ellipse: Ellipse | None) -> None:
+        """Initialize the SetEllipseCommand."""
+        self.eye = eye
+        self.kind = kind
+        self.old_ellipse = old_ellipse
+        self.new_ellipse = new_ellipse
+
+    def apply(self, document: AnnotationDocument) -> None:
+        """Set the new ellipse."""
+        document.set_ellipse(self.eye, self.kind, self.new_ellipse)
+
+    def revert(self, document: AnnotationDocument) -> None:
+        """Restore the old ellipse."""
+        document.set_ellipse(self.eye, self.kind, self.old_ellipse)
+
+
+class ReplaceAnnotationCommand(EditCommand):
+    """Replace the points and ellipse of an annotation type, e.g. when clearing or running a detector."""
+
+    command_type = "replace_annotation"
+
+    def __init__(
+        self,
+        eye: str,
+        kind: str,
+        old_points: list[Point],
+        old_ellipse: Ellipse | None,
+        new_points: list[Point],
+        new_ellipse: Ellipse | None,
+    ) -> None:
+        """Initialize the ReplaceAnnotationCommand."""
+        self.eye = eye
+        self.kind = kind
+        self.old_points = old_points
+        self.old_ellipse = old_ellipse
+        self.new_points = new_points
+        self.new_ellipse = new_ellipse
+
+    def apply(self, document: AnnotationDocument) -> None:
+        """Set the new points and ellipse."""
+        document.set_points(self.eye, self.kind, self.new_points)
+        if self.kind in {"pupil", "iris"}:
+            document.set_ellipse(self.eye, self.kind, self.new_ellipse)
+
+    def revert(self, document: AnnotationDocument) -> None:
+        """Restore the old points and ellipse."""
+        document.set_points(self.eye, self.kind, self.old_points)
+        if self.kind in {"pupil", "iris"}:
+            document.set_ellipse(self.eye, self.kind, self.old_ellipse)
+
+    def size_bytes(self) -> int:
+        """Estimate the memory used by the command, including both point lists."""
+        return COMMAND_OVERHEAD_BYTES + POINT_BYTES * (len(self.old_points) + len(self.new_points))
+
+
+class SetRoiCommand(EditCommand):
+    """Set or clear the ROI of an eye."""
+
+    command_type = "set_roi"
+
+    def __init__(self, eye: str, old_roi: Roi | None, new_roi: Roi | None) -> None:
+        """Initialize the SetRoiCommand."""
+        self.eye = eye
+        self.old_roi = old_roi
+        self.new_roi = new_roi
+
+    def apply(self, document: AnnotationDocument) -> None:
+        """Set the new ROI."""
+        document.set_roi(self.eye, self.new_roi)
+
+    def revert(self, document: AnnotationDocument) -> None:
+        """Restore the old ROI."""
+        document.set_roi(self.eye, self.old_roi)
+
+
+class SwitchEyeCommand(EditCommand):
+    """Switch the active eye."""
+
+    command_type = "switch_eye"
+
+    def __init__(self, old_eye: str, new_eye: str) -> None:
+        """Initialize the SwitchEyeCommand."""
+        self.old_eye = old_eye
+        self.new_eye = new_eye
+
+    def apply(self, document: AnnotationDocument) -> None:
+        """Activate the new eye."""
+        document.set_current_eye(self.new_eye)
+
+    def revert(self, document: AnnotationDocument) -> None:
+        """Activate the old eye again."""
+        document.set_current_eye(self.old_eye)
+
+
+class CompoundCommand(EditCommand):
+    """Group of commands that are undone and redone together."""
+
+    command_type = "compound"
+
+    def __init__(self, commands: list[EditCommand]) -> None:
+        """Initialize the CompoundCommand."""
+        self.commands = commands
+
+    def apply(self, document: AnnotationDocument) -> None:
+        """Apply all commands in order."""
+        for command in self.commands:
+            command.apply(document)
+
+    def revert(self, document: AnnotationDocument) -> None:
+        """Revert all commands in reverse order."""
+        for command in reversed(self.commands):
+            command.revert(document)
+
+    def size_bytes(self) -> int:
+        """Estimate the memory used by all grouped commands."""
+        return COMMAND_OVERHEAD_BYTES + sum(command.size_bytes() for command in self.commands)
+
+    def to_dict(self) -> dict:
+        """Convert the command and its children to a JSON-serializable dictionary."""
+        return {"type": self.command_type, "commands": [command.to_dict() for command in self.commands]}
+
+
+COMMAND_TYPES = {
+    command_class.command_type: command_class
+    for command_class in [
+        AddPointCommand,
+        DeletePointCommand,
+        MovePointCommand,
+        TranslatePointsCommand,
+        SetEllipseCommand,
+        ReplaceAnnotationCommand,
+        SetRoiCommand,
+        SwitchEyeCommand,
+    ]
+}
+
+
+def command_from_dict(data: dict) -> EditCommand:
+    """Create a command from a dictionary made by ``EditCommand.to_dict``.
+
+    Args:
+        data: Serialized command.
+
+    Returns:
+        The reconstructed command.
+
+    Raises:
+        ValueError: If the command type is unknown.
+
+    """
+    fields = dict(data)
+    command_type = fields.pop("type", None)
+    if command_type == CompoundCommand.command_type:
+        return CompoundCommand([command_from_dict(command) for command in fields["commands"]])
+    if command_type not in COMMAND_TYPES:
+        raise ValueError(f"Unknown edit command type: {command_type}")
+
+    # JSON turns tuples into lists, restore them
+    for name, value in fields.items():
+        if isinstance(value, list):
+            fields[name] = [tuple(point) for point in value] if name.endswith("_points") else tuple(value)
+    return COMMAND_TYPES[command_type](**fields)
+
+
+class EditHistory:
+    """Undo/redo stacks of edit commands limited by depth and memory budget."""
+
+    def __init__(self, max_depth: int = 100, max_bytes: int = 4_000_000) -> None:
+        """Initialize the EditHistory.
+
+        Args:
+            max_depth: Maximum number of undoable commands.
+            max_bytes: Approximate memory budget for the undoable commands.
+
+        """
+        self.max_depth = max_depth
+        self.max_bytes = max_bytes
+        self.undo_stack = deque()
+        self.redo_stack = []
+        self.undo_bytes = 0
+
+    def set_limits(self, max_depth: int, max_bytes: int) -> None:
+        """Change the depth and memory limits, dropping the oldest commands if needed."""
+        self.max_depth = max_depth
+        self.max_bytes = max_bytes
+        self.enforce_limits()
+
+    def clear(self) -> None:
+        """Remove all commands."""
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.undo_bytes = 0
+
+    def restore(self, undo_commands: list[EditCommand], redo_commands: list[EditCommand]) -> None:
+        """Replace the stacks with already applied undo commands and pending redo commands."""
+        self.undo_stack = deque(undo_commands)
+        self.redo_stack = list(redo_commands)
+        self.undo_bytes = sum(command.size_bytes() for command in self.undo_stack)
+        self.enforce_limits()
+
+    def push(self, command: EditCommand) -> None:
+        """Add an already applied command, discarding the redo stack."""
+        self.undo_stack.append(command)
+        self.undo_bytes += command.size_bytes()
+        self.redo_stack.clear()
+        self.enforce_limits()
+
+    def enforce_limits(self) -> None:
+        """Drop the oldest commands until the depth and byte budget are respected."""
+        while self.undo_stack and (
+            len(self.undo_stack) > self.max_depth or (self.undo_bytes > self.max_bytes and len(self.undo_stack) > 1)
+        ):
+            self.undo_bytes -= self.undo_stack.popleft().size_bytes()
+
+    def can_undo(self) -> bool:
+        """Check if there is a command to undo."""
+        return bool(self.undo_stack)
+
+    def can_redo(self) -> bool:
+        """Check if there is a command to redo."""
+        return bool(self.redo_stack)
+
+    def undo(self, document: AnnotationDocument) -> EditCommand | None:
+        """Revert the most recent command.
+
+        Args:
+            document: Annotation state the command is reverted on.
+
+        Returns:
+            The reverted command or None if there was nothing to undo.
+
+        """
+        if not self.undo_stack:
+            return None
+        command = self.undo_stack.pop()
+        self.undo_bytes -= command.size_bytes()
+        command.revert(document)
+        self.redo_stack.append(command)
+        return command
+
+    def redo(self, document: AnnotationDocument) -> EditCommand | None:
+        """Re-apply the most recently undone command.
+
+        Args:
+            document: Annotation state the command is applied to.
+
+        Returns:
+            The re-applied command or None if there was nothing to redo.
+
+        """
+        if not self.redo_stack:
+            return None
+        command = self.redo_stack.pop()
+        command.apply(document)
+        self.undo_stack.append(command)
+        self.undo_bytes += command.size_bytes()
+        self.enforce_limits()
+        return command
@@ -0,0 +1,309 @@
+"""Append-only on-disk journal of annotation edits.
+
+Every edit, undo and redo on an image is appended as one JSON line to a journal
+next to the image. The journal lets the undo history survive navigating
+away from an image and lets unsaved edits be recovered after a crash.
+
+A journal file has the following structure::
+
+    {"op": "base", "revision": 1700000000.0}
+    {"op": "do", "command": {...}}        # history that is part of the saved file
+    {"op": "saved"}
+    {"op": "do", "command": {...}}        # edits made after the last save
+    {"op": "undo"}
+    {"op": "redo"}
+
+Lines before the last ``saved`` marker describe the undo history of the saved
+annotations. Lines after it are unsaved edits that can be replayed. The base
+revision identifies the stored annotations the journal was written against.
+"""
+
+import json
+import queue
+import threading
+from collections import Counter
+from collections.abc import Callable
+from pathlib import Path
+
+from annotation_sdk.archive_source import get_storage_path
+
+from .edit_history import EditCommand, command_from_dict
+
+JOURNAL_DIRECTORY = ".eye_annotation_journal"
+# Marks that the writer thread holds no task taken ahead from its queue
+NO_TASK = object()
+
+
+def get_journal_path(image_path: str) -> str:
+    """Get the journal file path for an image.
+
+    Journals of archive members are kept next to the archive.
+
+    Args:
+        image_path: Path to the image file.
+
+    Returns:
+        Path to the corresponding journal file.
+
+    """
+    folder = Path(get_storage_path(image_path)).parent
+    return str(folder / JOURNAL_DIRECTORY / f"{Path(image_path).relative_to(folder)}.jsonl")
+
+
+class JournalWriter:
+    """Background thread that performs journal file writes in order.
+
+    Appends are queued from the GUI thread and written in batches, so recording an
+    edit never waits on the disk. Every append is numbered, so a rewrite queued
+    later, e.g. after a background save, can keep the lines appended after the
+    annotations it describes were taken.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the JournalWriter and start its thread."""
+        self.queue = queue.Queue()
+        self.condition = threading.Condition()
+        self.sequence = 0
+        # Number of queued writes of each file that are not on disk yet
+        self.queued_writes = Counter()
+        # Lines appended to each file since it was last rewritten, with their sequence numbers (writer thread only)
+        self.appended = {}
+        self.thread = threading.Thread(target=self.run, name="JournalWriter", daemon=True)
+        self.thread.start()
+
+    def get_sequence(self) -> int:
+        """Get the sequence number of the most recently queued append."""
+        with self.condition:
+            return self.sequence
+
+    def put(self, operation: str, path: str, payload: object) -> None:
+        """Queue a write of a journal file."""
+        with self.condition:
+            self.queued_writes[path] += 1
+            self.queue.put((operation, path, payload))
+
+    def append(self, path: str, line: str) -> None:
+        """Queue a line to be appended to a journal file."""
+        with self.condition:
+            self.sequence += 1
+            self.put("append", path, (self.sequence, line))
+
+    def rewrite(self, path: str, lines: list[str], keep_after: int | None = None) -> None:
+        """Queue a replacement of the whole journal file.
+
+        Args:
+            path: Path to the journal file.
+            lines: New lines of the file.
+            keep_after: Sequence number after which appended lines are kept at the end
+                of the file, or None to drop all of them.
+
+        """
+        self.put("rewrite", path, (lines, keep_after))
+
+    def truncate_unsaved(self, path: str) -> None:
+        """Queue removal of the lines after the last saved marker."""
+        self.put("truncate_unsaved", path, None)
+
+    def flush(self, path: str | None = None) -> None:
+        """Block until the queued writes of a journal file, or of all files, are on disk."""
+        if path is None:
+            self.queue.join()
+            return
+        with self.condition:
+            self.condition.wait_for(lambda: path not in self.queued_writes)
+
+    def close(self) -> None:
+        """Write all queued lines and stop the thread."""
+        self.queue.put(None)
+        self.thread.join()
+
+    def run(self) -> None:
+        """Process queued writes until closed (runs on the writer thread)."""
+        # A task taken from the queue while batching appends, which may be the None stop signal
+        pending = NO_TASK
+        while True:
+            task = pending if pending is not NO_TASK else self.queue.get()
+            pending = NO_TASK
+            if task is None:
+                self.queue.task_done()
+                return
+
+            operation, path, payload = task
+            lines = [payload]
+            if operation == "append":
+                # Batch consecutive appends to the same file into one write
+                while True:
+                    try:
+                        next_task = self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if next_task is not None and next_task[0] == "append" and next_task[1] == path:
+                        lines.append(next_task[2])
+                    else:
+                        pending = next_task
+                        break
+
+            try:
+                self.process(operation, path, lines if operation == "append" else payload)
+            except (OSError, ValueError) as e:
+                print(f"Failed to write edit journal {path}: {e}")
+            finally:
+                written = len(lines) if operation == "append" else 1
+                with self.condition:
+                    self.queued_writes[path] -= written
+                    if self.queued_writes[path] <= 0:
+                        del self.queued_writes[path]
+                    self.condition.notify_all()
+                for _ in range(written):
+                    self.queue.task_done()
+
+    def process(self, operation: str, path: str, payload: list | tuple | None) -> None:
+        """Perform one write operation."""
+        if operation == "append":
+            self.append_lines(path, payload)
+        elif operation == "rewrite":
+            lines, keep_after = payload
+            appended = self.appended.get(path, []) if keep_after is not None else []
+            kept = [entry for entry in appended if entry[0] > keep_after]
+            self.write_lines(path, lines + [line for _, line in kept])
+            self.appended[path] = kept
+        else:  # truncate_unsaved
+            self.truncate_unsaved_lines(path)
+            # Appended lines are never before the last saved marker
+            self.appended.pop(path, None)
+
+    def append_lines(self, path: str, entries: list[tuple[int, str]]) -> None:
+        """Append numbered lines to a journal file."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with Path(path).open("a", encoding="utf-8") as f:
+            f.writelines(f"{line}\n" for _, line in entries)
+        self.appended.setdefault(path, []).extend(entries)
+
+    @staticmethod
+    def write_lines(path: str, lines: list[str]) -> None:
+        """Atomically replace a journal file with the given lines."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        temp_path = Path(path).with_suffix(".tmp")
+        temp_path.write_text("".join(f"{line}\n" for line in lines), encoding="utf-8")
+        temp_path.replace(path)
+
+    def truncate_unsaved_lines(self, path: str) -> None:
+        """Remove the lines after the last saved marker of a journal file."""
+        if not Path(path).exists():
+            return
+        lines = Path(path).read_text(encoding="utf-8").splitlines()
+        saved_indices = [i for i, line in enumerate(lines) if json.loads(line).get("op") == "saved"]
+        self.write_lines(path, lines[: saved_indices[-1] + 1] if saved_indices else [])
+
+
+class EditJournal:
+    """Journal of the edits made to the annotations of one image."""
+
+    def __init__(self, image_path: str, writer: JournalWriter, get_revision: Callable[[], float | None]) -> None:
+        """Initialize the EditJournal.
+
+        Args:
+            image_path: Path to the image the journal belongs to.
+            writer: Writer thread shared by all journals.
+            get_revision: Returns the revision of the stored annotations of the image.
+
+        """
+        self.path = get_journal_path(image_path)
+        self.writer = writer
+        self.get_revision = get_revision
+
+    def record(self, entry: dict) -> None:
+        """Append an entry to the journal."""
+        self.writer.append(self.path, json.dumps(entry))
+
+    def record_command(self, command: EditCommand) -> None:
+        """Append an applied edit."""
+        self.record({"op": "do", "command": command.to_dict()})
+
+    def record_undo(self) -> None:
+        """Append an undo of the most recent edit."""
+        self.record({"op": "undo"})
+
+    def record_redo(self) -> None:
+        """Append a redo of the most recently undone edit."""
+        self.record({"op": "redo"})
+
+    def start(self) -> None:
+        """Begin a new journal for the annotations as they are stored."""
+        self.compact([])
+
+    def get_sequence(self) -> int:
+        """Get the position in the journal of the annotations as they are now, to compact it later."""
+        return self.writer.get_sequence()
+
+    def compact(self, undo_commands: list[EditCommand], sequence: int | None = None) -> None:
+        """Rewrite the journal as the given history of the just saved annotations.
+
+        Args:
+            undo_commands: Undo history of the saved annotations.
+            sequence: Position returned by ``get_sequence`` when the saved annotations were
+                taken. Edits recorded after it are kept as unsaved edits. Defaults to now.
+
+        """
+        lines = [json.dumps({"op": "base", "revision": self.get_revision()})]
+        lines.extend(json.dumps({"op": "do", "command": command.to_dict()}) for command in undo_commands)
+        lines.append(json.dumps({"op": "saved"}))
+        self.writer.rewrite(self.path, lines, self.get_sequence() if sequence is None else sequence)
+
+    def discard_unsaved(self) -> None:
+        """Drop the edits made since the last save."""
+        self.writer.truncate_unsaved(self.path)
+
+    def load(self) -> tuple[list[EditCommand], list[EditCommand], list[tuple[str, EditCommand | None]]]:
+        """Read the journal.
+
+        Returns:
+            The undo and redo stacks of the saved annotations, and the unsaved
+            operations as ("do", command), ("undo", None) or ("redo", None) tuples.
+            Everything is empty if there is no journal or it does not match the
+            stored annotations.
+
+        """
+        path = Path(self.path)
+        if not path.exists():
+            return [], [], []
+        try:
+            entries = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable edit journal {path}: {e}")
+            return [], [], []
+
+        # The journal is stale if the annotations were changed outside of this tool
+        if not entries or entries[0].get("op") != "base":
+            return [], [], []
+        if entries[0].get("revision") != self.get_revision():
+            return [], [], []
+
+        saved_indices = [i for i, entry in enumerate(entries) if entry.get("op") == "saved"]
+        saved_end = saved_indices[-1] + 1 if saved_indices else 1
+        try:
+            undo_commands, redo_commands = self.replay_history(entries[1:saved_end])
+            unsaved = [
+                (entry["op"], command_from_dict(entry["command"]) if entry["op"] == "do" else None)
+                for entry in entries[saved_end:]
+                if entry.get("op") in {"do", "undo", "redo"}
+            ]
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"Ignoring corrupt edit journal {path}: {e}")
+            return [], [], []
+        return undo_commands, redo_commands, unsaved
+
+    @staticmethod
+    def replay_history(entries: list[dict]) -> tuple[list[EditCommand], list[EditCommand]]:
+        """Rebuild the undo and redo stacks from journal entries without applying them."""
+        undo_commands = []
+        redo_commands = []
+        for entry in entries:
+            if entry["op"] == "do":
+                undo_commands.append(command_from_dict(entry["command"]))
+                redo_commands.clear()
+            elif entry["op"] == "undo" and undo_commands:
+                redo_commands.append(undo_commands.pop())
+            elif entry["op"] == "redo" and redo_commands:
+                undo_commands.append(redo_commands.pop())
+        return undo_commands, redo_commands
@@ -0,0 +1,76 @@
+"""Background scanning of image folders."""
+
+import os
+import threading
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from annotation_sdk.archive_source import ARCHIVE_EXTENSIONS, expand_archives
+from annotation_sdk.dataset import IMAGE_EXTENSIONS, natural_sort_key
+from annotation_sdk.frame_source import FRAME_SOURCE_EXTENSIONS, expand_frame_sources
+
+
+class FolderScanner(QObject):
+    """Lists the images of a folder on a background thread.
+
+    The folder is read in one streaming pass with ``os.scandir``, reporting the
+    number of images found as it goes, and the naturally sorted paths are
+    delivered once the scan is complete.
+    """
+
+    # Number of images found so far
+    progress = pyqtSignal(int)
+    # Naturally sorted image paths of the scanned folder
+    finished = pyqtSignal(str, list)
+    failed = pyqtSignal(str, str)
+
+    PROGRESS_INTERVAL = 5000
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        """Initialize the FolderScanner."""
+        super().__init__(parent)
+        self.generation = 0
+
+    def scan(self, folder: str) -> None:
+        """Start listing the images of a folder, cancelling any scan in progress.
+
+        Args:
+            folder: Folder to scan.
+
+        """
+        self.generation += 1
+        generation = self.generation
+        threading.Thread(target=self.run, args=(folder, generation), name="FolderScanner", daemon=True).start()
+
+    def cancel(self) -> None:
+        """Cancel the scan in progress."""
+        self.generation += 1
+
+    def run(self, folder: str, generation: int) -> None:
+        """List the images of a folder (runs on the scanner thread)."""
+        try:
+            image_paths = self.list_images(folder, generation)
+        except OSError as e:
+            if generation == self.generation:
+                self.failed.emit(folder, str(e))
+            return
+        if generation == self.generation:
+            self.finished.emit(folder, image_paths)
+
+    def list_images(self, folder: str, generation: int) -> list[str]:
+        """Get the naturally sorted image, frame and member paths of a folder, stopping early if cancelled."""
+        images = []
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if generation != self.generation:
+                    return []
+                if (
+                    entry.name.lower().endswith(IMAGE_EXTENSIONS + FRAME_SOURCE_EXTENSIONS + ARCHIVE_EXTENSIONS)
+                    and entry.is_file()
+                ):
+                    images.append(entry)
+                    if len(images) % self.PROGRESS_INTERVAL == 0:
+                        self.progress.emit(len(images))
+        images.sort(key=lambda entry: natural_sort_key(entry.name))
+        # Stacks are listed as their frames and archives as their images, in their place
+        return expand_archives(expand_frame_sources(entry.path for entry in images))
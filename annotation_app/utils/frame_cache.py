@@ -0,0 +1,227 @@
+"""Decoded images shared by the image viewer, the prefetcher and the detectors.
+
+OpenCV is imported by the functions that decode, so it is loaded with the
+first image rather than when the application starts.
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+from PyQt5.QtGui import QImage
+
+from annotation_sdk.archive_source import read_member, split_member_path
+from annotation_sdk.frame_source import (
+    apply_window_level,
+    get_default_window_level,
+    open_frame_source,
+    split_frame_path,
+)
+
+
+def qimage_to_array(image: QImage) -> np.ndarray | None:
+    """Copy the pixels of a QImage into a grayscale or BGRA array, or None if the image is null."""
+    if image.isNull():
+        return None
+    grayscale = image.isGrayscale()
+    image = image.convertToFormat(QImage.Format_Grayscale8 if grayscale else QImage.Format_RGB32)
+    channels = 1 if grayscale else 4
+    bits = image.constBits()
+    bits.setsize(image.sizeInBytes())
+    rows = np.frombuffer(bits, dtype=np.uint8).reshape(image.height(), image.bytesPerLine())
+    frame = rows[:, : image.width() * channels].reshape(image.height(), image.width(), channels)
+    return frame[:, :, 0].copy() if grayscale else frame.copy()
+
+
+def to_display_layout(image: np.ndarray) -> np.ndarray:
+    """Convert a BGR image to BGRA, the layout of QImage.Format_RGB32, leaving grayscale images as they are."""
+    import cv2  # noqa: PLC0415
+
+    return cv2.cvtColor(image, cv2.COLOR_BGR2BGRA) if image.ndim == 3 else image
+
+
+def decode_member_array(member_path: str) -> np.ndarray | None:
+    """Decode an image of an archive into a grayscale array, or a BGRA array for color images."""
+    import cv2  # noqa: PLC0415
+
+    try:
+        data = read_member(member_path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Failed to read {member_path}: {e}")
+        return None
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_ANYCOLOR)
+    if image is None:
+        return qimage_to_array(QImage.fromData(data))
+    return to_display_layout(image)
+
+
+def decode_image_array(image_path: str) -> np.ndarray | None:
+    """Decode an image into a grayscale array, or a BGRA array for color images.
+
+    Args:
+        image_path: Path to the image, or member path of an image of an archive.
+
+    Returns:
+        The decoded image, or None if it could not be read.
+
+    """
+    import cv2  # noqa: PLC0415
+
+    if split_member_path(image_path) is not None:
+        return decode_member_array(image_path)
+    image = cv2.imread(image_path, cv2.IMREAD_ANYCOLOR)
+    if image is None:
+        # Formats OpenCV cannot read, such as GIF
+        return qimage_to_array(QImage(image_path))
+    return to_display_layout(image)
+
+
+def decode_frame_array(frame_path: str, window_level: tuple[float, float] | None = None) -> np.ndarray | None:
+    """Read a frame of a stack and map its values to 8-bit display gray levels.
+
+    Args:
+        frame_path: Frame path of the frame.
+        window_level: Window and level of the displayed values, or None for the full bit depth.
+
+    Returns:
+        The frame for display, or None if it could not be read.
+
+    """
+    source_path, index = split_frame_path(frame_path)
+    try:
+        source = open_frame_source(source_path)
+        frame = source.get_frame(index)
+    except (OSError, ValueError, IndexError) as e:
+        print(f"Failed to read frame {frame_path}: {e}")
+        return None
+    window, level = window_level or get_default_window_level(source.bit_depth)
+    return np.ascontiguousarray(apply_window_level(frame, window, level))
+
+
+def array_to_qimage(frame: np.ndarray) -> QImage:
+    """Wrap a grayscale or BGRA array as a QImage without copying its pixels.
+
+    The QImage reads the memory of the array, so it must not be used after the
+    array is gone; converting it to a QPixmap makes a copy that can be kept.
+    """
+    height, width = frame.shape[:2]
+    image_format = QImage.Format_Grayscale8 if frame.ndim == 2 else QImage.Format_RGB32
+    return QImage(frame.data, width, height, frame.strides[0], image_format)
+
+
+class FrameCache:
+    """Decodes each image once and keeps the most recently used ones in memory.
+
+    The decoded arrays are shared read-only by everything that needs the pixels:
+    the image viewer wraps them as QImages and the detectors read them directly.
+    The cache is bounded in bytes and drops the least recently used images first.
+    Concurrent requests for an image that is being decoded wait for that decode
+    instead of starting another one.
+    """
+
+    def __init__(self, max_bytes: int = 256_000_000) -> None:
+        """Initialize the FrameCache.
+
+        Args:
+            max_bytes: Maximum total size of the cached images.
+
+        """
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.frames = OrderedDict()
+        self.cached_bytes = 0
+        self.pending = {}
+        self.window_level = None
+        # Decodes started before the frames were dropped are not cached
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, image_path: str) -> bool:
+        """Check if an image is cached."""
+        return image_path in self.frames
+
+    def decode(self, image_path: str) -> np.ndarray | None:
+        """Decode an image or a frame of a stack with the current window and level."""
+        if split_frame_path(image_path) is not None:
+            return decode_frame_array(image_path, self.window_level)
+        return decode_image_array(image_path)
+
+    def get(self, image_path: str) -> np.ndarray | None:
+        """Get a decoded image, decoding it only if it is not cached or being decoded.
+
+        Args:
+            image_path: Path to the image, or frame path of a frame of a stack.
+
+        Returns:
+            The read-only decoded image, or None if it could not be read.
+
+        """
+        with self.lock:
+            frame = self.frames.get(image_path)
+            if frame is not None:
+                self.frames.move_to_end(image_path)
+                self.hits += 1
+                return frame
+            decoding = self.pending.get(image_path)
+            first_request = decoding is None
+            if first_request:
+                decoding = self.pending[image_path] = Future()
+                generation = self.generation
+                self.misses += 1
+            else:
+                self.hits += 1
+        if first_request:
+            # Later requests wait for the result of this decode
+            frame = None
+            try:
+                frame = self.decode(image_path)
+                if frame is not None:
+                    frame.flags.writeable = False
+            finally:
+                self.store(image_path, frame, generation)
+                decoding.set_result(frame)
+        return decoding.result()
+
+    def store(self, image_path: str, frame: np.ndarray | None, generation: int) -> None:
+        """Cache a finished decode, dropping the least recently used images if the cache is full."""
+        with self.lock:
+            self.pending.pop(image_path, None)
+            if frame is None or generation != self.generation:
+                return
+            self.frames[image_path] = frame
+            self.cached_bytes += frame.nbytes
+            # The newest image is kept even if it is larger than the whole cache
+            while self.cached_bytes > self.max_bytes and len(self.frames) > 1:
+                _, evicted = self.frames.popitem(last=False)
+                self.cached_bytes -= evicted.nbytes
+                self.evictions += 1
+
+    def set_window_level(self, window_level: tuple[float, float] | None) -> None:
+        """Change how frame values are displayed, dropping the frames decoded with the old setting."""
+        with self.lock:
+            self.window_level = window_level
+            self.generation += 1
+            for image_path in [path for path in self.frames if split_frame_path(path) is not None]:
+                self.cached_bytes -= self.frames.pop(image_path).nbytes
+
+    def clear(self) -> None:
+        """Drop all cached images."""
+        with self.lock:
+            self.generation += 1
+            self.frames.clear()
+            self.cached_bytes = 0
+
+    def summary(self) -> str:
+        """Get a short multi-line text describing the cache statistics."""
+        with self.lock:
+            requests = self.hits + self.misses
+            hit_rate = 100 * self.hits / requests if requests else 0.0
+            return (
+                f"frames:  {len(self.frames):6d} cached\n"
+                f"memory:  {self.cached_bytes / 1e6:6.1f} MB\n"
+                f"hits:    {hit_rate:6.1f} %\n"
+                f"decodes: {self.misses:6d}"
+            )
@@ -0,0 +1,82 @@
+"""Background decoding of the images next to the current one."""
+
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .frame_cache import FrameCache
+
+
+class ImagePrefetcher:
+    """Decodes the images ahead of the current one into the frame cache on worker threads.
+
+    Images are prefetched in the direction the user last navigated, plus one
+    behind, so moving to the next image usually finds it already decoded.
+    """
+
+    def __init__(self, frame_cache: FrameCache, depth: int = 4, max_workers: int = 2) -> None:
+        """Initialize the ImagePrefetcher.
+
+        Args:
+            frame_cache: Cache the images are decoded into.
+            depth: Number of images decoded ahead in the navigation direction.
+            max_workers: Number of decoding threads.
+
+        """
+        self.frame_cache = frame_cache
+        self.depth = depth
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ImagePrefetch")
+        self.futures = {}
+        self.position = None
+        self.direction = 1
+
+    def get(self, image_path: str) -> np.ndarray | None:
+        """Get a decoded image, from the frame cache if it was prefetched.
+
+        Args:
+            image_path: Path to the image.
+
+        Returns:
+            The read-only decoded image, or None if it could not be read.
+
+        """
+        # A queued prefetch may sit behind other decodes, a running one is shared by the cache
+        future = self.futures.pop(image_path, None)
+        if future is not None:
+            future.cancel()
+        return self.frame_cache.get(image_path)
+
+    def prefetch(self, position: int, get_path: Callable[[int], str | None]) -> None:
+        """Decode the images around a position of the navigation order in the background.
+
+        Args:
+            position: Position of the current image in the navigation order.
+            get_path: Returns the image path at a position, or None outside the order.
+
+        """
+        if self.position is not None and position != self.position:
+            self.direction = 1 if position > self.position else -1
+        self.position = position
+
+        offsets = [self.direction * step for step in range(1, self.depth + 1)] + [-self.direction]
+        paths = [path for path in (get_path(position + offset) for offset in offsets) if path is not None]
+        # Decodes that fell out of the window are not needed any more
+        for path, future in list(self.futures.items()):
+            if future.done() or (path not in paths and future.cancel()):
+                del self.futures[path]
+        for path in paths:
+            if path not in self.futures and path not in self.frame_cache:
+                self.futures[path] = self.executor.submit(self.frame_cache.get, path)
+
+    def clear(self) -> None:
+        """Drop all queued decodes."""
+        for future in self.futures.values():
+            future.cancel()
+        self.futures.clear()
+        self.position = None
+
+    def close(self) -> None:
+        """Stop the decoding threads."""
+        self.clear()
+        self.executor.shutdown(wait=True)
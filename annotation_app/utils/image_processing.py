@@ -1,8 +1,6 @@
 """Image processing utilities for ellipse fitting and point selection."""
 
 import numpy as np
-from PyQt5.QtCore import QPointF
-from scipy import optimize
 
 
 def fit_ellipse(x: np.ndarray, y: np.ndarray) -> np.ndarray:
@@ -33,6 +31,9 @@ def fit_ellipse(x: np.ndarray, y: np.ndarray) -> np.ndarray:
     theta_estimate = 0
 
     estimate = [*center_estimate, a_estimate, b_estimate, theta_estimate]
+    # SciPy takes longer to import than the rest of the application, so only ellipse fits load it
+    from scipy import optimize  # noqa: PLC0415
+
     result = optimize.minimize(
         lambda c: np.sum(f(c) ** 2),
         estimate,
@@ -43,28 +44,24 @@ def fit_ellipse(x: np.ndarray, y: np.ndarray) -> np.ndarray:
     return result.x
 
 
-def find_closest_point(points: list[QPointF], pos: QPointF, factor: float) -> QPointF | None:
-    """Find the closest point to the given position.
+def find_closest_point(points: np.ndarray, pos: tuple[float, float], factor: float) -> int | None:
+    """Find the point closest to the given position.
 
     Args:
-        points (list): List of QPointF objects representing the points.
-        pos (QPointF): The position to check.
+        points (np.ndarray): (N, 2) array of point coordinates.
+        pos (tuple): The (x, y) position to check.
         factor (float): The zoom factor.
 
     Returns:
-        QPointF or None: The closest point if within the threshold, otherwise None.
+        int or None: Index of the closest point if within the threshold, otherwise None.
 
     """
-    min_dist = float("inf")
-    closest_point = None
-
-    for point in points:
-        dist = (point.x() - pos.x()) ** 2 + (point.y() - pos.y()) ** 2
-        if dist < min_dist:
-            min_dist = dist
-            closest_point = point
+    if len(points) == 0:
+        return None
+    distances = np.sum((points - pos) ** 2, axis=1)
+    index = int(np.argmin(distances))
 
     # Only select the point if it's within a certain radius
-    if min_dist < (10 / factor) ** 2:
-        return closest_point
+    if distances[index] < (10 / factor) ** 2:
+        return index
     return None
@@ -0,0 +1,169 @@
+"""Render timing statistics and event-loop stall detection."""
+
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from PyQt5.QtCore import QObject, QTimer
+
+PERFORMANCE_LOGGER_NAME = "eye_annotation_tool.performance"
+DEFAULT_LOG_PATH = Path.home() / ".eye_annotation_tool" / "logs" / "performance.log"
+
+logger = logging.getLogger(PERFORMANCE_LOGGER_NAME)
+
+
+def setup_performance_logging(
+    log_path: Path = DEFAULT_LOG_PATH,
+    max_bytes: int = 1_000_000,
+    backup_count: int = 3,
+) -> logging.Logger:
+    """Attach a rolling log file to the performance logger.
+
+    Args:
+        log_path: Path of the log file.
+        max_bytes: Size at which the log file is rotated.
+        backup_count: Number of rotated log files to keep.
+
+    Returns:
+        The configured performance logger.
+
+    """
+    if not any(isinstance(handler, RotatingFileHandler) for handler in logger.handlers):
+        try:
+            Path(log_path).parent.mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        except OSError as e:
+            print(f"Could not open performance log {log_path}: {e}")
+        else:
+            handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+            logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+class RenderStats:
+    """Keeps the timings of the last render and a rolling input event rate."""
+
+    def __init__(self, window_seconds: float = 1.0) -> None:
+        """Initialize the RenderStats.
+
+        Args:
+            window_seconds: Length of the window used for the event rate.
+
+        """
+        self.window_seconds = window_seconds
+        self.repaint_ms = 0.0
+        self.scale_ms = 0.0
+        self.overlay_ms = 0.0
+        self.event_times = deque()
+
+    def record_render(self, repaint_ms: float, scale_ms: float, overlay_ms: float) -> None:
+        """Record the timings of a finished render."""
+        self.repaint_ms = repaint_ms
+        self.scale_ms = scale_ms
+        self.overlay_ms = overlay_ms
+
+    def record_event(self) -> None:
+        """Record that an event was processed."""
+        now = time.perf_counter()
+        self.event_times.append(now)
+        self.drop_old_events(now)
+
+    def drop_old_events(self, now: float) -> None:
+        """Forget events that fell out of the rolling window."""
+        while self.event_times and now - self.event_times[0] > self.window_seconds:
+            self.event_times.popleft()
+
+    def events_per_second(self) -> float:
+        """Get the event rate over the rolling window."""
+        self.drop_old_events(time.perf_counter())
+        return len(self.event_times) / self.window_seconds
+
+    def summary(self) -> str:
+        """Get a short multi-line text describing the current statistics."""
+        return (
+            f"repaint: {self.repaint_ms:6.1f} ms\n"
+            f"scale:   {self.scale_ms:6.1f} ms\n"
+            f"overlay: {self.overlay_ms:6.1f} ms\n"
+            f"events:  {self.events_per_second():6.0f} /s"
+        )
+
+
+class StallWatchdog(QObject):
+    """Detects Qt event-loop stalls and logs the stack of the blocking call.
+
+    A timer on the GUI thread updates a heartbeat. A background thread checks the
+    heartbeat and, when it is older than the threshold, logs the current Python
+    stack of the GUI thread once per stall.
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float = 100,
+        heartbeat_ms: int = 20,
+        parent: QObject | None = None,
+    ) -> None:
+        """Initialize the StallWatchdog.
+
+        Args:
+            threshold_ms: Minimum stall duration that gets logged.
+            heartbeat_ms: Interval of the GUI thread heartbeat.
+            parent: Optional parent object.
+
+        """
+        super().__init__(parent)
+        self.threshold = threshold_ms / 1000
+        self.gui_thread_id = threading.get_ident()
+        self.last_heartbeat = time.monotonic()
+        self.stall_reported = False
+        self.stop_event = threading.Event()
+        self.thread = None
+
+        self.heartbeat_timer = QTimer(self)
+        self.heartbeat_timer.setInterval(heartbeat_ms)
+        self.heartbeat_timer.timeout.connect(self.beat)
+
+    def start(self) -> None:
+        """Start the heartbeat and the monitoring thread."""
+        self.last_heartbeat = time.monotonic()
+        self.heartbeat_timer.start()
+        if self.thread is None:
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self.monitor, name="StallWatchdog", daemon=True)
+            self.thread.start()
+
+    def stop(self) -> None:
+        """Stop the heartbeat and the monitoring thread."""
+        self.heartbeat_timer.stop()
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=1)
+            self.thread = None
+
+    def beat(self) -> None:
+        """Update the heartbeat, logging the length of a stall that just ended."""
+        now = time.monotonic()
+        if self.stall_reported:
+            logger.warning("Event loop resumed after %.0f ms", (now - self.last_heartbeat) * 1000)
+            self.stall_reported = False
+        self.last_heartbeat = now
+
+    def monitor(self) -> None:
+        """Check the heartbeat until stopped (runs on the watchdog thread)."""
+        poll_interval = min(self.threshold / 4, 0.05)
+        while not self.stop_event.wait(poll_interval):
+            stalled_for = time.monotonic() - self.last_heartbeat
+            if stalled_for > self.threshold and not self.stall_reported:
+                self.stall_reported = True
+                self.report_stall(stalled_for)
+
+    def report_stall(self, stalled_for: float) -> None:
+        """Log the current stack of the GUI thread."""
+        frame = sys._current_frames().get(self.gui_thread_id)  # noqa: SLF001
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else "<unavailable>\n"
+        logger.warning("Event loop stalled for more than %.0f ms in:\n%s", stalled_for * 1000, stack.rstrip())
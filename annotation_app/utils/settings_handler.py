@@ -7,6 +7,19 @@ DEFAULT_SETTINGS = {
     "pupil_detector": "Pupil Core",
     "iris_detector": "disabled",
     "eyelid_detector": "disabled",
+    "stall_threshold_ms": 100,
+    "undo_depth": 200,
+    "undo_budget_bytes": 8_000_000,
+    "autosave": False,
+    "autosave_delay_ms": 1000,
+    "prefetch_depth": 4,
+    "frame_cache_max_bytes": 256_000_000,
+    "thumbnail_size": 128,
+    "thumbnail_overlay": True,
+    "thumbnail_cache_dir": "",
+    "frame_window_level": None,
+    # Display enhancement settings by dataset folder
+    "display_enhancements": {},
 }
 
 
@@ -32,8 +45,10 @@ class SettingsHandler:
 
     def save_settings(self) -> None:
         """Save current settings to file."""
-        with Path(self.settings_file).open("w", encoding="utf-8") as f:
-            json.dump(self.settings, f, indent=4)
+        # The file is replaced in one step, so an interrupted save cannot leave it truncated
+        temp_path = Path(self.settings_file).with_suffix(".tmp")
+        temp_path.write_text(json.dumps(self.settings, indent=4), encoding="utf-8")
+        temp_path.replace(self.settings_file)
 
     def get_setting(self, key: str) -> str:
         """Get a setting value by key.
@@ -47,7 +62,7 @@ class SettingsHandler:
         """
         return self.settings.get(key, DEFAULT_SETTINGS.get(key))
 
-    def set_setting(self, key: str, value: str) -> None:
+    def set_setting(self, key: str, value: object) -> None:
         """Set a setting value and save to file.
 
         Args:
@@ -0,0 +1,263 @@
+"""Thumbnails of images, rendered on worker threads and cached on disk."""
+
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from PyQt5.QtCore import QBuffer, QObject, QPointF, QStandardPaths, Qt, pyqtSignal
+from PyQt5.QtGui import QColor, QImage, QImageReader, QPainter, QPen
+
+from annotation_sdk.annotation_io import AnnotationBackend
+from annotation_sdk.archive_source import get_storage_path, read_member, split_member_path
+from annotation_sdk.frame_source import split_frame_path
+from annotation_sdk.model import EYES, EyeAnnotation
+
+from .annotation_io import points_to_polygon
+from .frame_cache import array_to_qimage, decode_frame_array
+
+# Same colors as the annotations in the image viewer
+OVERLAY_COLORS = {
+    "pupil": QColor(0, 127, 118),
+    "iris": QColor(139, 122, 162),
+    "eyelid_contour": QColor(0, 155, 201),
+    "glint": QColor(255, 165, 0),
+}
+ROI_COLOR = QColor(0, 188, 212)
+THUMBNAIL_FORMAT = "jpg"
+THUMBNAIL_QUALITY = 90
+
+
+def get_default_cache_dir() -> str:
+    """Get the folder of the thumbnail cache in the user cache location."""
+    return str(Path(QStandardPaths.writableLocation(QStandardPaths.GenericCacheLocation)) / "eye_annotation_tool")
+
+
+def draw_annotation_overlay(image: QImage, eye_data: dict[str, EyeAnnotation], factor: float) -> None:
+    """Draw the ellipses, points and ROI of both eyes onto a thumbnail.
+
+    Args:
+        image: Thumbnail to draw on.
+        eye_data: Annotations of both eyes, in image coordinates.
+        factor: Size of the thumbnail relative to the image.
+
+    """
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.Antialiasing)
+    for eye in EYES:
+        annotation = eye_data[eye]
+        for kind, color in OVERLAY_COLORS.items():
+            points = annotation.get_points(kind)
+            if len(points):
+                painter.setPen(QPen(color, 2, Qt.SolidLine, Qt.RoundCap))
+                painter.drawPoints(points_to_polygon(points, factor))
+        for ellipse, color in (
+            (annotation.pupil_ellipse, OVERLAY_COLORS["pupil"]),
+            (annotation.iris_ellipse, OVERLAY_COLORS["iris"]),
+        ):
+            if ellipse is None:
+                continue
+            cx, cy, width, height, angle = ellipse
+            painter.save()
+            painter.setPen(QPen(color, 1.5))
+            painter.translate(QPointF(cx * factor, cy * factor))
+            painter.rotate(angle)
+            painter.drawEllipse(QPointF(0, 0), width * factor / 2, height * factor / 2)
+            painter.restore()
+        if annotation.roi is not None:
+            x, y, width, height = annotation.roi
+            painter.setPen(QPen(ROI_COLOR, 1, Qt.DashLine))
+            painter.drawRect(int(x * factor), int(y * factor), int(width * factor), int(height * factor))
+    painter.end()
+
+
+def render_thumbnail(
+    image_path: str,
+    size: int,
+    eye_data: dict[str, EyeAnnotation] | None = None,
+    window_level: tuple[float, float] | None = None,
+) -> QImage:
+    """Decode an image at thumbnail size, optionally with its annotations drawn on it.
+
+    Args:
+        image_path: Path to the image, frame path of a frame of a stack or member path of an image of an archive.
+        size: Maximum width and height of the thumbnail.
+        eye_data: Annotations to draw, or None for the plain image.
+        window_level: Window and level of the displayed values of frames, or None for the full bit depth.
+
+    Returns:
+        The thumbnail, which is null if the image could not be read.
+
+    Raises:
+        OSError: If the archive of an archive member cannot be read.
+        KeyError: If the archive has no image of that name.
+        ValueError: If the archive is invalid.
+
+    """
+    if split_frame_path(image_path) is not None:
+        frame = decode_frame_array(image_path, window_level)
+        image = QImage() if frame is None else array_to_qimage(frame)
+        full_size = image.size()
+    else:
+        if split_member_path(image_path) is not None:
+            # The buffer has to outlive the reader
+            buffer = QBuffer()
+            buffer.setData(read_member(image_path))
+            reader = QImageReader(buffer)
+        else:
+            reader = QImageReader(image_path)
+        full_size = reader.size()
+        if full_size.isValid():
+            # JPEG images are decoded directly at the reduced size
+            reader.setScaledSize(full_size.scaled(size, size, Qt.KeepAspectRatio))
+        image = reader.read()
+        if not full_size.isValid():
+            full_size = image.size()
+    if image.isNull():
+        return image
+    if image.width() > size or image.height() > size:
+        image = image.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    image = image.convertToFormat(QImage.Format_RGB32)
+    if eye_data is not None:
+        draw_annotation_overlay(image, eye_data, image.width() / full_size.width())
+    return image
+
+
+class ThumbnailCache(QObject):
+    """Renders thumbnails on a worker pool and keeps them in an on-disk cache.
+
+    Cache entries are keyed by a hash of the image path, size and modification
+    time, the revision of its annotations and the thumbnail options, so edited
+    images and annotations get new thumbnails and stale entries are never read.
+    Only the most recent requests are kept queued, so scrolling past thousands
+    of images does not queue thousands of renders.
+    """
+
+    # Image path and its thumbnail, emitted from the worker threads
+    thumbnail_ready = pyqtSignal(str, QImage)
+
+    def __init__(
+        self,
+        cache_dir: str,
+        size: int = 128,
+        max_workers: int = 2,
+        max_pending: int = 64,
+        parent: QObject | None = None,
+    ) -> None:
+        """Initialize the ThumbnailCache.
+
+        Args:
+            cache_dir: Folder of the cached thumbnails.
+            size: Maximum width and height of the thumbnails.
+            max_workers: Number of rendering threads.
+            max_pending: Maximum number of queued requests, older ones are dropped.
+            parent: Parent object.
+
+        """
+        super().__init__(parent)
+        self.cache_dir = Path(cache_dir) / "thumbnails"
+        self.size = size
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="Thumbnail")
+        self.lock = threading.Lock()
+        self.futures = OrderedDict()
+        self.window_level = None
+
+    def get_cache_path(self, image_path: str, revision: float | None, overlay: bool) -> Path:
+        """Get the cache file of a thumbnail from the state of its image and annotations."""
+        frame = split_frame_path(image_path)
+        # Frames of a stack change with the stack and with how their values are displayed,
+        # images of an archive with the archive
+        stat = Path(get_storage_path(image_path) if frame is None else frame[0]).stat()
+        window_level = None if frame is None else self.window_level
+        key = (
+            f"{Path(image_path).resolve()}\0{stat.st_size}\0{stat.st_mtime_ns}\0{revision}\0{self.size}\0{overlay}"
+            f"\0{window_level}"
+        )
+        digest = hashlib.sha1(key.encode("utf-8"), usedforsecurity=False).hexdigest()
+        return self.cache_dir / digest[:2] / f"{digest}.{THUMBNAIL_FORMAT}"
+
+    def request(
+        self,
+        image_path: str,
+        backend: AnnotationBackend,
+        overlay: bool,
+        wait_for_save: Callable[[str], None] | None = None,
+    ) -> None:
+        """Queue a thumbnail, which is delivered by ``thumbnail_ready``.
+
+        Args:
+            image_path: Path to the image.
+            backend: Storage of the annotations of the image.
+            overlay: Whether to draw the annotations on the thumbnail.
+            wait_for_save: Blocks until a queued save of the annotations of an image is written.
+
+        """
+        with self.lock:
+            if image_path in self.futures:
+                self.futures.move_to_end(image_path)
+                return
+            future = self.executor.submit(self.load, image_path, backend, overlay, wait_for_save)
+            self.futures[image_path] = future
+            # The oldest requests are for rows that were scrolled past
+            while len(self.futures) > self.max_pending:
+                _, oldest = self.futures.popitem(last=False)
+                oldest.cancel()
+        future.add_done_callback(lambda future: self.finish(image_path, future))
+
+    def load(
+        self,
+        image_path: str,
+        backend: AnnotationBackend,
+        overlay: bool,
+        wait_for_save: Callable[[str], None] | None,
+    ) -> QImage:
+        """Read a thumbnail from the cache, or render and cache it (runs on a worker thread)."""
+        if overlay and wait_for_save is not None:
+            wait_for_save(image_path)
+        revision = backend.get_revision(image_path) if overlay else None
+        cache_path = self.get_cache_path(image_path, revision, overlay)
+        image = QImage(str(cache_path))
+        if not image.isNull():
+            return image
+
+        eye_data = backend.load_annotations(image_path) if revision is not None else None
+        image = render_thumbnail(image_path, self.size, eye_data, self.window_level)
+        if not image.isNull():
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = cache_path.with_name(f"{cache_path.stem}.{threading.get_ident()}.tmp")
+            if image.save(str(temp_path), THUMBNAIL_FORMAT, THUMBNAIL_QUALITY):
+                temp_path.replace(cache_path)
+            else:
+                temp_path.unlink(missing_ok=True)
+        return image
+
+    def finish(self, image_path: str, future: Future) -> None:
+        """Deliver a finished thumbnail (runs on the worker thread)."""
+        with self.lock:
+            if self.futures.get(image_path) is future:
+                del self.futures[image_path]
+        if future.cancelled():
+            return
+        try:
+            image = future.result()
+        except (OSError, ValueError, KeyError, sqlite3.Error) as e:
+            print(f"Failed to create thumbnail of {image_path}: {e}")
+            return
+        if not image.isNull():
+            self.thumbnail_ready.emit(image_path, image)
+
+    def clear(self) -> None:
+        """Drop all queued requests."""
+        with self.lock:
+            for future in self.futures.values():
+                future.cancel()
+            self.futures.clear()
+
+    def close(self) -> None:
+        """Stop the rendering threads."""
+        self.clear()
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,65 @@
+"""Headless access to eye annotations using only the standard library and numpy.
+
+This package does not import Qt, so training pipelines and batch jobs can read
+and write annotation files without a GUI toolkit.
+"""
+
+from .annotation_io import (
+    BINARY_EXTENSION,
+    JSON_EXTENSION,
+    AnnotationBackend,
+    AnnotationFileBackend,
+    convert_annotation_file,
+    find_annotation_path,
+    get_annotation_path,
+    iter_many,
+    load_annotations,
+    load_many,
+    save_annotations,
+)
+from .archive_source import ArchiveSource, expand_archives, open_archive, read_member
+from .dataset import iter_dataset, scan_annotation_files
+from .export import export_dataset
+from .frame_source import FrameSource, apply_window_level, expand_frame_sources, load_frame, open_frame_source
+from .importer import ImportReport, ImportSpec, import_table
+from .model import ANNOTATION_TYPES, ELLIPSE_TYPES, EYES, EyeAnnotation
+from .project_store import PROJECT_STORE_FILENAME, ProjectStore, get_project_store_path
+from .status_index import StatusIndex, annotation_status
+
+__all__ = [
+    "ANNOTATION_TYPES",
+    "BINARY_EXTENSION",
+    "ELLIPSE_TYPES",
+    "EYES",
+    "JSON_EXTENSION",
+    "PROJECT_STORE_FILENAME",
+    "AnnotationBackend",
+    "AnnotationFileBackend",
+    "ArchiveSource",
+    "EyeAnnotation",
+    "FrameSource",
+    "ImportReport",
+    "ImportSpec",
+    "ProjectStore",
+    "StatusIndex",
+    "annotation_status",
+    "apply_window_level",
+    "convert_annotation_file",
+    "expand_archives",
+    "expand_frame_sources",
+    "export_dataset",
+    "find_annotation_path",
+    "get_annotation_path",
+    "get_project_store_path",
+    "import_table",
+    "iter_dataset",
+    "iter_many",
+    "load_annotations",
+    "load_frame",
+    "load_many",
+    "open_archive",
+    "open_frame_source",
+    "read_member",
+    "save_annotations",
+    "scan_annotation_files",
+]
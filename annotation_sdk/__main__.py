@@ -0,0 +1,7 @@
+"""Run the annotation command line tools with ``python -m annotation_sdk``."""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,360 @@
+"""Functions and backends for saving and loading annotation files."""
+
+import json
+import os
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Protocol, TypeVar
+
+from .binary_format import decode_annotations, encode_annotations
+from .model import ANNOTATION_TYPES, EYES, EyeAnnotation
+
+# Annotation files are JSON unless they have the binary extension
+JSON_EXTENSION = ".json"
+BINARY_EXTENSION = ".eyeann"
+# If an image has annotation files in both formats, the first one of these is used
+ANNOTATION_EXTENSIONS = (BINARY_EXTENSION, JSON_EXTENSION)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class AnnotationBackend(Protocol):
+    """Storage of the annotations of a set of images."""
+
+    def load_annotations(self, image_path: str) -> dict[str, EyeAnnotation]:
+        """Load the annotations of an image, or empty annotations if there are none."""
+
+    def save_annotations(self, image_path: str, eye_data: dict[str, EyeAnnotation]) -> None:
+        """Save the annotations of an image."""
+
+    def has_annotations(self, image_path: str) -> bool:
+        """Check if annotations of an image are stored."""
+
+    def get_revision(self, image_path: str) -> float | None:
+        """Get a value that changes whenever the stored annotations of an image change."""
+
+    def close(self) -> None:
+        """Release the resources of the backend."""
+
+
+class AnnotationFileBackend:
+    """Backend storing the annotations of each image in a file next to it.
+
+    Existing annotation files are read and written in their own format, so
+    datasets converted to the binary format keep being updated in place.
+    """
+
+    def __init__(self, extension: str = JSON_EXTENSION) -> None:
+        """Initialize the AnnotationFileBackend.
+
+        Args:
+            extension: Extension of new annotation files, which selects their format.
+
+        """
+        self.extension = extension
+
+    def get_annotation_path(self, image_path: str) -> str:
+        """Get the path of the annotation file of an image."""
+        return find_annotation_path(image_path, self.extension)
+
+    def load_annotations(self, image_path: str) -> dict[str, EyeAnnotation]:
+        """Load the annotations of an image, or empty annotations if there are none."""
+        return load_annotations(self.get_annotation_path(image_path))
+
+    def save_annotations(self, image_path: str, eye_data: dict[str, EyeAnnotation]) -> None:
+        """Save the annotations of an image."""
+        save_annotations(self.get_annotation_path(image_path), eye_data)
+
+    def has_annotations(self, image_path: str) -> bool:
+        """Check if the annotation file of an image exists."""
+        return Path(self.get_annotation_path(image_path)).exists()
+
+    def get_revision(self, image_path: str) -> float | None:
+        """Get the modification time of the annotation file of an image."""
+        try:
+            return Path(self.get_annotation_path(image_path)).stat().st_mtime
+        except OSError:
+            return None
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+
+def save_annotations(
+    annotation_path: str,
+    eye_data: dict[str, EyeAnnotation],
+) -> None:
+    """Save annotation data for both eyes to a file.
+
+    The format is picked by the extension: binary for ``.eyeann`` files, JSON otherwise.
+    The file is replaced atomically, so a crash during the save leaves the previous
+    file intact.
+
+    Args:
+        annotation_path: Path where the annotation file will be saved.
+        eye_data: Dictionary mapping "left" and "right" to their annotations.
+
+    """
+    if Path(annotation_path).suffix == BINARY_EXTENSION:
+        data = encode_annotations(eye_data)
+    else:
+        data = json.dumps(annotations_to_dict(eye_data), indent=2).encode("utf-8")
+    write_atomic(annotation_path, data)
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    """Write a file through a temporary file that replaces it once it is on disk.
+
+    Args:
+        path: Path of the file to write.
+        data: New content of the file.
+
+    """
+    temp_path = Path(path).with_name(f"{Path(path).name}.tmp")
+    with temp_path.open("wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    temp_path.replace(path)
+
+
+def load_annotations(annotation_path: str) -> dict[str, EyeAnnotation]:
+    """Load annotation data for both eyes from a file.
+
+    The format is picked by the extension: binary for ``.eyeann`` files, JSON otherwise.
+
+    Args:
+        annotation_path: Path to the annotation file.
+
+    Returns:
+        Dictionary mapping "left" and "right" to their annotations.
+
+    """
+    if Path(annotation_path).suffix == BINARY_EXTENSION:
+        if Path(annotation_path).exists():
+            return decode_annotations(Path(annotation_path).read_bytes())
+    elif Path(annotation_path).exists():
+        with Path(annotation_path).open(encoding="utf-8") as f:
+            return annotations_from_dict(json.load(f))
+    return {eye: EyeAnnotation() for eye in EYES}
+
+
+def convert_annotation_file(source_path: str, destination_path: str) -> None:
+    """Convert an annotation file to the format given by the extension of the destination.
+
+    Args:
+        source_path: Path to the annotation file to convert.
+        destination_path: Path of the converted annotation file.
+
+    """
+    save_annotations(destination_path, load_annotations(source_path))
+
+
+def annotations_to_dict(eye_data: dict[str, EyeAnnotation]) -> dict:
+    """Convert the annotations of both eyes to the JSON-serializable file layout.
+
+    Args:
+        eye_data: Dictionary mapping "left" and "right" to their annotations.
+
+    Returns:
+        Dictionary in the layout of the annotation files.
+
+    """
+    serializable_data = {}
+    for eye in EYES:
+        annotation = eye_data[eye]
+        serializable_data[eye] = {
+            "pupil_points": annotation.pupil_points.tolist(),
+            "iris_points": annotation.iris_points.tolist(),
+            "eyelid_contour_points": annotation.eyelid_contour_points.tolist(),
+            "glint_points": annotation.glint_points.tolist(),
+            "pupil_ellipse": ellipse_to_dict(annotation.pupil_ellipse),
+            "iris_ellipse": ellipse_to_dict(annotation.iris_ellipse),
+            "roi": annotation.roi,
+        }
+    return serializable_data
+
+
+def annotations_from_dict(ann: dict) -> dict[str, EyeAnnotation]:
+    """Convert data in the annotation file layout to the annotations of both eyes.
+
+    Args:
+        ann: Dictionary in the layout of the annotation files.
+
+    Returns:
+        Dictionary mapping "left" and "right" to their annotations.
+
+    """
+    # Check if this is new format (with left/right) or old format (single eye)
+    if "left" in ann or "right" in ann:
+        # New format with both eyes
+        return {eye: annotation_from_dict(ann[eye]) if eye in ann else EyeAnnotation() for eye in EYES}
+    # Old format (single eye) - migrate to left eye
+    left = annotation_from_dict(ann)
+    left.roi = None  # Old format doesn't have ROI
+    return {"left": left, "right": EyeAnnotation()}
+
+
+def load_many(annotation_paths: Iterable[str], max_workers: int | None = None) -> list[dict[str, EyeAnnotation]]:
+    """Load many annotation files in parallel.
+
+    Reading is spread over a thread pool so the latency of slow or network file
+    systems overlaps. Results are returned in the order of the paths.
+
+    Args:
+        annotation_paths: Paths to the annotation files.
+        max_workers: Maximum number of reader threads, or None for the executor default.
+
+    Returns:
+        Annotation data for both eyes of each file.
+
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(load_annotations, annotation_paths))
+
+
+def map_bounded(
+    function: Callable[[T], R], items: Iterable[T], max_workers: int | None = None, max_pending: int | None = None
+) -> Iterator[R]:
+    """Apply a function to items on a thread pool, yielding the results in order as they finish.
+
+    Unlike ``Executor.map``, at most ``max_pending`` items are submitted ahead of
+    the consumer, so memory stays bounded however many items there are.
+
+    Args:
+        function: Function applied to each item.
+        items: Items to process.
+        max_workers: Maximum number of worker threads, or None for the executor default.
+        max_pending: Maximum number of items processed ahead, defaults to four per worker thread.
+
+    Yields:
+        The result for each item.
+
+    """
+    max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+    max_pending = max_pending or 4 * max_workers
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(function, item))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def iter_many(
+    annotation_paths: Iterable[str], max_workers: int | None = None, max_pending: int | None = None
+) -> Iterator[dict[str, EyeAnnotation]]:
+    """Load many annotation files in parallel, yielding them in order as they are read.
+
+    Unlike ``load_many``, only a bounded number of files are read ahead of the
+    consumer, so memory stays bounded however many files there are.
+
+    Args:
+        annotation_paths: Paths to the annotation files.
+        max_workers: Maximum number of reader threads, or None for the executor default.
+        max_pending: Maximum number of files read ahead, defaults to four per reader thread.
+
+    Yields:
+        Annotation data for both eyes of each file.
+
+    """
+    yield from map_bounded(load_annotations, annotation_paths, max_workers, max_pending)
+
+
+def annotation_from_dict(data: dict) -> EyeAnnotation:
+    """Convert the stored annotations of one eye to an EyeAnnotation.
+
+    Args:
+        data: Dictionary with the stored annotations of one eye.
+
+    Returns:
+        The annotations of the eye.
+
+    """
+    annotation = EyeAnnotation()
+    for kind in ANNOTATION_TYPES:
+        annotation.set_points(kind, data.get(f"{kind}_points", []))
+    annotation.pupil_ellipse = dict_to_ellipse(data.get("pupil_ellipse"))
+    annotation.iris_ellipse = dict_to_ellipse(data.get("iris_ellipse"))
+
+    roi_data = data.get("roi")
+    if roi_data and isinstance(roi_data, (list, tuple)) and len(roi_data) == 4:
+        annotation.roi = tuple(roi_data)
+    return annotation
+
+
+def get_annotation_path(image_path: str, extension: str = JSON_EXTENSION) -> str:
+    """Get the annotation file path for a given image.
+
+    Args:
+        image_path: Path to the image file.
+        extension: Extension of the annotation file, which selects its format.
+
+    Returns:
+        Path to the corresponding annotation file.
+
+    """
+    path = Path(image_path)
+    return str(path.parent / f"{path.stem}_annotation{extension}")
+
+
+def find_annotation_path(image_path: str, extension: str = JSON_EXTENSION) -> str:
+    """Get the path of the existing annotation file of an image, in either format.
+
+    The binary file is preferred if both exist, as when scanning a dataset.
+
+    Args:
+        image_path: Path to the image file.
+        extension: Extension used if the image has no annotation file yet.
+
+    Returns:
+        Path to the annotation file of the image.
+
+    """
+    for existing_extension in ANNOTATION_EXTENSIONS:
+        annotation_path = get_annotation_path(image_path, existing_extension)
+        if Path(annotation_path).exists():
+            return annotation_path
+    return get_annotation_path(image_path, extension)
+
+
+def ellipse_to_dict(ellipse: tuple | None) -> dict | None:
+    """Convert ellipse tuple to dictionary format.
+
+    Args:
+        ellipse: Ellipse as a (cx, cy, width, height, angle) tuple or None.
+
+    Returns:
+        Dictionary with ellipse parameters or None.
+
+    """
+    if ellipse is None:
+        return None
+    cx, cy, width, height, angle = ellipse
+    return {
+        "center": (cx, cy),
+        "size": (width, height),
+        "angle": angle,
+    }
+
+
+def dict_to_ellipse(ellipse_dict: dict | None) -> tuple | None:
+    """Convert ellipse dictionary to tuple format.
+
+    Args:
+        ellipse_dict: Dictionary with ellipse parameters or None.
+
+    Returns:
+        Ellipse as a (cx, cy, width, height, angle) tuple or None.
+
+    """
+    if ellipse_dict is None:
+        return None
+    cx, cy = ellipse_dict["center"]
+    width, height = ellipse_dict["size"]
+    return (float(cx), float(cy), float(width), float(height), float(ellipse_dict["angle"]))
@@ -0,0 +1,266 @@
+"""Images read directly from zip and tar archives, without extracting them.
+
+Each image in an archive is addressed by a member path, the path of the archive
+followed by the path of the image inside it: ``frames/0001.png`` in
+``dataset.zip`` is ``dataset.zip/frames/0001.png``. Member paths stand in for
+image paths everywhere. Nothing can be written inside an archive, so the
+annotations of its images are kept in the project store of the archive's
+folder, keyed by their member paths.
+
+Zip archives end with an index of their members, which is read once when the
+archive is opened. Tar archives have none, so a tar archive is read through
+once to find the position of every image, and the positions are saved in an
+index file next to it (``dataset.tar.index.json``) that later openings read
+instead. Either way, reading an image is a single seek. Compressed tar
+archives cannot be read at random positions and are not supported; repack
+them as zip or plain tar archives.
+"""
+
+import json
+import re
+import tarfile
+import threading
+import zipfile
+from abc import ABC, abstractmethod
+from collections.abc import Iterable
+from functools import lru_cache
+from pathlib import Path
+
+from .annotation_io import write_atomic
+from .dataset import IMAGE_EXTENSIONS, natural_sort_key
+
+ARCHIVE_EXTENSIONS = (".zip", ".tar")
+INDEX_SUFFIX = ".index.json"
+MEMBER_PATH_PATTERN = re.compile(r"^(?P<archive>.+?\.(?:zip|tar))[/\\](?P<member>.+)$", re.IGNORECASE)
+# Resource forks that macOS adds to zip archives
+IGNORED_MEMBER_PREFIX = "__MACOSX/"
+
+
+def is_image_member(name: str) -> bool:
+    """Check if a member of an archive is an image."""
+    return name.lower().endswith(IMAGE_EXTENSIONS) and not name.startswith(IGNORED_MEMBER_PREFIX)
+
+
+class ArchiveSource(ABC):
+    """Images of an archive, read one member at a time."""
+
+    def __init__(self, path: str, member_names: list[str]) -> None:
+        """Initialize the ArchiveSource.
+
+        Args:
+            path: Path to the archive.
+            member_names: Names of the image members, in the order they are listed.
+
+        """
+        self.path = path
+        self.member_names = member_names
+
+    def __len__(self) -> int:
+        """Get the number of images."""
+        return len(self.member_names)
+
+    @abstractmethod
+    def read(self, member_name: str) -> bytes:
+        """Read the encoded image of a member.
+
+        Raises:
+            KeyError: If the archive has no image member of that name.
+            ValueError: If the member is corrupt.
+
+        """
+
+    def get_member_paths(self) -> list[str]:
+        """Get the member paths of all images."""
+        return [get_member_path(self.path, name) for name in self.member_names]
+
+
+class ZipArchiveSource(ArchiveSource):
+    """Images of a zip archive, looked up in the index at the end of the archive."""
+
+    def __init__(self, path: str) -> None:
+        """Open a zip archive and read its index.
+
+        Args:
+            path: Path to the archive.
+
+        """
+        self.archive = zipfile.ZipFile(path)
+        names = [info.filename for info in self.archive.infolist() if not info.is_dir()]
+        super().__init__(path, sorted(filter(is_image_member, names), key=natural_sort_key))
+
+    def read(self, member_name: str) -> bytes:
+        """Read the encoded image of a member."""
+        try:
+            return self.archive.read(member_name)
+        except zipfile.BadZipFile as e:
+            raise ValueError(f"Corrupt member {member_name} of {self.path}: {e}") from e
+
+
+class TarArchiveSource(ArchiveSource):
+    """Images of an uncompressed tar archive, read at the positions of its member index."""
+
+    def __init__(self, path: str) -> None:
+        """Open a tar archive, building its member index if it has no valid one.
+
+        Args:
+            path: Path to the archive.
+
+        """
+        self.members = load_tar_index(path)
+        self.file = Path(path).open("rb")  # noqa: SIM115
+        # Reads from several threads share the file position
+        self.lock = threading.Lock()
+        super().__init__(path, sorted(self.members, key=natural_sort_key))
+
+    def read(self, member_name: str) -> bytes:
+        """Read the encoded image of a member."""
+        offset, size = self.members[member_name]
+        with self.lock:
+            self.file.seek(offset)
+            return self.file.read(size)
+
+
+def build_tar_index(path: str) -> dict[str, list[int]]:
+    """Find the data offset and size of every image of a tar archive by reading its headers.
+
+    Raises:
+        ValueError: If the file is not an uncompressed tar archive.
+
+    """
+    try:
+        with tarfile.open(path, "r:") as archive:
+            return {
+                info.name: [info.offset_data, info.size]
+                for info in archive
+                if info.isfile() and is_image_member(info.name)
+            }
+    except tarfile.ReadError as e:
+        raise ValueError(f"{path} is not an uncompressed tar archive: {e}") from e
+
+
+def load_tar_index(path: str) -> dict[str, list[int]]:
+    """Get the member index of a tar archive from its index file, building and saving it if needed.
+
+    Args:
+        path: Path to the archive.
+
+    Returns:
+        The data offset and size of each image member by its name.
+
+    Raises:
+        OSError: If the archive cannot be read.
+        ValueError: If the file is not an uncompressed tar archive.
+
+    """
+    stat = Path(path).stat()
+    index_path = Path(f"{path}{INDEX_SUFFIX}")
+    try:
+        index = json.loads(index_path.read_text(encoding="utf-8"))
+        # The index is only valid for the archive it was built from
+        if index["size"] == stat.st_size and index["mtime_ns"] == stat.st_mtime_ns:
+            return index["members"]
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"Rebuilding unreadable archive index {index_path}: {e}")
+
+    members = build_tar_index(path)
+    index = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "members": members}
+    try:
+        write_atomic(str(index_path), json.dumps(index).encode("utf-8"))
+    except OSError as e:
+        print(f"Could not save archive index {index_path}: {e}")
+    return members
+
+
+@lru_cache(maxsize=8)
+def open_archive(path: str) -> ArchiveSource:
+    """Open an archive, reusing it if it is already open.
+
+    Args:
+        path: Path to a zip or tar archive.
+
+    Returns:
+        The images of the archive.
+
+    Raises:
+        OSError: If the archive cannot be read.
+        ValueError: If the archive is invalid or compressed tar.
+
+    """
+    if Path(path).suffix.lower() == ".tar":
+        return TarArchiveSource(path)
+    try:
+        return ZipArchiveSource(path)
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"{path} is not a zip archive: {e}") from e
+
+
+def is_archive(path: str) -> bool:
+    """Check if a path is a zip or tar archive."""
+    return path.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def get_member_path(archive_path: str, member_name: str) -> str:
+    """Get the member path of an image of an archive."""
+    return f"{archive_path}/{member_name}"
+
+
+def split_member_path(member_path: str) -> tuple[str, str] | None:
+    """Get the archive path and member name of a member path, or None for other paths."""
+    match = MEMBER_PATH_PATTERN.match(member_path)
+    if match is None:
+        return None
+    return match["archive"], match["member"]
+
+
+def get_storage_path(image_path: str) -> str:
+    """Get the file whose folder holds the files written for an image: its archive for archive members."""
+    parts = split_member_path(image_path)
+    return image_path if parts is None else parts[0]
+
+
+def read_member(member_path: str) -> bytes:
+    """Read the encoded image of an archive member by its member path.
+
+    Args:
+        member_path: Member path of the image.
+
+    Returns:
+        The content of the image file.
+
+    Raises:
+        ValueError: If the path is not a member path, or the archive is invalid.
+        KeyError: If the archive has no image of that name.
+        OSError: If the archive cannot be read.
+
+    """
+    parts = split_member_path(member_path)
+    if parts is None:
+        raise ValueError(f"Not an archive member path: {member_path}")
+    archive_path, member_name = parts
+    return open_archive(archive_path).read(member_name)
+
+
+def expand_archives(paths: Iterable[str]) -> list[str]:
+    """Replace the archives among image paths by the member paths of their images.
+
+    Archives that cannot be read are reported and left out.
+
+    Args:
+        paths: Image and archive paths.
+
+    Returns:
+        The image paths with the images of each archive in its place.
+
+    """
+    expanded = []
+    for path in paths:
+        if not is_archive(path):
+            expanded.append(path)
+            continue
+        try:
+            expanded.extend(open_archive(path).get_member_paths())
+        except (OSError, ValueError) as e:
+            print(f"Failed to open archive {path}: {e}")
+    return expanded
@@ -0,0 +1,119 @@
+"""Compact versioned binary encoding of annotation files.
+
+A binary annotation file starts with a header, followed by one record per eye in
+the order of ``EYES``::
+
+    header  <4sHH   magic b"EYEA", format version, number of eyes
+    eye     <B4I    presence flags, point count of each annotation type
+            <f8...  point coordinates of each annotation type as x, y pairs
+            <5d     pupil ellipse, if its flag is set
+            <5d     iris ellipse, if its flag is set
+            <4d     ROI, if its flag is set
+
+All values are little-endian. Point arrays are decoded without copying, so
+loading a dense contour costs a single buffer view.
+"""
+
+import struct
+
+import numpy as np
+
+from .model import ANNOTATION_TYPES, EYES, EyeAnnotation
+
+BINARY_MAGIC = b"EYEA"
+BINARY_FORMAT_VERSION = 1
+
+HEADER = struct.Struct("<4sHH")
+EYE_HEADER = struct.Struct(f"<B{len(ANNOTATION_TYPES)}I")
+ELLIPSE = struct.Struct("<5d")
+ROI = struct.Struct("<4d")
+
+PUPIL_ELLIPSE_FLAG = 1
+IRIS_ELLIPSE_FLAG = 2
+ROI_FLAG = 4
+
+
+def encode_annotations(eye_data: dict[str, EyeAnnotation]) -> bytes:
+    """Encode the annotations of both eyes in the binary format.
+
+    Args:
+        eye_data: Dictionary mapping "left" and "right" to their annotations.
+
+    Returns:
+        The encoded annotations.
+
+    """
+    chunks = [HEADER.pack(BINARY_MAGIC, BINARY_FORMAT_VERSION, len(EYES))]
+    for eye in EYES:
+        annotation = eye_data[eye]
+        flags = (
+            (PUPIL_ELLIPSE_FLAG if annotation.pupil_ellipse is not None else 0)
+            | (IRIS_ELLIPSE_FLAG if annotation.iris_ellipse is not None else 0)
+            | (ROI_FLAG if annotation.roi is not None else 0)
+        )
+        points = [annotation.get_points(kind) for kind in ANNOTATION_TYPES]
+        chunks.append(EYE_HEADER.pack(flags, *(len(array) for array in points)))
+        chunks.extend(np.ascontiguousarray(array, dtype="<f8").tobytes() for array in points)
+        if annotation.pupil_ellipse is not None:
+            chunks.append(ELLIPSE.pack(*annotation.pupil_ellipse))
+        if annotation.iris_ellipse is not None:
+            chunks.append(ELLIPSE.pack(*annotation.iris_ellipse))
+        if annotation.roi is not None:
+            chunks.append(ROI.pack(*annotation.roi))
+    return b"".join(chunks)
+
+
+def decode_annotations(data: bytes) -> dict[str, EyeAnnotation]:
+    """Decode annotations of both eyes from the binary format.
+
+    Args:
+        data: The encoded annotations.
+
+    Returns:
+        Dictionary mapping "left" and "right" to their annotations.
+
+    Raises:
+        ValueError: If the data is not a supported binary annotation file.
+
+    """
+    try:
+        magic, version, eye_count = HEADER.unpack_from(data, 0)
+    except struct.error as e:
+        raise ValueError(f"Not a binary annotation file: {e}") from e
+    if magic != BINARY_MAGIC:
+        raise ValueError("Not a binary annotation file")
+    if version > BINARY_FORMAT_VERSION:
+        raise ValueError(f"Unsupported binary annotation format version {version}")
+
+    eye_data = {eye: EyeAnnotation() for eye in EYES}
+    offset = HEADER.size
+    try:
+        for eye in EYES[:eye_count]:
+            offset = decode_eye(data, offset, eye_data[eye])
+    except struct.error as e:
+        raise ValueError(f"Truncated binary annotation file: {e}") from e
+    return eye_data
+
+
+def decode_eye(data: bytes, offset: int, annotation: EyeAnnotation) -> int:
+    """Decode the record of one eye into an annotation and return the offset after it."""
+    flags, *counts = EYE_HEADER.unpack_from(data, offset)
+    offset += EYE_HEADER.size
+    for kind, count in zip(ANNOTATION_TYPES, counts):
+        if offset + count * 16 > len(data):
+            raise struct.error("point data out of range")
+        if count:
+            # Views into the immutable buffer are read-only, so edits copy them first
+            points = np.frombuffer(data, dtype="<f8", count=count * 2, offset=offset).reshape(-1, 2)
+            setattr(annotation, f"{kind}_points", points)
+        offset += count * 16
+    if flags & PUPIL_ELLIPSE_FLAG:
+        annotation.pupil_ellipse = ELLIPSE.unpack_from(data, offset)
+        offset += ELLIPSE.size
+    if flags & IRIS_ELLIPSE_FLAG:
+        annotation.iris_ellipse = ELLIPSE.unpack_from(data, offset)
+        offset += ELLIPSE.size
+    if flags & ROI_FLAG:
+        annotation.roi = ROI.unpack_from(data, offset)
+        offset += ROI.size
+    return offset
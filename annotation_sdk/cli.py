@@ -0,0 +1,166 @@
+"""Command line tools for annotation files."""
+
+import argparse
+from pathlib import Path
+
+from .annotation_io import BINARY_EXTENSION, JSON_EXTENSION, convert_annotation_file
+from .export import DEFAULT_SHARD_SIZE, EXPORT_WRITERS, export_dataset
+from .importer import ImportSpec, import_table, parse_mapping
+
+FORMAT_EXTENSIONS = {"json": JSON_EXTENSION, "binary": BINARY_EXTENSION}
+
+
+def find_annotation_files(paths: list[str]) -> list[Path]:
+    """Expand folders into the annotation files they contain.
+
+    Args:
+        paths: Annotation files and folders of annotation files.
+
+    Returns:
+        Sorted annotation file paths.
+
+    """
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(
+                file for extension in FORMAT_EXTENSIONS.values() for file in path.glob(f"*_annotation{extension}")
+            )
+        else:
+            files.append(path)
+    return sorted(files)
+
+
+def convert(args: argparse.Namespace) -> int:
+    """Convert annotation files to another format next to the originals."""
+    extension = FORMAT_EXTENSIONS[args.to]
+    converted = 0
+    for source_path in find_annotation_files(args.paths):
+        if source_path.suffix == extension:
+            continue
+        destination_path = source_path.with_suffix(extension)
+        try:
+            convert_annotation_file(str(source_path), str(destination_path))
+        except (OSError, ValueError) as e:
+            print(f"Failed to convert {source_path}: {e}")
+            continue
+        if args.remove_source:
+            source_path.unlink()
+        converted += 1
+    print(f"Converted {converted} annotation files to {args.to}")
+    return 0
+
+
+def export(args: argparse.Namespace) -> int:
+    """Export the annotations of a dataset."""
+    count = export_dataset(args.root, args.output, args.format, args.workers, args.shard_size)
+    print(f"Exported {count} annotated images to {args.output}")
+    return 0
+
+
+def build_import_spec(args: argparse.Namespace) -> ImportSpec:
+    """Build the import spec from the command line arguments.
+
+    Raises:
+        ValueError: If the arguments do not describe a valid mapping.
+
+    """
+    if args.preset == "pupil_labs":
+        if args.image_template is None:
+            raise ValueError("The pupil_labs preset needs --image-template")
+        spec = ImportSpec.pupil_labs(args.image_template)
+    else:
+        spec = ImportSpec(image_template=args.image_template)
+    if args.min_confidence is not None:
+        spec.min_confidence = args.min_confidence
+    spec.map_columns(parse_mapping(args.column))
+    spec.eye_values = {**spec.eye_values, **parse_mapping(args.eye_value)}
+    return spec
+
+
+def import_annotations(args: argparse.Namespace) -> int:
+    """Import the annotations of an external table into a dataset."""
+    try:
+        spec = build_import_spec(args)
+    except ValueError as e:
+        print(e)
+        return 2
+
+    report = import_table(
+        args.table,
+        args.root,
+        spec,
+        dry_run=args.dry_run,
+        overwrite=args.overwrite,
+        extension=FORMAT_EXTENSIONS[args.to],
+        max_workers=args.workers,
+        delimiter=args.delimiter,
+    )
+    print(report.summary())
+    return 1 if report.invalid_rows or report.missing_images else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser of the command line tools."""
+    parser = argparse.ArgumentParser(prog="eye_annotation_sdk", description=__doc__)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = subparsers.add_parser("convert", help="convert annotation files between formats")
+    convert_parser.add_argument("paths", nargs="+", help="annotation files or folders of annotation files")
+    convert_parser.add_argument("--to", choices=sorted(FORMAT_EXTENSIONS), required=True, help="target format")
+    convert_parser.add_argument(
+        "--remove-source", action="store_true", help="delete each original file after converting it"
+    )
+    convert_parser.set_defaults(handler=convert)
+
+    export_parser = subparsers.add_parser("export", help="export the annotations of a dataset")
+    export_parser.add_argument("root", help="dataset folder with annotation files or a project store")
+    export_parser.add_argument("--output", required=True, help="folder the exported files are written to")
+    export_parser.add_argument(
+        "--format", nargs="+", choices=sorted(EXPORT_WRITERS), default=sorted(EXPORT_WRITERS), help="export formats"
+    )
+    export_parser.add_argument("--workers", type=int, default=None, help="number of reader threads")
+    export_parser.add_argument(
+        "--shard-size", type=int, default=DEFAULT_SHARD_SIZE, help="maximum number of eyes per .npz shard"
+    )
+    export_parser.set_defaults(handler=export)
+
+    import_parser = subparsers.add_parser("import", help="import ellipses and points from a CSV or TSV table")
+    import_parser.add_argument("table", help="CSV or TSV file to import")
+    import_parser.add_argument("--root", required=True, help="dataset folder the image paths are relative to")
+    import_parser.add_argument(
+        "--preset", choices=["default", "pupil_labs"], default="default", help="column layout of the table"
+    )
+    import_parser.add_argument(
+        "--image-template", help='image path built from the row, e.g. "eye{eye_id}/{index}.png"'
+    )
+    import_parser.add_argument(
+        "--column", action="append", default=[], metavar="FIELD=COLUMN", help="map an annotation field to a column"
+    )
+    import_parser.add_argument(
+        "--eye-value", action="append", default=[], metavar="VALUE=EYE", help="map a value of the eye column"
+    )
+    import_parser.add_argument("--min-confidence", type=float, default=None, help="skip rows with a lower confidence")
+    import_parser.add_argument("--delimiter", help="column delimiter, defaults to a tab for .tsv files")
+    import_parser.add_argument("--overwrite", action="store_true", help="replace existing ellipses and points")
+    import_parser.add_argument("--dry-run", action="store_true", help="only validate and report what would change")
+    import_parser.add_argument(
+        "--to", choices=sorted(FORMAT_EXTENSIONS), default="json", help="format of new annotation files"
+    )
+    import_parser.add_argument("--workers", type=int, default=None, help="number of worker threads")
+    import_parser.set_defaults(handler=import_annotations)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the command line tools.
+
+    Args:
+        argv: Command line arguments, defaults to ``sys.argv[1:]``.
+
+    Returns:
+        Exit status.
+
+    """
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
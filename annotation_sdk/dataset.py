@@ -0,0 +1,81 @@
+"""Streaming iteration over all annotations of a dataset folder."""
+
+import os
+import re
+from collections.abc import Iterator
+from pathlib import Path
+
+from .annotation_io import ANNOTATION_EXTENSIONS, iter_many
+from .model import EyeAnnotation
+from .project_store import PROJECT_STORE_FILENAME, ProjectStore
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+ANNOTATION_SUFFIXES = tuple(f"_annotation{extension}" for extension in ANNOTATION_EXTENSIONS)
+DIGITS_PATTERN = re.compile(r"(\d+)")
+
+
+def natural_sort_key(name: str) -> list:
+    """Get a sort key that orders numbers in names by value, so "frame_2" comes before "frame_10"."""
+    # Splitting on a captured group puts the numbers at the odd positions
+    parts = DIGITS_PATTERN.split(name.lower())
+    parts[1::2] = map(int, parts[1::2])
+    return parts
+
+
+def scan_annotation_files(root: str) -> list[tuple[str, str]]:
+    """Find the annotation files in a folder and its subfolders.
+
+    Each folder is listed once, and annotation files are matched to the image
+    with the same stem. If an image has both a binary and a JSON annotation file,
+    the binary file is used, like ``AnnotationFileBackend`` does.
+
+    Args:
+        root: Dataset folder.
+
+    Returns:
+        Sorted (image key, annotation path) pairs, where the image key is the
+        POSIX path of the image relative to the root.
+
+    """
+    files = {}
+    for folder, subfolders, names in os.walk(root):
+        subfolders.sort()
+        name_set = set(names)
+        relative_folder = Path(os.path.relpath(folder, root))
+        for name in names:
+            suffix = next((suffix for suffix in ANNOTATION_SUFFIXES if name.endswith(suffix)), None)
+            if suffix is None:
+                continue
+            stem = name[: -len(suffix)]
+            image_name = next((stem + ext for ext in IMAGE_EXTENSIONS if stem + ext in name_set), stem)
+            key = (relative_folder / image_name).as_posix()
+            if key not in files or suffix == ANNOTATION_SUFFIXES[0]:
+                files[key] = str(Path(folder) / name)
+    return sorted(files.items())
+
+
+def iter_dataset(root: str, max_workers: int | None = None) -> Iterator[tuple[str, dict[str, EyeAnnotation]]]:
+    """Iterate over the annotations of a dataset without loading them all at once.
+
+    The project store of the folder is used if there is one, otherwise the
+    annotation files are read in parallel with a bounded read-ahead.
+
+    Args:
+        root: Dataset folder.
+        max_workers: Maximum number of reader threads for annotation files.
+
+    Yields:
+        The key of each annotated image and its annotations, sorted by key.
+
+    """
+    store_path = Path(root) / PROJECT_STORE_FILENAME
+    if store_path.exists():
+        store = ProjectStore(str(store_path))
+        try:
+            yield from store.iter_annotations()
+        finally:
+            store.close()
+        return
+
+    files = scan_annotation_files(root)
+    yield from zip((key for key, _ in files), iter_many((path for _, path in files), max_workers))
@@ -0,0 +1,262 @@
+"""Streaming export of dataset annotations to COCO, CSV and columnar ``.npz`` shards.
+
+Each writer receives the annotations of one image at a time and keeps only a
+bounded amount of them in memory, so datasets of any size can be exported.
+"""
+
+import csv
+import json
+import math
+import shutil
+import tempfile
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+
+from .annotation_io import ellipse_to_dict
+from .dataset import iter_dataset
+from .model import ANNOTATION_TYPES, ELLIPSE_TYPES, EYES, EyeAnnotation
+
+DEFAULT_SHARD_SIZE = 10_000
+
+
+def ellipse_bounds(ellipse: tuple) -> tuple[float, float, float, float]:
+    """Get the axis-aligned bounds (x_min, y_min, x_max, y_max) of a rotated ellipse."""
+    center_x, center_y, width, height, angle = ellipse
+    theta = math.radians(angle)
+    half_x = math.hypot(width / 2 * math.cos(theta), height / 2 * math.sin(theta))
+    half_y = math.hypot(width / 2 * math.sin(theta), height / 2 * math.cos(theta))
+    return center_x - half_x, center_y - half_y, center_x + half_x, center_y + half_y
+
+
+def coco_annotation(annotation: EyeAnnotation, eye: str, kind: str) -> dict | None:
+    """Convert one annotation type of an eye to a COCO annotation without ids.
+
+    Args:
+        annotation: Annotations of the eye.
+        eye: Name of the eye.
+        kind: Annotation type.
+
+    Returns:
+        The COCO annotation with keypoints, bounding box and ellipse, or None if
+        the annotation type is empty.
+
+    """
+    points = annotation.get_points(kind)
+    ellipse = annotation.get_ellipse(kind)
+    if not len(points) and ellipse is None:
+        return None
+
+    bounds = []
+    if len(points):
+        bounds.append((*points.min(axis=0), *points.max(axis=0)))
+    if ellipse is not None:
+        bounds.append(ellipse_bounds(ellipse))
+    x_min, y_min = min(b[0] for b in bounds), min(b[1] for b in bounds)
+    x_max, y_max = max(b[2] for b in bounds), max(b[3] for b in bounds)
+
+    keypoints = np.column_stack([points, np.full(len(points), 2.0)]).ravel().tolist()
+    result = {
+        "category_id": ANNOTATION_TYPES.index(kind) + 1,
+        "eye": eye,
+        "keypoints": keypoints,
+        "num_keypoints": len(points),
+        "bbox": [float(x_min), float(y_min), float(x_max - x_min), float(y_max - y_min)],
+        "area": float((x_max - x_min) * (y_max - y_min)),
+        "iscrowd": 0,
+    }
+    if ellipse is not None:
+        result["ellipse"] = ellipse_to_dict(ellipse)
+    return result
+
+
+class CocoWriter:
+    """Writes a COCO keypoints file with one annotation per eye and annotation type.
+
+    Images are written to the output file as they arrive while annotations are
+    spooled to a temporary file and appended when the writer is closed.
+    """
+
+    def __init__(self, output_dir: str, **_options: object) -> None:
+        """Initialize the CocoWriter.
+
+        Args:
+            output_dir: Folder the ``coco.json`` file is written to.
+
+        """
+        self.path = Path(output_dir) / "coco.json"
+        self.file = self.path.open("w", encoding="utf-8")
+        self.spool = tempfile.TemporaryFile("w+", encoding="utf-8", dir=output_dir)  # noqa: SIM115
+        self.image_count = 0
+        self.annotation_count = 0
+        categories = [{"id": i + 1, "name": kind, "supercategory": "eye"} for i, kind in enumerate(ANNOTATION_TYPES)]
+        self.file.write(f'{{"categories": {json.dumps(categories)}, "images": [')
+
+    def write(self, image_key: str, eye_data: dict[str, EyeAnnotation]) -> None:
+        """Write the annotations of an image."""
+        self.image_count += 1
+        separator = ", " if self.image_count > 1 else ""
+        self.file.write(separator + json.dumps({"id": self.image_count, "file_name": image_key}))
+        for eye in EYES:
+            for kind in ANNOTATION_TYPES:
+                annotation = coco_annotation(eye_data[eye], eye, kind)
+                if annotation is None:
+                    continue
+                self.annotation_count += 1
+                annotation = {"id": self.annotation_count, "image_id": self.image_count, **annotation}
+                separator = ", " if self.annotation_count > 1 else ""
+                self.spool.write(separator + json.dumps(annotation))
+
+    def close(self) -> None:
+        """Append the spooled annotations and close the file."""
+        self.file.write('], "annotations": [')
+        self.spool.seek(0)
+        shutil.copyfileobj(self.spool, self.file)
+        self.file.write("]}\n")
+        self.spool.close()
+        self.file.close()
+
+
+class CsvWriter:
+    """Writes a flat CSV file with the ellipse and ROI parameters and the points of each annotated eye.
+
+    Points are written as JSON lists of ``[x, y]`` pairs, which the importer reads back.
+    """
+
+    def __init__(self, output_dir: str, **_options: object) -> None:
+        """Initialize the CsvWriter.
+
+        Args:
+            output_dir: Folder the ``ellipses.csv`` file is written to.
+
+        """
+        self.path = Path(output_dir) / "ellipses.csv"
+        self.file = self.path.open("w", encoding="utf-8", newline="")
+        self.writer = csv.writer(self.file)
+        header = ["image", "eye"]
+        for kind in ELLIPSE_TYPES:
+            header.extend(f"{kind}_{field}" for field in ("center_x", "center_y", "width", "height", "angle"))
+        header.extend(["roi_x", "roi_y", "roi_width", "roi_height"])
+        header.extend(f"{kind}_point_count" for kind in ANNOTATION_TYPES)
+        header.extend(f"{kind}_points" for kind in ANNOTATION_TYPES)
+        self.writer.writerow(header)
+
+    def write(self, image_key: str, eye_data: dict[str, EyeAnnotation]) -> None:
+        """Write one row per annotated eye of an image."""
+        for eye in EYES:
+            annotation = eye_data[eye]
+            if annotation.is_empty():
+                continue
+            row = [image_key, eye]
+            for kind in ELLIPSE_TYPES:
+                ellipse = annotation.get_ellipse(kind)
+                row.extend(ellipse if ellipse is not None else [""] * 5)
+            row.extend(annotation.roi if annotation.roi is not None else [""] * 4)
+            row.extend(len(annotation.get_points(kind)) for kind in ANNOTATION_TYPES)
+            row.extend(
+                json.dumps(annotation.get_points(kind).tolist(), separators=(",", ":")) for kind in ANNOTATION_TYPES
+            )
+            self.writer.writerow(row)
+
+    def close(self) -> None:
+        """Close the file."""
+        self.file.close()
+
+
+class NpzShardWriter:
+    """Writes annotated eyes to columnar ``.npz`` shards for training pipelines.
+
+    Each shard holds up to ``shard_size`` eyes with the arrays:
+
+    - ``image``, ``eye``: image key and eye name of each row
+    - ``pupil_ellipse``, ``iris_ellipse``: (N, 5) ellipse parameters, NaN if absent
+    - ``roi``: (N, 4) ROI rectangles, NaN if absent
+    - ``<type>_points``: (M, 2) points of all rows, concatenated
+    - ``<type>_offsets``: (N + 1,) start of the points of each row in ``<type>_points``
+    """
+
+    def __init__(self, output_dir: str, shard_size: int = DEFAULT_SHARD_SIZE, **_options: object) -> None:
+        """Initialize the NpzShardWriter.
+
+        Args:
+            output_dir: Folder the ``shards`` folder is created in.
+            shard_size: Maximum number of eyes per shard.
+
+        """
+        self.directory = Path(output_dir) / "shards"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.shard_size = shard_size
+        self.shard_count = 0
+        self.rows = []
+
+    def write(self, image_key: str, eye_data: dict[str, EyeAnnotation]) -> None:
+        """Buffer the annotated eyes of an image, writing a shard when it is full."""
+        for eye in EYES:
+            if not eye_data[eye].is_empty():
+                self.rows.append((image_key, eye, eye_data[eye]))
+                if len(self.rows) >= self.shard_size:
+                    self.write_shard()
+
+    def write_shard(self) -> None:
+        """Write the buffered rows to the next shard."""
+        annotations = [annotation for _, _, annotation in self.rows]
+        arrays = {
+            "image": np.array([key for key, _, _ in self.rows]),
+            "eye": np.array([eye for _, eye, _ in self.rows]),
+            "roi": np.array([a.roi if a.roi is not None else (np.nan,) * 4 for a in annotations], dtype=np.float64),
+        }
+        for kind in ELLIPSE_TYPES:
+            arrays[f"{kind}_ellipse"] = np.array(
+                [a.get_ellipse(kind) if a.get_ellipse(kind) is not None else (np.nan,) * 5 for a in annotations],
+                dtype=np.float64,
+            )
+        for kind in ANNOTATION_TYPES:
+            points = [a.get_points(kind) for a in annotations]
+            arrays[f"{kind}_points"] = np.concatenate(points).reshape(-1, 2)
+            arrays[f"{kind}_offsets"] = np.concatenate([[0], np.cumsum([len(p) for p in points])]).astype(np.int64)
+        np.savez(self.directory / f"shard-{self.shard_count:05d}.npz", **arrays)
+        self.shard_count += 1
+        self.rows = []
+
+    def close(self) -> None:
+        """Write the remaining buffered rows."""
+        if self.rows:
+            self.write_shard()
+
+
+EXPORT_WRITERS = {"coco": CocoWriter, "csv": CsvWriter, "npz": NpzShardWriter}
+
+
+def export_dataset(
+    root: str,
+    output_dir: str,
+    formats: Iterable[str] = tuple(EXPORT_WRITERS),
+    max_workers: int | None = None,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+) -> int:
+    """Export all annotations of a dataset in one streaming pass.
+
+    Args:
+        root: Dataset folder with annotation files or a project store.
+        output_dir: Folder the exported files are written to.
+        formats: Export formats, any of "coco", "csv" and "npz".
+        max_workers: Maximum number of reader threads for annotation files.
+        shard_size: Maximum number of eyes per ``.npz`` shard.
+
+    Returns:
+        Number of exported images.
+
+    """
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    writers = [EXPORT_WRITERS[name](output_dir, shard_size=shard_size) for name in formats]
+    count = 0
+    try:
+        for image_key, eye_data in iter_dataset(root, max_workers):
+            for writer in writers:
+                writer.write(image_key, eye_data)
+            count += 1
+    finally:
+        for writer in writers:
+            writer.close()
+    return count
@@ -0,0 +1,235 @@
+"""Memory-mapped frame stacks from raw camera recordings and ``.npy`` files.
+
+Eye cameras often record 10, 12 or 16-bit frames, which common image formats
+and 8-bit image readers cannot hold. A frame source maps such a recording into
+memory, so frames are read from disk only when they are used and are handed
+out as full bit depth array views without copying.
+
+Each frame of a stack is addressed by a frame path, the path of the stack with
+the frame index added to its stem: frame 12 of ``recording.npy`` is
+``recording#000012.npy``. Frame paths stand in for image paths everywhere, so
+every frame gets its own annotation file next to the stack.
+
+Raw files need a JSON metadata file next to them, named like the raw file with
+``.json`` added (``recording.raw.json``), describing the frame layout::
+
+    {"width": 640, "height": 480, "dtype": "uint16", "bit_depth": 12}
+
+Optional keys are ``stride`` (bytes per row), ``frame_stride`` (bytes per
+frame) and ``offset`` (bytes before the first frame). ``.npy`` files may have
+a metadata file too, to give the ``bit_depth`` of their values.
+"""
+
+import json
+import re
+from collections.abc import Iterable
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+FRAME_SOURCE_EXTENSIONS = (".npy", ".raw")
+METADATA_SUFFIX = ".json"
+FRAME_PATH_PATTERN = re.compile(r"^(?P<stem>.*)#(?P<index>\d+)(?P<extension>\.(?:npy|raw))$", re.IGNORECASE)
+
+
+class FrameSource:
+    """Frames of a memory-mapped stack, as array views of their stored values."""
+
+    def __init__(self, path: str, frames: np.ndarray, bit_depth: int) -> None:
+        """Initialize the FrameSource.
+
+        Args:
+            path: Path to the stack.
+            frames: Array of shape (frames, height, width) backed by the mapped file.
+            bit_depth: Number of significant bits of the frame values.
+
+        """
+        self.path = path
+        self.frames = frames
+        self.bit_depth = bit_depth
+
+    def __len__(self) -> int:
+        """Get the number of frames."""
+        return len(self.frames)
+
+    def get_frame(self, index: int) -> np.ndarray:
+        """Get a frame as a read-only view of the mapped file."""
+        return self.frames[index]
+
+    def get_frame_paths(self) -> list[str]:
+        """Get the frame paths of all frames."""
+        path = Path(self.path)
+        prefix = str(path.with_name(f"{path.stem}#"))
+        return [f"{prefix}{index:06d}{path.suffix}" for index in range(len(self.frames))]
+
+
+def read_metadata(path: str) -> dict:
+    """Read the metadata file of a stack, or an empty dict if it has none."""
+    metadata_path = Path(f"{path}{METADATA_SUFFIX}")
+    if not metadata_path.exists():
+        return {}
+    return json.loads(metadata_path.read_text(encoding="utf-8"))
+
+
+def open_raw(path: str, metadata: dict) -> np.ndarray:
+    """Map the frames of a raw file with the layout given by its metadata."""
+    try:
+        width = int(metadata["width"])
+        height = int(metadata["height"])
+    except KeyError as e:
+        raise ValueError(f"Metadata of raw file {path} is missing {e}") from e
+    dtype = np.dtype(metadata.get("dtype", "uint16"))
+    stride = int(metadata.get("stride", width * dtype.itemsize))
+    frame_stride = int(metadata.get("frame_stride", height * stride))
+    offset = int(metadata.get("offset", 0))
+    frame_bytes = (height - 1) * stride + width * dtype.itemsize
+
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    if len(data) < offset + frame_bytes:
+        raise ValueError(f"Raw file {path} is smaller than one frame")
+    frame_count = (len(data) - offset - frame_bytes) // frame_stride + 1
+    return np.ndarray(
+        (frame_count, height, width),
+        dtype=dtype,
+        buffer=data,
+        offset=offset,
+        strides=(frame_stride, stride, dtype.itemsize),
+    )
+
+
+def open_npy(path: str) -> np.ndarray:
+    """Map the frames of a ``.npy`` file holding one frame or a stack of frames."""
+    frames = np.load(path, mmap_mode="r")
+    if frames.ndim == 2:
+        frames = frames[np.newaxis]
+    if frames.ndim != 3:
+        raise ValueError(f"Expected frames of shape (height, width) in {path}, got {frames.shape}")
+    return frames
+
+
+@lru_cache(maxsize=32)
+def open_frame_source(path: str) -> FrameSource:
+    """Open a stack of frames, reusing the mapping if it is already open.
+
+    Args:
+        path: Path to a ``.npy`` or raw file.
+
+    Returns:
+        The frames of the stack.
+
+    Raises:
+        OSError: If the stack cannot be read.
+        ValueError: If the stack or its metadata are invalid.
+
+    """
+    metadata = read_metadata(path)
+    frames = open_npy(path) if Path(path).suffix.lower() == ".npy" else open_raw(path, metadata)
+    default_depth = frames.dtype.itemsize * 8 if frames.dtype.kind in "ui" else 8
+    return FrameSource(path, frames, int(metadata.get("bit_depth", default_depth)))
+
+
+def is_frame_source(path: str) -> bool:
+    """Check if a path is a stack of frames, rather than an image or a frame of a stack."""
+    return path.lower().endswith(FRAME_SOURCE_EXTENSIONS) and FRAME_PATH_PATTERN.match(path) is None
+
+
+def get_frame_path(source_path: str, index: int) -> str:
+    """Get the frame path of a frame of a stack."""
+    path = Path(source_path)
+    return str(path.with_name(f"{path.stem}#{index:06d}{path.suffix}"))
+
+
+def split_frame_path(frame_path: str) -> tuple[str, int] | None:
+    """Get the stack path and frame index of a frame path, or None for other paths."""
+    match = FRAME_PATH_PATTERN.match(frame_path)
+    if match is None:
+        return None
+    return match["stem"] + match["extension"], int(match["index"])
+
+
+def load_frame(frame_path: str) -> np.ndarray:
+    """Get a frame by its frame path as a read-only, full bit depth array view.
+
+    Args:
+        frame_path: Frame path of the frame.
+
+    Returns:
+        The frame, backed by the mapped stack.
+
+    Raises:
+        ValueError: If the path is not a frame path.
+
+    """
+    parts = split_frame_path(frame_path)
+    if parts is None:
+        raise ValueError(f"Not a frame path: {frame_path}")
+    source_path, index = parts
+    return open_frame_source(source_path).get_frame(index)
+
+
+def expand_frame_sources(paths: Iterable[str]) -> list[str]:
+    """Replace the stacks among image paths by the frame paths of their frames.
+
+    Stacks that cannot be read are reported and left out.
+
+    Args:
+        paths: Image and stack paths.
+
+    Returns:
+        The image paths with the frames of each stack in its place.
+
+    """
+    expanded = []
+    for path in paths:
+        if not is_frame_source(path):
+            expanded.append(path)
+            continue
+        try:
+            expanded.extend(open_frame_source(path).get_frame_paths())
+        except (OSError, ValueError) as e:
+            print(f"Failed to open frames of {path}: {e}")
+    return expanded
+
+
+def get_default_window_level(bit_depth: int) -> tuple[float, float]:
+    """Get the window and level that show the full value range of a bit depth."""
+    window = float(2**bit_depth)
+    return window, window / 2
+
+
+def get_auto_window_level(frame: np.ndarray, low: float = 1, high: float = 99) -> tuple[float, float]:
+    """Get the window and level that stretch the given percentiles of a frame over the display range."""
+    # A sparse sample is enough for the percentiles of a camera frame
+    sample = frame[::4, ::4]
+    lower, upper = np.percentile(sample, (low, high))
+    window = max(float(upper - lower), 1.0)
+    return window, float(lower) + window / 2
+
+
+@lru_cache(maxsize=8)
+def get_window_level_lut(dtype: np.dtype, window: float, level: float) -> np.ndarray:
+    """Get the 8-bit display value of every value of an integer type of at most 16 bits."""
+    info = np.iinfo(dtype)
+    values = np.arange(info.min, info.max + 1, dtype=np.float32)
+    return np.clip((values - (level - window / 2)) * (255 / window), 0, 255).astype(np.uint8)
+
+
+def apply_window_level(frame: np.ndarray, window: float, level: float) -> np.ndarray:
+    """Map a frame to 8-bit display values, stretching the window centered on the level.
+
+    Args:
+        frame: Frame of any bit depth.
+        window: Width of the value range shown from black to white.
+        level: Value shown as middle gray.
+
+    Returns:
+        The 8-bit display frame.
+
+    """
+    if frame.dtype.kind in "ui" and frame.dtype.itemsize <= 2:
+        lut = get_window_level_lut(frame.dtype, float(window), float(level))
+        # Signed values index the table from its start
+        return lut[frame.astype(np.int32) - np.iinfo(frame.dtype).min] if frame.dtype.kind == "i" else lut[frame]
+    scaled = (frame.astype(np.float32) - (level - window / 2)) * (255 / window)
+    return np.clip(scaled, 0, 255).astype(np.uint8)
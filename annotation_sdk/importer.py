@@ -0,0 +1,426 @@
+"""Bulk import of ellipses and points from external annotation tables.
+
+Rows of a CSV or TSV table are mapped to the annotations of an image and eye
+through an ``ImportSpec``. The default spec reads the columns written by the
+CSV exporter; ``ImportSpec.pupil_labs`` reads the ``pupil_positions.csv`` file
+of a Pupil Labs export. Rows are validated while the table is streamed, and
+the annotations of each image are updated in parallel as soon as its rows have
+been read, or only checked in a dry run.
+"""
+
+import csv
+import math
+import re
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+import numpy as np
+
+from .annotation_io import JSON_EXTENSION, AnnotationBackend, AnnotationFileBackend, map_bounded
+from .model import ANNOTATION_TYPES, ELLIPSE_TYPES, EYES, EyeAnnotation
+from .project_store import PROJECT_STORE_FILENAME, ProjectStore
+
+ELLIPSE_FIELDS = ("center_x", "center_y", "width", "height", "angle")
+ROI_FIELDS = ("x", "y", "width", "height")
+MAX_REPORTED_ERRORS = 20
+# Images whose rows are collected at once while a table is streamed
+MAX_OPEN_IMAGES = 1000
+NUMBER_PATTERN = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+# Column names of the CSV files written by the exporter
+DEFAULT_COLUMNS = {
+    "image": "image",
+    "eye": "eye",
+    **{f"{kind}_{field}": f"{kind}_{field}" for kind in ELLIPSE_TYPES for field in ELLIPSE_FIELDS},
+    **{f"roi_{field}": f"roi_{field}" for field in ROI_FIELDS},
+    **{f"{kind}_points": f"{kind}_points" for kind in ANNOTATION_TYPES},
+}
+
+
+class ImportSpec:
+    """Describes how the columns of an external table map to annotations."""
+
+    def __init__(
+        self,
+        columns: dict[str, str] | None = None,
+        image_template: str | None = None,
+        eye_values: dict[str, str] | None = None,
+        default_eye: str = "left",
+        min_confidence: float | None = None,
+        confidence_column: str = "confidence",
+        method_column: str | None = None,
+        method_prefix: str = "",
+    ) -> None:
+        """Initialize the ImportSpec.
+
+        Args:
+            columns: Maps annotation fields to table columns. Fields are "image",
+                "eye", "<pupil|iris>_<center_x|center_y|width|height|angle>",
+                "roi_<x|y|width|height>" and "<type>_points". Fields without a
+                column are not imported. Defaults to the columns of the CSV
+                exporter, which are optional; columns mapped here are reported
+                if the table lacks them.
+            image_template: Builds the image path relative to the dataset root
+                from the row, for example "eye{eye_id}/{world_index}.png". Used
+                instead of the "image" column when given.
+            eye_values: Maps values of the eye column to "left" or "right".
+            default_eye: Eye used when there is no eye column.
+            min_confidence: Rows with a lower confidence are skipped.
+            confidence_column: Column holding the confidence of a row.
+            method_column: Column holding the detection method of a row.
+            method_prefix: Rows whose method does not start with this are skipped.
+
+        """
+        self.columns = DEFAULT_COLUMNS if columns is None else columns
+        # Only explicitly mapped columns are expected in every table
+        self.mapped_columns = set() if columns is None else set(columns.values())
+        self.image_template = image_template
+        self.eye_values = eye_values or {}
+        self.default_eye = default_eye
+        self.min_confidence = min_confidence
+        self.confidence_column = confidence_column
+        self.method_column = method_column
+        self.method_prefix = method_prefix
+
+    @classmethod
+    def pupil_labs(cls, image_template: str, min_confidence: float | None = 0.6) -> "ImportSpec":
+        """Create a spec for the ``pupil_positions.csv`` file of a Pupil Labs export.
+
+        Only the 2D detections are imported; eye 0 is the right eye and eye 1 the left eye.
+
+        Args:
+            image_template: Builds the image path of a row, see ``__init__``.
+            min_confidence: Rows with a lower confidence are skipped.
+
+        Returns:
+            The import spec.
+
+        """
+        return cls(
+            columns={
+                "eye": "eye_id",
+                "pupil_center_x": "ellipse_center_x",
+                "pupil_center_y": "ellipse_center_y",
+                "pupil_width": "ellipse_axis_a",
+                "pupil_height": "ellipse_axis_b",
+                "pupil_angle": "ellipse_angle",
+            },
+            image_template=image_template,
+            eye_values={"0": "right", "1": "left"},
+            min_confidence=min_confidence,
+            method_column="method",
+            method_prefix="2d",
+        )
+
+    def map_columns(self, columns: dict[str, str]) -> None:
+        """Map more annotation fields to table columns, which are then expected in the table."""
+        self.columns = {**self.columns, **columns}
+        self.mapped_columns |= set(columns.values())
+
+    def is_skipped(self, row: dict[str, str]) -> bool:
+        """Check if a row is filtered out by its confidence or detection method."""
+        if self.method_column is not None and not row.get(self.method_column, "").startswith(self.method_prefix):
+            return True
+        if self.min_confidence is not None and self.confidence_column in row:
+            return float(row[self.confidence_column]) < self.min_confidence
+        return False
+
+    def parse_row(self, row: dict[str, str]) -> tuple[str, str, dict[str, object]]:
+        """Convert a row to the annotations it holds.
+
+        Args:
+            row: Table row by column name.
+
+        Returns:
+            The image key, the eye and the imported values by field, where
+            ellipses are keyed "<type>_ellipse", the ROI "roi" and point arrays
+            "<type>_points".
+
+        Raises:
+            ValueError: If the row is incomplete or holds invalid values.
+
+        """
+        if self.image_template is not None:
+            try:
+                image_key = self.image_template.format_map(row)
+            except (KeyError, IndexError) as e:
+                raise ValueError(f"image template needs column {e}") from e
+        else:
+            image_key = self.get_value(row, "image")
+        if not image_key:
+            raise ValueError("no image")
+
+        eye = self.get_value(row, "eye") if "eye" in self.columns else self.default_eye
+        eye = self.eye_values.get(eye, eye)
+        if eye not in EYES:
+            raise ValueError(f"unknown eye {eye!r}")
+
+        values = {}
+        for kind in ELLIPSE_TYPES:
+            fields = [self.get_value(row, f"{kind}_{field}") for field in ELLIPSE_FIELDS]
+            if not any(fields):
+                continue
+            ellipse = tuple(float(value) for value in fields)
+            if not all(map(math.isfinite, ellipse)) or ellipse[2] <= 0 or ellipse[3] <= 0:
+                raise ValueError(f"invalid {kind} ellipse {ellipse}")
+            values[f"{kind}_ellipse"] = ellipse
+        fields = [self.get_value(row, f"roi_{field}") for field in ROI_FIELDS]
+        if any(fields):
+            roi = tuple(float(value) for value in fields)
+            if not all(map(math.isfinite, roi)) or roi[2] <= 0 or roi[3] <= 0:
+                raise ValueError(f"invalid roi {roi}")
+            values["roi"] = roi
+        for kind in ANNOTATION_TYPES:
+            text = self.get_value(row, f"{kind}_points")
+            if text:
+                values[f"{kind}_points"] = parse_points(text)
+        return image_key, eye, values
+
+    def get_value(self, row: dict[str, str], field: str) -> str:
+        """Get the stripped value of a field from a row, or an empty string if it is not in the table."""
+        column = self.columns.get(field)
+        if column is None:
+            return ""
+        return (row.get(column) or "").strip()
+
+
+def parse_points(text: str) -> np.ndarray:
+    """Parse a point list given as JSON pairs or as a flat list of x and y numbers.
+
+    Args:
+        text: The point list, for example "[[1, 2], [3, 4]]" or "1 2; 3 4".
+
+    Returns:
+        (N, 2) array of points.
+
+    Raises:
+        ValueError: If the numbers do not form x, y pairs.
+
+    """
+    numbers = [float(value) for value in NUMBER_PATTERN.findall(text)]
+    if len(numbers) % 2:
+        raise ValueError(f"odd number of point coordinates in {text!r}")
+    return np.array(numbers, dtype=np.float64).reshape(-1, 2)
+
+
+class ImportReport:
+    """Counts and problems found while importing a table."""
+
+    def __init__(self, dry_run: bool) -> None:
+        """Initialize the ImportReport.
+
+        Args:
+            dry_run: Whether annotations were only checked and not written.
+
+        """
+        self.dry_run = dry_run
+        self.rows = 0
+        self.skipped_rows = 0
+        self.invalid_rows = 0
+        self.errors = []
+        self.images = 0
+        self.missing_images = []
+        self.updated_images = 0
+        self.conflicts = 0
+
+    def add_error(self, message: str) -> None:
+        """Record a problem, keeping the first ones for the summary."""
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(message)
+
+    def summary(self) -> str:
+        """Describe the import in a few lines."""
+        action = "would be updated" if self.dry_run else "updated"
+        lines = [
+            f"Rows: {self.rows} read, {self.skipped_rows} filtered out, {self.invalid_rows} invalid",
+            f"Images: {self.images} referenced, {len(self.missing_images)} missing, {self.updated_images} {action}",
+            f"Existing annotations kept: {self.conflicts}",
+        ]
+        lines.extend(f"  {message}" for message in self.errors)
+        if len(self.missing_images) > MAX_REPORTED_ERRORS:
+            lines.append(f"  ... and {len(self.missing_images) - MAX_REPORTED_ERRORS} more missing images")
+        return "\n".join(lines)
+
+
+def read_table(
+    table_path: str,
+    spec: ImportSpec,
+    report: ImportReport,
+    delimiter: str | None = None,
+    max_open_images: int = MAX_OPEN_IMAGES,
+) -> Iterator[tuple[str, dict]]:
+    """Stream the rows of a table and yield the imported values of each image once its rows are complete.
+
+    Rows are grouped by image while they are read. The rows of an image are
+    taken as complete once rows of ``max_open_images`` other images followed
+    them, so memory does not grow with the length of the table. Tables sorted by
+    image or by time, like those of the exporter and of Pupil Labs, are
+    grouped completely. Rows of an image that appear after its values were
+    yielded are reported as invalid and not imported.
+
+    Args:
+        table_path: Path to the CSV or TSV file.
+        spec: Mapping of the table columns.
+        report: Report the row and image counts and invalid rows are added to.
+        delimiter: Column delimiter, defaults to a tab for ``.tsv`` files and a comma otherwise.
+        max_open_images: Maximum number of images whose rows are collected at once.
+
+    Yields:
+        Image keys and dictionaries of imported values by eye, where later rows
+        override earlier ones.
+
+    """
+    if delimiter is None:
+        delimiter = "\t" if Path(table_path).suffix.lower() == ".tsv" else ","
+    open_images = OrderedDict()
+    finished_images = set()
+    with Path(table_path).open(encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f, delimiter=delimiter)
+        missing_columns = sorted(spec.mapped_columns - set(reader.fieldnames or []))
+        if missing_columns:
+            report.add_error(f"columns not in the table, not imported: {', '.join(missing_columns)}")
+        # Row 1 is the header
+        for row_number, row in enumerate(reader, start=2):
+            report.rows += 1
+            try:
+                if spec.is_skipped(row):
+                    report.skipped_rows += 1
+                    continue
+                image_key, eye, values = spec.parse_row(row)
+            except ValueError as e:
+                report.invalid_rows += 1
+                report.add_error(f"row {row_number}: {e}")
+                continue
+            if image_key in finished_images:
+                report.invalid_rows += 1
+                report.add_error(f"row {row_number}: rows of {image_key} are more than {max_open_images} images apart")
+                continue
+            if image_key not in open_images and len(open_images) >= max_open_images:
+                finished_key, eye_values = open_images.popitem(last=False)
+                finished_images.add(finished_key)
+                report.images += 1
+                yield finished_key, eye_values
+            open_images.setdefault(image_key, {}).setdefault(eye, {}).update(values)
+    report.images += len(open_images)
+    yield from open_images.items()
+
+
+def apply_values(annotation: EyeAnnotation, values: dict[str, object], overwrite: bool) -> tuple[bool, int]:
+    """Set imported values on the annotations of an eye.
+
+    Args:
+        annotation: Annotations of the eye.
+        values: Imported values by field.
+        overwrite: Whether existing ellipses and points are replaced.
+
+    Returns:
+        Whether anything changed, and the number of values not imported because
+        the eye already had them.
+
+    """
+    changed = False
+    conflicts = 0
+    for field, value in values.items():
+        kind, _, part = field.rpartition("_")
+        if part == "roi":
+            exists = annotation.roi is not None
+        elif part == "ellipse":
+            exists = annotation.get_ellipse(kind) is not None
+        else:
+            exists = len(annotation.get_points(kind)) > 0
+        if exists and not overwrite:
+            conflicts += 1
+            continue
+        if part == "roi":
+            annotation.roi = value
+        elif part == "ellipse":
+            annotation.set_ellipse(kind, value)
+        else:
+            annotation.set_points(kind, value)
+        changed = True
+    return changed, conflicts
+
+
+def import_table(
+    table_path: str,
+    root: str,
+    spec: ImportSpec | None = None,
+    dry_run: bool = False,
+    overwrite: bool = False,
+    extension: str = JSON_EXTENSION,
+    max_workers: int | None = None,
+    delimiter: str | None = None,
+) -> ImportReport:
+    """Import the annotations of an external table into a dataset.
+
+    Annotations are written to the project store of the dataset folder if there
+    is one, otherwise to annotation files next to the images.
+
+    Args:
+        table_path: Path to the CSV or TSV file.
+        root: Dataset folder the image paths of the table are relative to.
+        spec: Mapping of the table columns, defaults to the columns of the CSV exporter.
+        dry_run: Only validate the table and report what would change.
+        overwrite: Replace existing ellipses and points instead of keeping them.
+        extension: Extension of new annotation files, which selects their format.
+            Existing annotation files are updated in their own format.
+        max_workers: Maximum number of threads updating annotations.
+        delimiter: Column delimiter, defaults to a tab for ``.tsv`` files and a comma otherwise.
+
+    Returns:
+        Report of the import.
+
+    """
+    spec = spec or ImportSpec()
+    report = ImportReport(dry_run)
+    store_path = Path(root) / PROJECT_STORE_FILENAME
+    backend: AnnotationBackend = (
+        ProjectStore(str(store_path)) if store_path.exists() else AnnotationFileBackend(extension)
+    )
+
+    def update_image(item: tuple[str, dict]) -> tuple[str, bool, bool, int]:
+        image_key, eye_values = item
+        image_path = str(Path(root) / image_key)
+        if not Path(image_path).exists():
+            return image_key, False, False, 0
+        eye_data = backend.load_annotations(image_path)
+        changed = False
+        conflicts = 0
+        for eye, values in eye_values.items():
+            eye_changed, eye_conflicts = apply_values(eye_data[eye], values, overwrite)
+            changed = changed or eye_changed
+            conflicts += eye_conflicts
+        if changed and not dry_run:
+            backend.save_annotations(image_path, eye_data)
+        return image_key, True, changed, conflicts
+
+    try:
+        for image_key, found, changed, conflicts in map_bounded(
+            update_image, read_table(table_path, spec, report, delimiter), max_workers
+        ):
+            if not found:
+                report.missing_images.append(image_key)
+                if len(report.missing_images) <= MAX_REPORTED_ERRORS:
+                    report.add_error(f"image not found: {image_key}")
+            report.updated_images += changed
+            report.conflicts += conflicts
+    finally:
+        backend.close()
+    return report
+
+
+def parse_mapping(items: Iterable[str]) -> dict[str, str]:
+    """Parse "key=value" strings into a dictionary.
+
+    Raises:
+        ValueError: If an item has no "=".
+
+    """
+    mapping = {}
+    for item in items:
+        key, separator, value = item.partition("=")
+        if not separator:
+            raise ValueError(f"expected key=value, got {item!r}")
+        mapping[key.strip()] = value.strip()
+    return mapping
@@ -0,0 +1,137 @@
+"""Compact per-eye annotation model backed by numpy arrays."""
+
+import numpy as np
+
+EYES = ("left", "right")
+ANNOTATION_TYPES = ("pupil", "iris", "eyelid_contour", "glint")
+ELLIPSE_TYPES = ("pupil", "iris")
+
+Point = tuple[float, float]
+Ellipse = tuple[float, float, float, float, float]
+Roi = tuple[float, float, float, float]
+
+EMPTY_POINTS = np.empty((0, 2), dtype=np.float64)
+EMPTY_POINTS.flags.writeable = False
+
+
+def as_points_array(points: object) -> np.ndarray:
+    """Convert a sequence of (x, y) pairs to an (N, 2) float64 array."""
+    array = np.array(points, dtype=np.float64)
+    if array.size == 0:
+        return EMPTY_POINTS
+    return array.reshape(-1, 2)
+
+
+class EyeAnnotation:
+    """Annotations of one eye.
+
+    The points of each annotation type are stored in one contiguous (N, 2) float64
+    array, ellipses as (cx, cy, width, height, angle) tuples and the ROI as an
+    (x, y, width, height) tuple.
+
+    Snapshots share their arrays with the annotation they were taken from. Shared
+    arrays are marked read-only and copied before the next in-place change, so a
+    snapshot costs a handful of references regardless of the number of points.
+    """
+
+    __slots__ = (
+        "eyelid_contour_points",
+        "glint_points",
+        "iris_ellipse",
+        "iris_points",
+        "pupil_ellipse",
+        "pupil_points",
+        "roi",
+    )
+
+    def __init__(self) -> None:
+        """Initialize an empty EyeAnnotation."""
+        self.pupil_points = EMPTY_POINTS
+        self.iris_points = EMPTY_POINTS
+        self.eyelid_contour_points = EMPTY_POINTS
+        self.glint_points = EMPTY_POINTS
+        self.pupil_ellipse = None
+        self.iris_ellipse = None
+        self.roi = None
+
+    def get_points(self, kind: str) -> np.ndarray:
+        """Get the (N, 2) point array of an annotation type.
+
+        The returned array must not be modified; use the editing methods instead.
+        """
+        return getattr(self, f"{kind}_points")
+
+    def get_point(self, kind: str, index: int) -> Point:
+        """Get a single point of an annotation type as an (x, y) tuple."""
+        x, y = self.get_points(kind)[index].tolist()
+        return (x, y)
+
+    def point_list(self, kind: str) -> list[Point]:
+        """Get the points of an annotation type as a list of (x, y) tuples."""
+        return [(x, y) for x, y in self.get_points(kind).tolist()]
+
+    def writable_points(self, kind: str) -> np.ndarray:
+        """Get the point array of an annotation type for an in-place change, copying it if shared."""
+        points = self.get_points(kind)
+        if not points.flags.writeable:
+            points = points.copy()
+            setattr(self, f"{kind}_points", points)
+        return points
+
+    def set_points(self, kind: str, points: object) -> None:
+        """Replace all points of an annotation type."""
+        setattr(self, f"{kind}_points", as_points_array(points))
+
+    def insert_point(self, kind: str, index: int, point: Point) -> None:
+        """Insert a point into an annotation type."""
+        setattr(self, f"{kind}_points", np.insert(self.get_points(kind), index, point, axis=0))
+
+    def remove_point(self, kind: str, index: int) -> None:
+        """Remove a point from an annotation type."""
+        setattr(self, f"{kind}_points", np.delete(self.get_points(kind), index, axis=0))
+
+    def set_point(self, kind: str, index: int, point: Point) -> None:
+        """Replace a single point of an annotation type."""
+        self.writable_points(kind)[index] = point
+
+    def translate_points(self, kind: str, delta_x: float, delta_y: float) -> None:
+        """Move all points of an annotation type by the same offset."""
+        if len(self.get_points(kind)):
+            self.writable_points(kind)[:] += (delta_x, delta_y)
+
+    def transform_points(self, kind: str, matrix: np.ndarray) -> None:
+        """Apply a 2x3 affine transform to all points of an annotation type."""
+        matrix = np.asarray(matrix, dtype=np.float64)
+        points = self.get_points(kind)
+        if len(points):
+            self.set_points(kind, points @ matrix[:, :2].T + matrix[:, 2])
+
+    def get_ellipse(self, kind: str) -> Ellipse | None:
+        """Get the fitted ellipse of an annotation type, or None for types without ellipses."""
+        if kind not in ELLIPSE_TYPES:
+            return None
+        return getattr(self, f"{kind}_ellipse")
+
+    def set_ellipse(self, kind: str, ellipse: Ellipse | None) -> None:
+        """Set the fitted ellipse of an annotation type."""
+        setattr(self, f"{kind}_ellipse", None if ellipse is None else tuple(float(value) for value in ellipse))
+
+    def is_empty(self) -> bool:
+        """Check if the eye has no points, ellipses or ROI."""
+        return (
+            all(len(self.get_points(kind)) == 0 for kind in ANNOTATION_TYPES)
+            and all(self.get_ellipse(kind) is None for kind in ELLIPSE_TYPES)
+            and self.roi is None
+        )
+
+    def snapshot(self) -> "EyeAnnotation":
+        """Get a copy-on-write copy that shares the point arrays."""
+        copy = EyeAnnotation()
+        for kind in ANNOTATION_TYPES:
+            points = self.get_points(kind)
+            points.flags.writeable = False
+            setattr(copy, f"{kind}_points", points)
+        copy.pupil_ellipse = self.pupil_ellipse
+        copy.iris_ellipse = self.iris_ellipse
+        copy.roi = self.roi
+        return copy
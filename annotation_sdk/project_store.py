@@ -0,0 +1,212 @@
+"""Single-file SQLite store holding the annotations of a whole project."""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from .annotation_io import (
+    annotations_from_dict,
+    annotations_to_dict,
+    find_annotation_path,
+    load_many,
+    save_annotations,
+)
+from .model import EYES, EyeAnnotation
+
+PROJECT_STORE_FILENAME = "eye_annotations.sqlite"
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    image_key TEXT PRIMARY KEY,
+    annotations TEXT,
+    metadata TEXT NOT NULL DEFAULT '{}',
+    updated_at REAL
+) WITHOUT ROWID
+"""
+
+
+def get_project_store_path(image_path: str) -> str:
+    """Get the path of the project store that belongs to the folder of an image.
+
+    Args:
+        image_path: Path to an image of the project.
+
+    Returns:
+        Path to the project store file in the image's folder.
+
+    """
+    return str(Path(image_path).parent / PROJECT_STORE_FILENAME)
+
+
+class ProjectStore:
+    """Annotations and per-image metadata of a project in one indexed SQLite file.
+
+    Images are keyed by their path relative to the folder of the store, so every
+    lookup is a single primary-key query and no directory has to be scanned. The
+    database runs in WAL mode so readers, such as training jobs, do not block the
+    annotation tool while it saves. A store may be shared between threads; its
+    queries are serialized by a lock.
+    """
+
+    def __init__(self, store_path: str) -> None:
+        """Open or create a project store.
+
+        Args:
+            store_path: Path to the store file.
+
+        """
+        self.store_path = str(store_path)
+        self.root = Path(store_path).resolve().parent
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(self.store_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            self.connection.execute(SCHEMA)
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self.lock:
+            self.connection.close()
+
+    def get_image_key(self, image_path: str) -> str:
+        """Get the key of an image, its POSIX path relative to the store folder."""
+        return Path(os.path.relpath(Path(image_path).resolve(), self.root)).as_posix()
+
+    def get_image_path(self, image_key: str) -> str:
+        """Get the absolute path of an image from its key."""
+        return str(self.root / image_key)
+
+    def load_annotations(self, image_path: str) -> dict[str, EyeAnnotation]:
+        """Load the annotations of an image, or empty annotations if there are none."""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT annotations FROM images WHERE image_key = ?", (self.get_image_key(image_path),)
+            ).fetchone()
+        if row is None or row[0] is None:
+            return {eye: EyeAnnotation() for eye in EYES}
+        return annotations_from_dict(json.loads(row[0]))
+
+    def save_annotations(self, image_path: str, eye_data: dict[str, EyeAnnotation]) -> None:
+        """Save the annotations of an image."""
+        with self.lock, self.connection:
+            self.upsert_annotations([(self.get_image_key(image_path), json.dumps(annotations_to_dict(eye_data)))])
+
+    def upsert_annotations(self, rows: Iterable[tuple[str, str]]) -> None:
+        """Insert or replace the serialized annotations of images by key."""
+        updated_at = time.time()
+        self.connection.executemany(
+            "INSERT INTO images (image_key, annotations, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(image_key) DO UPDATE SET annotations = excluded.annotations, updated_at = excluded.updated_at",
+            ((key, annotations, updated_at) for key, annotations in rows),
+        )
+
+    def has_annotations(self, image_path: str) -> bool:
+        """Check if annotations of an image are stored."""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT 1 FROM images WHERE image_key = ? AND annotations IS NOT NULL",
+                (self.get_image_key(image_path),),
+            ).fetchone()
+        return row is not None
+
+    def get_revision(self, image_path: str) -> float | None:
+        """Get the time the annotations of an image were last saved."""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT updated_at FROM images WHERE image_key = ? AND annotations IS NOT NULL",
+                (self.get_image_key(image_path),),
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def get_metadata(self, image_path: str) -> dict:
+        """Get the metadata stored for an image."""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT metadata FROM images WHERE image_key = ?", (self.get_image_key(image_path),)
+            ).fetchone()
+        return {} if row is None else json.loads(row[0])
+
+    def set_metadata(self, image_path: str, **values: object) -> None:
+        """Merge values into the metadata stored for an image."""
+        with self.lock, self.connection:
+            metadata = self.get_metadata(image_path)
+            metadata.update(values)
+            self.connection.execute(
+                "INSERT INTO images (image_key, metadata) VALUES (?, ?) "
+                "ON CONFLICT(image_key) DO UPDATE SET metadata = excluded.metadata",
+                (self.get_image_key(image_path), json.dumps(metadata)),
+            )
+
+    def annotated_image_paths(self) -> list[str]:
+        """Get the paths of all images with stored annotations, sorted by key."""
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT image_key FROM images WHERE annotations IS NOT NULL ORDER BY image_key"
+            ).fetchall()
+        return [self.get_image_path(row[0]) for row in rows]
+
+    def iter_annotations(self, batch_size: int = 256) -> Iterator[tuple[str, dict[str, EyeAnnotation]]]:
+        """Iterate over all stored annotations by image key, reading them in batches.
+
+        Args:
+            batch_size: Number of rows fetched from the database at a time.
+
+        Yields:
+            The key of each annotated image and its annotations, sorted by key.
+
+        """
+        with self.lock:
+            cursor = self.connection.execute(
+                "SELECT image_key, annotations FROM images WHERE annotations IS NOT NULL ORDER BY image_key"
+            )
+        while True:
+            with self.lock:
+                rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            for key, annotations in rows:
+                yield key, annotations_from_dict(json.loads(annotations))
+
+    def import_json(self, image_paths: Iterable[str], max_workers: int | None = None) -> int:
+        """Import the annotation files of images, in either format, in one transaction.
+
+        Args:
+            image_paths: Images whose annotation files are imported. Images without
+                an annotation file are skipped.
+            max_workers: Maximum number of reader threads.
+
+        Returns:
+            Number of imported annotation files.
+
+        """
+        annotation_paths = {path: find_annotation_path(path) for path in image_paths}
+        image_paths = [path for path, annotation_path in annotation_paths.items() if Path(annotation_path).exists()]
+        eye_data = load_many([annotation_paths[path] for path in image_paths], max_workers)
+        with self.lock, self.connection:
+            self.upsert_annotations(
+                (self.get_image_key(path), json.dumps(annotations_to_dict(data)))
+                for path, data in zip(image_paths, eye_data)
+            )
+        return len(image_paths)
+
+    def export_json(self) -> int:
+        """Write the stored annotations to annotation files next to their images.
+
+        Images that have a binary annotation file keep it, all others get a JSON file.
+
+        Returns:
+            Number of exported annotation files.
+
+        """
+        count = 0
+        for key, eye_data in self.iter_annotations():
+            save_annotations(find_annotation_path(self.get_image_path(key)), eye_data)
+            count += 1
+        return count
@@ -0,0 +1,170 @@
+"""Cached annotation status of every image of a dataset.
+
+The status of an image tells which parts of each eye are annotated, packed into
+an integer with ``STATUS_BITS_PER_EYE`` bits per eye in the order of ``EYES``.
+The index remembers the revision of the annotations each status was computed
+from, so refreshing it only reads the annotations that changed since.
+"""
+
+import itertools
+import json
+import os
+import threading
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+from .annotation_io import AnnotationBackend, map_bounded, write_atomic
+from .model import EYES, EyeAnnotation
+
+STATUS_INDEX_FILENAME = ".eye_annotation_status.json"
+
+PUPIL_FITTED = 1
+IRIS_FITTED = 2
+EYELID_ANNOTATED = 4
+GLINTS_ANNOTATED = 8
+ROI_SET = 16
+STATUS_FLAGS = {
+    "pupil": PUPIL_FITTED,
+    "iris": IRIS_FITTED,
+    "eyelid": EYELID_ANNOTATED,
+    "glints": GLINTS_ANNOTATED,
+    "roi": ROI_SET,
+}
+STATUS_BITS_PER_EYE = 5
+
+
+def eye_status(annotation: EyeAnnotation) -> int:
+    """Get the status flags of the annotations of one eye."""
+    status = 0
+    if annotation.pupil_ellipse is not None:
+        status |= PUPIL_FITTED
+    if annotation.iris_ellipse is not None:
+        status |= IRIS_FITTED
+    if len(annotation.eyelid_contour_points):
+        status |= EYELID_ANNOTATED
+    if len(annotation.glint_points):
+        status |= GLINTS_ANNOTATED
+    if annotation.roi is not None:
+        status |= ROI_SET
+    return status
+
+
+def annotation_status(eye_data: dict[str, EyeAnnotation]) -> int:
+    """Get the status of the annotations of both eyes of an image."""
+    status = 0
+    for i, eye in enumerate(EYES):
+        status |= eye_status(eye_data[eye]) << (i * STATUS_BITS_PER_EYE)
+    return status
+
+
+def get_eye_status(status: int, eye: str) -> int:
+    """Get the status flags of one eye from the status of an image."""
+    return (status >> (EYES.index(eye) * STATUS_BITS_PER_EYE)) & ((1 << STATUS_BITS_PER_EYE) - 1)
+
+
+def get_status_index_path(image_path: str) -> str:
+    """Get the path of the status index that belongs to the folder of an image."""
+    return str(Path(image_path).parent / STATUS_INDEX_FILENAME)
+
+
+class StatusIndex:
+    """Annotation status of images by their path, cached with the revision it was computed from.
+
+    Entries are updated one at a time when annotations are saved, and ``refresh``
+    only loads the annotations whose revision changed, so the index stays cheap
+    for very large datasets. Methods may be called from several threads.
+    """
+
+    def __init__(self, index_path: str) -> None:
+        """Open a status index, starting empty if its file is missing or unreadable.
+
+        Args:
+            index_path: Path to the index file.
+
+        """
+        self.index_path = str(index_path)
+        self.root = Path(index_path).resolve().parent
+        self.lock = threading.Lock()
+        self.modified = False
+        # Key prefix of each image folder, so paths are not resolved once per image
+        self.folder_prefixes = {}
+        self.entries = {}
+        if Path(index_path).exists():
+            try:
+                self.entries = json.loads(Path(index_path).read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                print(f"Rebuilding unreadable status index {index_path}: {e}")
+
+    def get_image_key(self, image_path: str) -> str:
+        """Get the key of an image, its POSIX path relative to the index folder."""
+        folder, name = os.path.split(image_path)
+        prefix = self.folder_prefixes.get(folder)
+        if prefix is None:
+            prefix = Path(os.path.relpath(Path(folder).resolve(), self.root)).as_posix()
+            prefix = "" if prefix == "." else f"{prefix}/"
+            self.folder_prefixes[folder] = prefix
+        return prefix + name
+
+    def get_status(self, image_path: str) -> int | None:
+        """Get the cached status of an image, or None if it is not known."""
+        entry = self.entries.get(self.get_image_key(image_path))
+        return None if entry is None else entry[1]
+
+    def update(self, image_path: str, revision: float | None, status: int) -> None:
+        """Record the status of an image computed from the annotations with a revision."""
+        with self.lock:
+            self.entries[self.get_image_key(image_path)] = [revision, status]
+            self.modified = True
+
+    def refresh(
+        self,
+        image_paths: Iterable[str],
+        backend: AnnotationBackend,
+        max_workers: int | None = None,
+        is_cancelled: Callable[[], bool] = lambda: False,
+    ) -> dict[str, int]:
+        """Bring the statuses of images up to date with their stored annotations.
+
+        Args:
+            image_paths: Images to check.
+            backend: Storage of the annotations.
+            max_workers: Maximum number of threads checking images.
+            is_cancelled: Stops the refresh early when it returns True.
+
+        Returns:
+            The new status of each image whose status changed, by image path.
+
+        """
+
+        def check(image_path: str) -> tuple[str, int | None]:
+            if is_cancelled():
+                return image_path, None
+            key = self.get_image_key(image_path)
+            revision = backend.get_revision(image_path)
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == revision:
+                return image_path, None
+            status = annotation_status(backend.load_annotations(image_path)) if revision is not None else 0
+            previous = None if entry is None else entry[1]
+            self.update(image_path, revision, status)
+            return image_path, None if status == previous else status
+
+        return {
+            image_path: status
+            for image_path, status in map_bounded(
+                check, itertools.takewhile(lambda _: not is_cancelled(), image_paths), max_workers
+            )
+            if status is not None
+        }
+
+    def save(self) -> None:
+        """Write the index to its file if it changed."""
+        with self.lock:
+            if not self.modified:
+                return
+            data = json.dumps(self.entries, separators=(",", ":")).encode("utf-8")
+            self.modified = False
+        try:
+            write_atomic(self.index_path, data)
+        except OSError as e:
+            print(f"Failed to save status index {self.index_path}: {e}")
@@ -0,0 +1,48 @@
+"""Tests of datasets whose annotation files were converted to the binary format."""
+
+from pathlib import Path
+
+from annotation_sdk import (
+    BINARY_EXTENSION,
+    AnnotationFileBackend,
+    EyeAnnotation,
+    convert_annotation_file,
+    get_annotation_path,
+    iter_dataset,
+    save_annotations,
+)
+
+
+def save_pupil(path: str, ellipse: tuple) -> None:
+    """Save annotations with a pupil ellipse on the left eye."""
+    left = EyeAnnotation()
+    left.set_ellipse("pupil", ellipse)
+    save_annotations(path, {"left": left, "right": EyeAnnotation()})
+
+
+def test_backend_updates_converted_files(tmp_path: Path) -> None:
+    """Saves after a conversion go to the binary file that the dataset scanner reads."""
+    image_path = str(tmp_path / "eye.png")
+    Path(image_path).write_bytes(b"")
+    json_path = get_annotation_path(image_path)
+    save_pupil(json_path, (10.0, 10.0, 4.0, 4.0, 0.0))
+    convert_annotation_file(json_path, get_annotation_path(image_path, BINARY_EXTENSION))
+
+    backend = AnnotationFileBackend()
+    eye_data = backend.load_annotations(image_path)
+    eye_data["left"].set_ellipse("pupil", (99.0, 99.0, 4.0, 4.0, 0.0))
+    backend.save_annotations(image_path, eye_data)
+
+    [(_, exported)] = list(iter_dataset(str(tmp_path)))
+    assert exported["left"].get_ellipse("pupil")[:2] == (99.0, 99.0)
+
+
+def test_backend_reads_converted_files_without_json(tmp_path: Path) -> None:
+    """Images whose JSON file was removed after the conversion keep their annotations."""
+    image_path = str(tmp_path / "eye.png")
+    Path(image_path).write_bytes(b"")
+    save_pupil(get_annotation_path(image_path, BINARY_EXTENSION), (10.0, 10.0, 4.0, 4.0, 0.0))
+
+    backend = AnnotationFileBackend()
+    assert backend.has_annotations(image_path)
+    assert backend.load_annotations(image_path)["left"].get_ellipse("pupil") is not None
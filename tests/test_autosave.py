@@ -0,0 +1,74 @@
+"""Tests of reporting autosaves that fail on the writer thread."""
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PyQt5.QtWidgets import QApplication, QMessageBox
+
+from annotation_app.utils.autosave import AutosaveWriter
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+@pytest.fixture(scope="module")
+def app() -> QApplication:
+    """Get the application, creating it for the tests."""
+    return QApplication.instance() or QApplication([])
+
+
+def fail() -> None:
+    """Save that fails like a full disk."""
+    raise OSError("No space left on device")
+
+
+def test_failed_save_is_reported_until_a_save_succeeds(app: QApplication) -> None:
+    """A failed save is signalled on the GUI thread and cleared by a later successful save."""
+    writer = AutosaveWriter()
+    reported = []
+    writer.save_failed.connect(lambda key, error: reported.append((key, error)))
+
+    writer.submit("eye.png", fail)
+    writer.wait()
+    app.processEvents()
+    assert reported == [("eye.png", "No space left on device")]
+    assert writer.get_failures() == {"eye.png": "No space left on device"}
+
+    writer.submit("eye.png", lambda: None)
+    writer.close()
+    assert writer.get_failures() == {}
+
+
+def test_failed_autosave_marks_the_image_unsaved(
+    app: QApplication, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The main window shows the edits as unsaved again, warns once and asks before exiting."""
+    import cv2  # noqa: PLC0415
+
+    from annotation_app.gui.main_window import MainWindow  # noqa: PLC0415
+
+    image_path = str(tmp_path / "eye.png")
+    cv2.imwrite(image_path, np.zeros((32, 32), np.uint8))
+    warnings = []
+    monkeypatch.setattr(QMessageBox, "warning", lambda *args: warnings.append(args[2]))
+    monkeypatch.setattr(QMessageBox, "question", lambda *_args: QMessageBox.No)
+
+    window = MainWindow()
+    window.settings_handler.settings["autosave"] = True
+    window.set_images([image_path])
+    controller = window.annotation_controller
+    monkeypatch.setattr(controller.backend, "save_annotations", lambda *_args: fail())
+
+    for _ in range(2):
+        window.set_annotation_modified(True)
+        controller.autosave()
+        controller.autosave_writer.wait()
+        app.processEvents()
+        assert window.annotation_modified
+
+    assert len(warnings) == 1
+    assert "No space left on device" in warnings[0]
+    assert not controller.confirm_autosaves_written()
+    monkeypatch.setattr(QMessageBox, "question", lambda *_args: QMessageBox.Yes)
+    window.close()
@@ -0,0 +1,79 @@
+"""Tests of the edit journal written while background saves are pending."""
+
+import threading
+from pathlib import Path
+
+from annotation_app.utils.edit_history import AddPointCommand, MovePointCommand
+from annotation_app.utils.edit_journal import EditJournal, JournalWriter
+
+
+def test_edits_during_pending_autosave_survive_compaction(tmp_path: Path) -> None:
+    """Edits journaled between taking the saved annotations and compacting are kept as unsaved."""
+    writer = JournalWriter()
+    journal = EditJournal(str(tmp_path / "eye.png"), writer, lambda: 1.0)
+    journal.start()
+    added = AddPointCommand("left", "pupil", 0, (1.0, 2.0))
+    journal.record_command(added)
+
+    # The autosave takes the annotations, then the user keeps editing before it writes them
+    sequence = journal.get_sequence()
+    moved = MovePointCommand("left", "pupil", 0, (1.0, 2.0), (3.0, 4.0))
+    journal.record_command(moved)
+    journal.record_undo()
+    journal.compact([added], sequence)
+    writer.flush()
+
+    undo_commands, redo_commands, unsaved = journal.load()
+    writer.close()
+    assert [command.to_dict() for command in undo_commands] == [added.to_dict()]
+    assert redo_commands == []
+    assert [(op, command.to_dict() if command else None) for op, command in unsaved] == [
+        ("do", moved.to_dict()),
+        ("undo", None),
+    ]
+
+
+def test_compaction_without_pending_edits_leaves_nothing_unsaved(tmp_path: Path) -> None:
+    """Compacting after all edits were saved leaves only the saved history."""
+    writer = JournalWriter()
+    journal = EditJournal(str(tmp_path / "eye.png"), writer, lambda: 1.0)
+    journal.start()
+    added = AddPointCommand("left", "pupil", 0, (1.0, 2.0))
+    journal.record_command(added)
+    journal.compact([added])
+    writer.flush()
+
+    undo_commands, _, unsaved = journal.load()
+    writer.close()
+    assert [command.to_dict() for command in undo_commands] == [added.to_dict()]
+    assert unsaved == []
+
+
+def test_close_after_many_appends_does_not_hang(tmp_path: Path) -> None:
+    """The stop signal is not lost when the writer takes it while batching appends."""
+    for run in range(20):
+        writer = JournalWriter()
+        path = str(tmp_path / f"journal{run}.jsonl")
+        for number in range(2000):
+            writer.append(path, f'{{"op": "undo", "number": {number}}}')
+        closer = threading.Thread(target=writer.close, daemon=True)
+        closer.start()
+        closer.join(timeout=10)
+        assert not closer.is_alive()
+        assert len(Path(path).read_text(encoding="utf-8").splitlines()) == 2000
+
+
+def test_flush_of_one_journal_waits_for_its_writes(tmp_path: Path) -> None:
+    """Flushing a journal file returns once its queued writes are on disk."""
+    writer = JournalWriter()
+    path = str(tmp_path / "a.jsonl")
+    other_path = str(tmp_path / "b.jsonl")
+    for number in range(500):
+        writer.append(path, f'{{"op": "undo", "number": {number}}}')
+        writer.append(other_path, f'{{"op": "undo", "number": {number}}}')
+    writer.rewrite(path, ['{"op": "saved"}'], keep_after=writer.get_sequence())
+
+    writer.flush(path)
+    assert Path(path).read_text(encoding="utf-8") == '{"op": "saved"}\n'
+    writer.close()
+    assert not writer.queued_writes
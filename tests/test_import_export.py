@@ -0,0 +1,100 @@
+"""Tests of importing the CSV files written by the exporter."""
+
+from pathlib import Path
+
+import numpy as np
+
+from annotation_sdk import (
+    BINARY_EXTENSION,
+    EyeAnnotation,
+    ImportReport,
+    ImportSpec,
+    export_dataset,
+    import_table,
+    iter_dataset,
+    load_annotations,
+    save_annotations,
+)
+from annotation_sdk.annotation_io import get_annotation_path
+from annotation_sdk.importer import read_table
+
+
+def test_exported_csv_imports_back(tmp_path: Path) -> None:
+    """Ellipses, ROIs and points of an exported dataset are imported without errors."""
+    source = tmp_path / "source"
+    target = tmp_path / "target"
+    for folder in (source, target):
+        folder.mkdir()
+        (folder / "eye.png").write_bytes(b"")
+    left = EyeAnnotation()
+    left.set_points("pupil", np.array([[10.0, 20.0], [12.5, 22.0], [15.0, 20.0]]))
+    left.set_ellipse("pupil", (12.0, 21.0, 5.0, 3.0, 10.0))
+    left.roi = (1.0, 2.0, 30.0, 40.0)
+    save_annotations(get_annotation_path(str(source / "eye.png")), {"left": left, "right": EyeAnnotation()})
+
+    export_dataset(str(source), str(tmp_path / "export"), ["csv"])
+    report = import_table(str(tmp_path / "export" / "ellipses.csv"), str(target))
+
+    assert report.errors == []
+    assert report.updated_images == 1
+    imported = load_annotations(get_annotation_path(str(target / "eye.png")))["left"]
+    np.testing.assert_allclose(imported.get_points("pupil"), left.get_points("pupil"))
+    np.testing.assert_allclose(imported.get_ellipse("pupil"), left.get_ellipse("pupil"))
+    assert tuple(imported.roi) == left.roi
+
+
+def test_only_mapped_columns_are_reported_missing(tmp_path: Path) -> None:
+    """Columns of the default spec are optional, explicitly mapped ones are expected."""
+    (tmp_path / "eye.png").write_bytes(b"")
+    table = tmp_path / "table.csv"
+    table.write_text(
+        "image,eye,pupil_center_x,pupil_center_y,pupil_width,pupil_height,pupil_angle\neye.png,left,1,2,3,4,5\n",
+        encoding="utf-8",
+    )
+
+    report = import_table(str(table), str(tmp_path), dry_run=True)
+    assert report.errors == []
+
+    spec = ImportSpec()
+    spec.map_columns({"iris_center_x": "iris_x"})
+    report = import_table(str(table), str(tmp_path), spec, dry_run=True)
+    assert report.errors == ["columns not in the table, not imported: iris_x"]
+
+
+def test_import_updates_binary_annotation_files(tmp_path: Path) -> None:
+    """Images with a binary annotation file are updated in that file, which export reads."""
+    image_path = str(tmp_path / "eye.png")
+    Path(image_path).write_bytes(b"")
+    left = EyeAnnotation()
+    left.set_ellipse("iris", (5.0, 5.0, 8.0, 8.0, 0.0))
+    save_annotations(get_annotation_path(image_path, BINARY_EXTENSION), {"left": left, "right": EyeAnnotation()})
+    table = tmp_path / "table.csv"
+    table.write_text(
+        "image,eye,pupil_center_x,pupil_center_y,pupil_width,pupil_height,pupil_angle\neye.png,left,1,2,3,4,5\n",
+        encoding="utf-8",
+    )
+
+    report = import_table(str(table), str(tmp_path))
+
+    assert report.updated_images == 1
+    assert not Path(get_annotation_path(image_path)).exists()
+    [(_, exported)] = list(iter_dataset(str(tmp_path)))
+    assert exported["left"].get_ellipse("pupil") == (1.0, 2.0, 3.0, 4.0, 5.0)
+    assert exported["left"].get_ellipse("iris") == (5.0, 5.0, 8.0, 8.0, 0.0)
+
+
+def test_table_rows_are_streamed_by_image(tmp_path: Path) -> None:
+    """Images are yielded once rows of other images follow, and late rows are reported."""
+    table = tmp_path / "table.csv"
+    images = ["a.png", "a.png", "b.png", "c.png", "d.png", "a.png"]
+    lines = [f'{image},left,"{x} 0"' for x, image in enumerate(images, start=1)]
+    table.write_text("image,eye,pupil_points\n" + "\n".join(lines) + "\n", encoding="utf-8")
+    report = ImportReport(dry_run=True)
+
+    updates = read_table(str(table), ImportSpec(), report, max_open_images=2)
+    first_key, first_values = next(updates)
+    assert (first_key, report.rows) == ("a.png", 4)
+    np.testing.assert_allclose(first_values["left"]["pupil_points"], [[2.0, 0.0]])
+    assert [key for key, _ in updates] == ["b.png", "c.png", "d.png"]
+    assert report.images == 4
+    assert report.invalid_rows == 1